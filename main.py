@@ -1,17 +1,21 @@
-import argparse
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
+import time
+_startup_begin = time.perf_counter()
 
+import argparse
 import sys
 import os
+import glob
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
 
+from src.instrumentation import active_profiler, add_instrumentation_args, configure_logging, profiling
+
+# Heavy modules (pandas, scikit-learn, matplotlib) are imported inside the commands that need them,
+# so listing and menu commands start fast
 # from src.implm.merged.columns import *
 # from src.interval.split_frame import *
 # from src.graph.line_plot import *
 # from src.interval import *
-from src.implm.merged.db_math_regression import *
-from src.implm.merged.pipeline import *
 # from src.pre_processing.db_math_regression import *
 
 dataFolder = os.path.join(os.path.dirname(__file__), 'data')
@@ -23,8 +27,9 @@ tmp_folder = os.path.join(dataFolder, 'tmp')
 hardwareInfo_csv_path = ''
 java_csv_path = ''
 merged_csv_path = os.path.join(tmp_folder, 'merged_data.csv')
+cache_folder = os.path.join(tmp_folder, 'cache')
 
-_frames:list[pd.DataFrame] | None = None
+_frames:'list[pd.DataFrame] | None' = None
 
 
 def initialize_folder(folder: str):
@@ -54,12 +59,37 @@ def remove_tmp_files():
         except Exception as e:
             print(f"Error removing file {file_path}: {e}")
 
-def get_csv_path(folder:str, file:str) -> str:
+def find_csv_path(folder:str, file:str) -> str:
+    """
+    Returns the path of file inside folder, matching the name case-insensitively (e.g. hw_info.CSV).
+    Raises FileNotFoundError if it does not exist.
+    """
     path = os.path.join(folder, file)
-    if not os.path.exists(path):
-        print(f"CSV file not found at {path}. Exiting.")
+    if os.path.exists(path):
+        return path
+    
+    if os.path.isdir(folder):
+        for candidate in os.listdir(folder):
+            if candidate.lower() == file.lower():
+                return os.path.join(folder, candidate)
+    
+    raise FileNotFoundError(f"CSV file not found at {path}")
+
+def get_csv_path(folder:str, file:str) -> str:
+    try:
+        return find_csv_path(folder, file)
+    except FileNotFoundError as e:
+        print(f"{e}. Exiting.")
         sys.exit(1)
-    return path
+
+def list_input_folders() -> list[str]:
+    """
+    Returns the names of the folders in data/input, sorted.
+    """
+    return sorted(
+        folder for folder in os.listdir(input_csv_folder)
+        if os.path.isdir(os.path.join(input_csv_folder, folder))
+    )
 
 def mainMenu() -> tuple[str, str]:
     """
@@ -67,7 +97,7 @@ def mainMenu() -> tuple[str, str]:
     Returns:
         tuple[str, str]: Paths to the selected hardware info and Java CSV files.
     """
-    list_of_files = os.listdir(input_csv_folder)
+    list_of_files = list_input_folders()
     if not list_of_files:
         print("No folders found in the input directory. Exiting.")
         sys.exit(1)
@@ -91,31 +121,219 @@ def mainMenu() -> tuple[str, str]:
 
 
 
+def find_input_folders(patterns:list[str] | None = None) -> list[str]:
+    """
+    Returns the input folders to process in batch mode.
+    Without patterns every folder under data/input is used. Patterns may be folder paths or globs,
+    relative to the current directory or to data/input.
+    """
+    if not patterns:
+        patterns = [os.path.join(input_csv_folder, '*')]
+    
+    folders = []
+    for pattern in patterns:
+        matches = glob.glob(pattern) or glob.glob(os.path.join(input_csv_folder, pattern))
+        matches = [match for match in sorted(matches) if os.path.isdir(match)]
+        if not matches:
+            print(f"No input folder matches {pattern}")
+        folders.extend(matches)
+    
+    return list(dict.fromkeys(os.path.abspath(folder) for folder in folders))
+
+def process_input_folder(folder:str, use_cache:bool = True, output_format:str = 'csv') -> int:
+    """
+    Runs the merge and split pipeline on one input folder, saving results to data/output/<folder name>
+    as output_format files (an OutputFormat value). Returns the number of cases found.
+    """
+    from src.implm.merged.pipeline import get_splitted_frames_from_csv
+    from src.implm.output import OutputFormat
+    
+    hardware_csv = find_csv_path(folder, 'hw_info.csv')
+    java_csv = find_csv_path(folder, 'java.csv')
+    output_folder = os.path.join(output_csv_folder, os.path.basename(folder))
+    initialize_folder(output_folder)
+    
+    frames = get_splitted_frames_from_csv(
+        Base_csv=hardware_csv,
+        java_csv_path=java_csv,
+        output_path=output_folder,
+        cache_dir=cache_folder if use_cache else None,
+        output_format=OutputFormat(output_format)
+    )
+    return len(frames)
+
+def _timed_process_input_folder(folder:str, use_cache:bool, profile:bool = False, output_format:str = 'csv') -> tuple[int, float, list[dict]]:
+    # Workers run in their own process, so their stages are recorded there and sent back with the result
+    start = time.perf_counter()
+    if not profile:
+        return process_input_folder(folder, use_cache, output_format), time.perf_counter() - start, []
+    with profiling(log_summary=False) as profiler:
+        cases = process_input_folder(folder, use_cache, output_format)
+    return cases, time.perf_counter() - start, profiler.records
+
+def run_batch(folders:list[str], jobs:int | None = None, use_cache:bool = True, output_format:str = 'csv') -> int:
+    """
+    Processes every folder in a process pool of at most jobs workers and prints a summary.
+    Returns the number of failed folders.
+    """
+    if not folders:
+        print("No input folders found. Exiting.")
+        return 1
+    
+    results: dict[str, str] = {}
+    start = time.perf_counter()
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        profiler = active_profiler()
+        futures = {executor.submit(_timed_process_input_folder, folder, use_cache, profiler is not None, output_format): folder for folder in folders}
+        for future in as_completed(futures):
+            folder = futures[future]
+            try:
+                cases, elapsed, records = future.result()
+                if profiler is not None:
+                    profiler.add_records(records, folder=os.path.basename(folder))
+                results[folder] = f"OK      {cases} cases in {elapsed:.2f}s"
+            except Exception as e:
+                results[folder] = f"FAILED  {type(e).__name__}: {e}"
+    
+    failures = sum(1 for result in results.values() if result.startswith('FAILED'))
+    
+    print("\n=== BATCH SUMMARY ===")
+    for folder in folders:
+        print(f"{os.path.basename(folder)}: {results[folder]}")
+    print(f"{len(folders) - failures}/{len(folders)} folders processed in {time.perf_counter() - start:.2f}s")
+    
+    return failures
+
+
+def run_follow(folder:str, poll_seconds:float, idle_timeout:float | None) -> int:
+    """
+    Follows hw_info.csv and java.csv of an input folder while a test is running, saving merged_data.csv,
+    every case and cases_summary.csv to data/output/<folder name> as soon as each case closes.
+    The logs may not exist yet. Returns the number of cases emitted.
+    """
+    from src.implm.merged.follow import follow
+
+    folder = os.path.abspath(folder if os.path.isdir(folder) else os.path.join(input_csv_folder, folder))
+    initialize_folder(folder)
+
+    def log_path(file:str) -> str:
+        try:
+            return find_csv_path(folder, file)
+        except FileNotFoundError:
+            return os.path.join(folder, file)
+
+    output_folder = os.path.join(output_csv_folder, os.path.basename(folder))
+    summaries = follow(log_path('hw_info.csv'), log_path('java.csv'), output_folder,
+                       poll_seconds=poll_seconds, idle_timeout=idle_timeout)
+    print(f"{len(summaries)} case(s) saved to {output_folder}")
+    return len(summaries)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge, split and plot benchmark results")
+    parser.add_argument('--no-cache', action='store_true', help="Always run the full pipeline, ignoring the merged frame cache")
+    parser.add_argument('--invalidate-cache', action='store_true', help="Remove every cached merged frame and exit")
+    parser.add_argument('--batch', nargs='*', metavar='FOLDER', help="Process every folder under data/input (or the given folders/globs) without prompting")
+    parser.add_argument('--jobs', type=int, default=None, help="Maximum number of parallel worker processes in batch mode (default: CPU count)")
+    # The values of OutputFormat, listed here so the parser does not import pandas
+    parser.add_argument('--output-format', default='csv', choices=['csv', 'parquet', 'feather'], help="File format of merged_data: csv, or the zstd compressed parquet/feather (needs pyarrow). Default: csv")
+    parser.add_argument('--list', action='store_true', help="List the folders under data/input and exit")
+    parser.add_argument('--select-model', action='store_true', help="Rank polynomial degrees of the noise model by leave-one-RPM-level-out cross-validation and exit")
+    parser.add_argument('--degrees', type=int, nargs='+', default=None, metavar='N', help="Degrees evaluated by --select-model (default: 1 to 5)")
+    parser.add_argument('--follow', metavar='FOLDER', help="Follow the logs of an input folder while the test is running, saving every case as soon as it closes")
+    parser.add_argument('--poll', type=float, default=1.0, metavar='SECONDS', help="Time between two reads of the logs in --follow mode (default: 1)")
+    parser.add_argument('--idle-timeout', type=float, default=None, metavar='SECONDS', help="Stop --follow after this many seconds without new rows (default: follow until Ctrl+C)")
+    add_instrumentation_args(parser)
+    parser.add_argument('--startup-time', action='store_true', help="Print the startup time and the import time of the pipeline modules, then exit")
+    return parser.parse_args()
+
+
+def measure_startup():
+    """
+    Prints the time spent from interpreter start of this module to command dispatch,
+    then the import time of each heavy module loaded lazily by the commands.
+    """
+    print(f"CLI startup: {(time.perf_counter() - _startup_begin) * 1000:.1f} ms")
+    
+    for module in ['pandas', 'src.implm.merged.pipeline', 'matplotlib.figure']:
+        start = time.perf_counter()
+        __import__(module)
+        print(f"import {module}: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
 if __name__ == '__main__':  
+    args = parse_args()
+    configure_logging(args.log_level)
     initialize_default_folders()
-    create_polinomial_regression_from_csv()
 
-    hardwareInfo_csv_path, java_csv_path, choice_output_folder = mainMenu()
+    # Stage timings, rows and peak memory are recorded only when asked for, the report is written on exit
+    instrumentation = ExitStack()
+    if args.profile or args.cprofile:
+        instrumentation.enter_context(profiling(report_path=args.profile, cprofile_path=args.cprofile))
 
-    print(f"{output_csv_folder}")
+    with instrumentation:
+        if args.startup_time:
+            measure_startup()
+            sys.exit(0)
 
-    initialize_folder(choice_output_folder)
-    print(f"choise_output_folder: {choice_output_folder}")
+        if args.list:
+            for folder in list_input_folders():
+                print(folder)
+            sys.exit(0)
 
-    # merged_df = get_merged_frame(
-    #     HW_info_csv=hardwareInfo_csv_path, 
-    #     java_csv_path=java_csv_path, 
-    #     output_final_file=os.path.join(choice_output_folder, 'merged_data.csv')
-    # )
+        if args.invalidate_cache:
+            from src.implm.merged.cache import invalidate_cache
+            removed = invalidate_cache(cache_folder)
+            print(f"Removed {removed} cached frame(s) from {cache_folder}")
+            sys.exit(0)
+
+        if args.select_model:
+            from src.implm.merged.model_selection import select_model, DEFAULT_DEGREES
+            select_model(
+                csv_path=os.path.join(dataFolder, 'fans_db_tests.csv'),
+                degrees=args.degrees or DEFAULT_DEGREES,
+                jobs=args.jobs,
+                cache_dir=None if args.no_cache else os.path.join(tmp_folder, 'model_selection')
+            )
+            sys.exit(0)
+
+        if args.follow is not None:
+            run_follow(args.follow, poll_seconds=args.poll, idle_timeout=args.idle_timeout)
+            sys.exit(0)
+
+        if args.batch is not None:
+            failures = run_batch(find_input_folders(args.batch), jobs=args.jobs, use_cache=not args.no_cache,
+                                 output_format=args.output_format)
+            sys.exit(1 if failures else 0)
+
+        hardwareInfo_csv_path, java_csv_path, choice_output_folder = mainMenu()
+
+        # The noise model is trained on the first prediction
+        from src.implm.merged.pipeline import get_splitted_frames_from_csv
+        from src.implm.output import OutputFormat
+
+        print(f"{output_csv_folder}")
+
+        initialize_folder(choice_output_folder)
+        print(f"choise_output_folder: {choice_output_folder}")
+
+        # merged_df = get_merged_frame(
+        #     HW_info_csv=hardwareInfo_csv_path, 
+        #     java_csv_path=java_csv_path, 
+        #     output_final_file=os.path.join(choice_output_folder, 'merged_data.csv')
+        # )
     
-    df_list = get_splitted_frames_from_csv(
-        Base_csv=hardwareInfo_csv_path,
-        java_csv_path=java_csv_path,
-        # output_path=merged_csv_path,
-        output_path=choice_output_folder
-    )
+        df_list = get_splitted_frames_from_csv(
+            Base_csv=hardwareInfo_csv_path,
+            java_csv_path=java_csv_path,
+            # output_path=merged_csv_path,
+            output_path=choice_output_folder,
+            cache_dir=None if args.no_cache else cache_folder,
+            output_format=OutputFormat(args.output_format)
+        )
     
-    print(f"Data merged and saved to {choice_output_folder}")
+        print(f"Data merged and saved to {choice_output_folder}")
     
 
     
@@ -0,0 +1,542 @@
+import argparse
+import contextlib
+import csv
+import functools
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+import src.benchmark.reference as reference
+from src.benchmark.generator import DEFAULT_COLUMNS, DEFAULT_CYCLES, cached_logs
+from src.benchmark.suite import DEFAULT_WORK_FOLDER, dataFolder, size_arg
+from src.implm.merged.db_math_regression import (
+    DEFAULT_TEST_VALUES, DEFAULT_TRAIN_CSV, DEFAULT_TRAIN_VALUES, NoiseModel, Solver, default_model, predict_with_model
+)
+from src.implm.merged.pipeline import (
+    fast_csv_engine, fix_dataframe_inconsistencies, get_intervals_from_df, merge_csv_files, pc_rpm_columns_merge
+)
+from src.implm.merged.time_join import TimeJoin
+from src.interval.interval import Interval
+from src.interval.split_frame import split_df_by_intervals_as_relative_time
+from src.instrumentation import configure_logging, get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_INPUT_FOLDER = os.path.normpath(os.path.join(dataFolder, 'input'))
+DEFAULT_SIZES = [10_000]
+DEFAULT_RTOL = 1e-6
+DEFAULT_ATOL = 1e-6
+# Predictions are rounded to 2 decimals, so evaluating the polynomial in another order may round one step apart
+PREDICTION_ATOL = 0.01 + 1e-9
+# Largest difference measured between the Solver.LEAST_SQUARES and baseline (LinearRegression) predictions
+# at degree 3: 1.37 dB on data/fans_db_tests.csv, 0.70 dB on the synthetic sessions, 0.40 dB on data/input
+SOLVER_PREDICTION_ATOL = 1.4
+
+# Intended changes from the baseline (src.benchmark.reference) by stage. Such a stage may differ from the
+# baseline run on the raw logs, but must match it once its input is adjusted to undo the change (or within
+# the tolerance given); any other diff is a mismatch.
+EXPECTED_DIFFS = {
+    'merge (exact)': "TimeJoin.EXACT joins on the parsed seconds, so HWiNFO times with unpadded fields "
+                     "('17:17:0.026') find their Java row; the baseline joined on the text before the '.' and dropped "
+                     "them. Checked against the baseline on logs with zero-padded times.",
+    'merge (projected)': "Same as 'merge (exact)', with the projected read.",
+    'merge (as-of)': "TimeJoin.BACKWARD (the default) matches a sample with the last Java row at most 1s before it: "
+                     "besides the unpadded times of 'merge (exact)', a sample exactly on a second missing from the "
+                     "Java log takes the row of the second before, and the rows of a duplicated HWiNFO or Java time "
+                     "after the first one are dropped instead of multiplying the merged rows. Checked against the "
+                     "baseline on logs adjusted the same way.",
+    'gap fill': "Times are placed on the HWiNFO 'Date' and roll over at midnight; the baseline sorted the times of "
+                "day, putting the rows after midnight first. The sort is stable, so a duplicated second keeps its "
+                "first sample in file order; the baseline sort was not and could keep another one. Checked against "
+                "the baseline, with a stable sort, on times moved to start at 00:00:00 and moved back.",
+    'predict': "Solver.LEAST_SQUARES (opt-in) solves the exact least-squares coefficients, which the baseline "
+               f"LinearRegression drifts from at degree 3 and above. Checked within {SOLVER_PREDICTION_ATOL} dB "
+               "of the baseline model.",
+}
+
+
+def _as_numbers(series: pd.Series) -> np.ndarray | None:
+    """float64 values of a numeric or boolean column (also when stored as objects), None for text."""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if series.dtype == object:
+        numbers = pd.to_numeric(series, errors='coerce')
+        if numbers.isna().sum() == series.isna().sum():
+            return numbers.to_numpy(dtype=np.float64, na_value=np.nan)
+    return None
+
+
+def compare_frames(expected: pd.DataFrame, actual: pd.DataFrame, rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL) -> dict:
+    """
+    Diffs two DataFrames column by column, matching rows by position.
+
+    Numeric and boolean columns (whatever their width, e.g. float32 against float64) are equal within
+    rtol/atol, other columns as text. Missing values only match missing values.
+
+    Returns:
+    - Dict with 'equal', 'rows' ([expected, actual]) and 'columns': one entry per differing column with
+      'column', 'mismatches', 'first_row', 'expected', 'actual' and, for numbers, 'max_abs_diff'.
+      A column found in only one frame has 'missing_in' ('expected' or 'actual') instead.
+    """
+    lengths = [len(expected), len(actual)]
+    rows = min(lengths)
+    expected = expected.iloc[:rows].reset_index(drop=True)
+    actual = actual.iloc[:rows].reset_index(drop=True)
+
+    columns = []
+    for column in expected.columns:
+        if column not in actual.columns:
+            columns.append({'column': column, 'missing_in': 'actual'})
+            continue
+
+        left, right = _as_numbers(expected[column]), _as_numbers(actual[column])
+        entry = {'column': column}
+        if left is not None and right is not None:
+            both_missing = np.isnan(left) & np.isnan(right)
+            differs = ~(np.isclose(left, right, rtol=rtol, atol=atol) | both_missing)
+            delta = np.abs(left - right)[differs]
+            delta = delta[~np.isnan(delta)]
+            entry['max_abs_diff'] = float(delta.max()) if len(delta) else None
+        else:
+            left_missing, right_missing = expected[column].isna().to_numpy(), actual[column].isna().to_numpy()
+            differs = (left_missing != right_missing) | (~left_missing & (expected[column].astype(str) != actual[column].astype(str)).to_numpy())
+
+        if differs.any():
+            first = int(np.argmax(differs))
+            entry.update(mismatches=int(differs.sum()), first_row=first,
+                         expected=str(expected[column].iloc[first]), actual=str(actual[column].iloc[first]))
+            columns.append(entry)
+
+    columns.extend({'column': column, 'missing_in': 'expected'} for column in actual.columns if column not in expected.columns)
+    return {'equal': not columns and lengths[0] == lengths[1], 'rows': lengths, 'columns': columns}
+
+
+def _quiet(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    # The baseline prints every gap filled and interval found
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _padded_clock(value: str) -> str:
+    """'17:17:0.026' as '17:17:00.026'. Values other than H:M:S times are returned unchanged."""
+    whole, dot, fraction = value.partition('.')
+    fields = whole.split(':')
+    if len(fields) != 3 or not all(field.isdigit() for field in fields):
+        return value
+    return ':'.join(f"{int(field):02d}" for field in fields) + dot + fraction
+
+
+def _read_log(csv_path: str) -> tuple[list[str], list[list[str]]]:
+    # latin-1 maps every byte to a character, so the other fields are written back byte for byte
+    with open(csv_path, newline='', encoding='latin-1') as source:
+        reader = csv.reader(source)
+        return next(reader, []), list(reader)
+
+
+def _write_log(path: str, header: list[str], rows: list[list[str]]) -> str:
+    with open(path, 'w', newline='', encoding='latin-1') as target:
+        writer = csv.writer(target)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
+def _field(row: list[str], index: int | None) -> str | None:
+    return row[index] if index is not None and index < len(row) else None
+
+
+def padded_log(csv_path: str, column: str, folder: str) -> str:
+    """
+    Copies csv_path to folder with the times of column zero-padded (see _padded_clock), every other
+    field kept as text. Returns the path of the copy.
+    """
+    header, rows = _read_log(csv_path)
+    index = header.index(column) if column in header else None
+    for row in rows:
+        if index is not None and index < len(row):
+            row[index] = _padded_clock(row[index])
+    return _write_log(os.path.join(folder, os.path.basename(csv_path)), header, rows)
+
+
+def _clock_seconds(value) -> int | None:
+    try:
+        hours, minutes, seconds = map(int, value.split(':'))
+    except (AttributeError, ValueError):
+        return None
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _shifted_clock(value, seconds: int):
+    """'HH:MM:SS' moved by seconds, wrapping around midnight. Other values are returned unchanged."""
+    total = _clock_seconds(value)
+    if total is None:
+        return value
+    total = (total + seconds) % 86400
+    return f"{total // 3600:02d}:{total // 60 % 60:02d}:{total % 60:02d}"
+
+
+def asof_logs(hw_info_csv: str, java_csv: str, folder: str) -> tuple[str, str]:
+    """
+    Copies both logs to folder as the as-of join (TimeJoin.BACKWARD, '1s') matches them, for the baseline
+    exact join: times zero-padded (see _padded_clock), the rows repeating the HWiNFO 'Date' and 'Time' or the
+    Java 'Timestamp' of an earlier row dropped, and the samples exactly on a second missing from the Java log
+    moved to the second before, when the Java log has that one. Returns the paths of the copies.
+    """
+    java_header, java_rows = _read_log(java_csv)
+    java_index = java_header.index('Timestamp') if 'Timestamp' in java_header else None
+    java_kept, java_times = [], set()
+    for row in java_rows:
+        if java_index is not None and java_index < len(row):
+            row[java_index] = _padded_clock(row[java_index])
+        if _field(row, java_index) in java_times:
+            continue
+        java_times.add(_field(row, java_index))
+        java_kept.append(row)
+    java_seconds = {seconds for seconds in map(_clock_seconds, java_times) if seconds is not None}
+
+    hw_header, hw_rows = _read_log(hw_info_csv)
+    time_index = hw_header.index('Time') if 'Time' in hw_header else None
+    date_index = hw_header.index('Date') if 'Date' in hw_header else None
+    hw_kept, hw_times = [], set()
+    for row in hw_rows:
+        if time_index is not None and time_index < len(row):
+            row[time_index] = _padded_clock(row[time_index])
+        key = _field(row, date_index), _field(row, time_index)
+        if key[1] is not None and key in hw_times:
+            continue
+        hw_times.add(key)
+        hw_kept.append(row)
+
+        whole, dot, fraction = (key[1] or '').partition('.')
+        seconds = _clock_seconds(whole)
+        if seconds is not None and not fraction.strip('0') and seconds not in java_seconds and (seconds - 1) % 86400 in java_seconds:
+            row[time_index] = _shifted_clock(whole, -1) + dot + fraction
+
+    os.makedirs(folder, exist_ok=True)
+    return (_write_log(os.path.join(folder, os.path.basename(hw_info_csv)), hw_header, hw_kept),
+            _write_log(os.path.join(folder, os.path.basename(java_csv)), java_header, java_kept))
+
+
+@contextlib.contextmanager
+def _stable_sorts():
+    """DataFrame.sort_values sorts stably inside the block, unless the caller passes its own kind."""
+    sort_values = pd.DataFrame.sort_values
+    pd.DataFrame.sort_values = functools.partialmethod(sort_values, kind='stable')
+    try:
+        yield
+    finally:
+        pd.DataFrame.sort_values = sort_values
+
+
+def baseline_gap_fill_from_midnight(merged: pd.DataFrame) -> pd.DataFrame:
+    """
+    Baseline fix_dataframe_inconsistencies on merged with the 'Timestamp' times moved so the first one is
+    00:00:00, then moved back: a session shorter than a day no longer crosses midnight for the baseline.
+    Its sort is made stable, so the samples of a duplicated second keep their order in merged.
+    """
+    offset = next((seconds for seconds in map(_clock_seconds, merged['Timestamp']) if seconds is not None), 0)
+    shifted = merged.copy()
+    shifted['Timestamp'] = [_shifted_clock(value, -offset) for value in shifted['Timestamp']]
+    with _stable_sorts():
+        filled = _quiet(reference.fix_dataframe_inconsistencies, shifted)
+    filled['Timestamp'] = [_shifted_clock(value, offset) for value in filled['Timestamp']]
+    return filled
+
+
+def baseline_model(model: NoiseModel, csv_path: str = DEFAULT_TRAIN_CSV) -> tuple:
+    """
+    (LinearRegression, PolynomialFeatures) trained by the baseline functions on csv_path, with the degree
+    and train/test levels of model.
+    """
+    df = reference.load_and_clean_csv(csv_path, is_train_csv=True)
+    df_treino, _ = _quiet(reference.split_train_test, df, train_values=list(model.metadata.get('train_values', DEFAULT_TRAIN_VALUES)),
+                          test_values=list(model.metadata.get('test_values', DEFAULT_TEST_VALUES)))
+    modelo, transformador, _ = reference.train_polynomial_regression(df_treino, grau=model.grau)
+    return modelo, transformador
+
+
+def intervals_frame(intervals: list[Interval]) -> pd.DataFrame:
+    return pd.DataFrame({'start': [i.start for i in intervals], 'end': [i.end for i in intervals]}, dtype=np.int64)
+
+
+def cases_frame(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """All split cases in one DataFrame, with the case number in a 'case' column."""
+    if not frames:
+        return pd.DataFrame({'case': []})
+    return pd.concat([frame.assign(case=i) for i, frame in enumerate(frames)], ignore_index=True)
+
+
+class SessionCheck:
+    """
+    Runs the baseline and optimized version of every stage on one session and collects the diffs.
+    Each stage gets the output of the optimized version of the stage before it, so a drift is
+    reported at the stage that introduced it.
+    """
+
+    def __init__(self, name: str, rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL):
+        self.name = name
+        self.rtol = rtol
+        self.atol = atol
+        self.results: list[dict] = []
+        self.last_expected: tuple[Any, float] | None = None
+
+    def _record(self, stage: str, **fields) -> dict:
+        result = {'input': self.name, 'stage': stage, 'reference_seconds': None, 'optimized_seconds': None,
+                  'speedup': None, 'equal': False, 'expected_diff': None, 'rows': None, 'columns': [], 'error': None, **fields}
+        self.results.append(result)
+        return result
+
+    def run(
+        self,
+        stage: str,
+        reference_fn: Callable[[], Any],
+        optimized_fn: Callable[[], Any],
+        to_frame: Callable[[Any], pd.DataFrame] = lambda result: result,
+        atol: float | None = None,
+        expected: tuple[Any, float] | None = None,
+        compare: Callable[[pd.DataFrame, pd.DataFrame], dict] | None = None,
+        adjusted_fn: Callable[[], Any] | None = None,
+        expected_atol: float | None = None
+    ) -> Any:
+        """
+        Times both functions, diffs their outputs (converted with to_frame) and returns the optimized output,
+        or None when one of them raised.
+
+        expected may pass the (output, seconds) of a reference run earlier (see last_expected) instead of
+        reference_fn, and compare may replace compare_frames. When the outputs differ, adjusted_fn runs the
+        baseline on the input adjusted to undo the change EXPECTED_DIFFS lists for stage, or expected_atol
+        widens the tolerance to the one of that change: if they then match, the diff is recorded as
+        expected, otherwise the diff left is a mismatch.
+        """
+        def diff_of(expected_output: Any, actual_output: Any, atol: float | None = atol) -> dict:
+            if compare is not None:
+                return compare(to_frame(expected_output), to_frame(actual_output))
+            return compare_frames(to_frame(expected_output), to_frame(actual_output), rtol=self.rtol,
+                                  atol=self.atol if atol is None else atol)
+
+        try:
+            if expected is None:
+                start = time.perf_counter()
+                expected = reference_fn(), time.perf_counter() - start
+                self.last_expected = expected
+            start = time.perf_counter()
+            actual = optimized_fn()
+            optimized_seconds = time.perf_counter() - start
+
+            diff = diff_of(expected[0], actual)
+            if not diff['equal'] and (adjusted_fn is not None or expected_atol is not None):
+                adjusted_diff = diff_of(expected[0] if adjusted_fn is None else adjusted_fn(), actual,
+                                        atol=atol if expected_atol is None else expected_atol)
+                if adjusted_diff['equal']:
+                    diff['expected_diff'] = EXPECTED_DIFFS[stage]
+                else:
+                    diff = adjusted_diff
+        except Exception as e:
+            self._record(stage, error=f"{type(e).__name__}: {e}")
+            return None
+
+        reference_seconds = expected[1]
+        self._record(stage, reference_seconds=reference_seconds, optimized_seconds=optimized_seconds,
+                     speedup=reference_seconds / optimized_seconds if optimized_seconds > 0 else None, **diff)
+        return actual
+
+    def skip(self, stage: str, reason: str):
+        self._record(stage, equal=True, error=f"skipped: {reason}")
+
+
+def check_session(name: str, hw_info_csv: str, java_csv: str, model: NoiseModel, rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL,
+                  train_csv: str = DEFAULT_TRAIN_CSV) -> list[dict]:
+    """
+    Diffs merge_csv_files (exact join, with full and projected read, and as-of join), pc_rpm_columns_merge,
+    fix_dataframe_inconsistencies, predict_with_model, get_intervals_from_df and
+    split_df_by_intervals_as_relative_time against their baseline in src.benchmark.reference on one pair
+    of logs. The stages run on the exact join, the only one the baseline had. The predictions of model
+    are diffed against a model the baseline trained on train_csv. Returns one result per stage.
+    """
+    check = SessionCheck(name, rtol=rtol, atol=atol)
+
+    with tempfile.TemporaryDirectory() as padded_folder:
+        @functools.cache
+        def baseline_padded_merge() -> pd.DataFrame:
+            return reference.merge_csv_files(padded_log(hw_info_csv, 'Time', padded_folder),
+                                             padded_log(java_csv, 'Timestamp', padded_folder))
+
+        merged = check.run('merge (exact)', lambda: reference.merge_csv_files(hw_info_csv, java_csv),
+                           lambda: merge_csv_files(hw_info_csv, java_csv, join=TimeJoin.EXACT),
+                           adjusted_fn=baseline_padded_merge)
+        if merged is None:
+            return check.results
+
+        # The projected read keeps a subset of the columns, as float32
+        def compare_projected(expected: pd.DataFrame, actual: pd.DataFrame) -> dict:
+            return compare_frames(expected[[col for col in actual.columns if col in expected.columns]], actual, rtol=rtol, atol=atol)
+
+        check.run('merge (projected)', None,
+                  lambda: merge_csv_files(hw_info_csv, java_csv, projected=True, engine=fast_csv_engine(), join=TimeJoin.EXACT),
+                  expected=check.last_expected, compare=compare_projected, adjusted_fn=baseline_padded_merge)
+
+        check.run('merge (as-of)', None, lambda: merge_csv_files(hw_info_csv, java_csv, join=TimeJoin.BACKWARD),
+                  expected=check.last_expected,
+                  adjusted_fn=lambda: reference.merge_csv_files(*asof_logs(hw_info_csv, java_csv, os.path.join(padded_folder, 'asof'))))
+
+    merged = check.run('pc rpm', lambda: _quiet(reference.pc_rpm_columns_merge, merged.copy()),
+                       lambda: pc_rpm_columns_merge(merged.copy()))
+    if merged is None:
+        return check.results
+
+    filled = check.run('gap fill', lambda: _quiet(reference.fix_dataframe_inconsistencies, merged.copy()),
+                       lambda: fix_dataframe_inconsistencies(merged.copy()),
+                       adjusted_fn=lambda: baseline_gap_fill_from_midnight(merged))
+    if filled is None:
+        return check.results
+
+    if importlib.util.find_spec('sklearn') is None:
+        check.skip('predict', "the baseline needs scikit-learn to train")
+        predicted = predict_with_model(filled.copy(), model=model)
+    else:
+        # The baseline predicts with the module globals its training sets
+        reference.modelo_poly, reference.transformador_poly = baseline_model(model, train_csv)
+        predicted = check.run('predict', lambda: reference.predict_with_model(filled.copy()),
+                              lambda: predict_with_model(filled.copy(), model=model), atol=PREDICTION_ATOL,
+                              expected_atol=SOLVER_PREDICTION_ATOL if model.solver == Solver.LEAST_SQUARES else None)
+        if predicted is None:
+            return check.results
+
+    intervals = check.run('intervals', lambda: _quiet(reference.get_intervals_from_df, predicted),
+                          lambda: get_intervals_from_df(predicted), to_frame=intervals_frame)
+    if intervals is None:
+        return check.results
+
+    check.run('split', lambda: _quiet(reference.split_df_by_intervals_as_relative_time, predicted, intervals, time_col='relativeTime'),
+              lambda: split_df_by_intervals_as_relative_time(predicted, intervals, time_col='relativeTime'), to_frame=cases_frame)
+    return check.results
+
+
+def _find_log(folder: str, file: str) -> str | None:
+    for candidate in sorted(os.listdir(folder)):
+        if candidate.lower() == file:
+            return os.path.join(folder, candidate)
+    return None
+
+
+def bundled_sessions(input_folder: str = DEFAULT_INPUT_FOLDER) -> list[tuple[str, str, str]]:
+    """Returns (name, hw_info_csv, java_csv) of every folder of input_folder holding both logs (names matched case-insensitively)."""
+    sessions = []
+    for name in sorted(os.listdir(input_folder)):
+        folder = os.path.join(input_folder, name)
+        if not os.path.isdir(folder):
+            continue
+        hw_info_csv, java_csv = _find_log(folder, 'hw_info.csv'), _find_log(folder, 'java.csv')
+        if hw_info_csv is not None and java_csv is not None:
+            sessions.append((name, hw_info_csv, java_csv))
+    return sessions
+
+
+def format_results(results: list[dict], details: int = 5) -> str:
+    """
+    Console table with the speedup and status of every stage, followed by the first differing columns of each
+    mismatch or expected diff, then the description of every expected diff found.
+    """
+    lines = [f"{'input':<20} {'stage':<18} {'reference':>10} {'optimized':>10} {'speedup':>8}  status"]
+    for result in results:
+        if result['error'] is not None:
+            status = result['error'] if result['error'].startswith('skipped') else f"ERROR {result['error']}"
+        elif result['expected_diff'] is not None:
+            status = 'expected diff'
+        else:
+            status = 'ok' if result['equal'] else 'MISMATCH'
+        reference_seconds = '' if result['reference_seconds'] is None else f"{result['reference_seconds']:.3f}"
+        optimized_seconds = '' if result['optimized_seconds'] is None else f"{result['optimized_seconds']:.3f}"
+        speedup = '' if result['speedup'] is None else f"{result['speedup']:.1f}x"
+        lines.append(f"{result['input']:<20} {result['stage']:<18} {reference_seconds:>10} {optimized_seconds:>10} {speedup:>8}  {status}")
+
+        if result['rows'] is not None and result['rows'][0] != result['rows'][1]:
+            lines.append(f"    rows: {result['rows'][0]} expected, {result['rows'][1]} actual")
+        for entry in result['columns'][:details]:
+            if 'missing_in' in entry:
+                lines.append(f"    column {entry['column']!r}: missing in {entry['missing_in']}")
+                continue
+            max_diff = f", max |diff| {entry['max_abs_diff']:.6g}" if entry.get('max_abs_diff') is not None else ''
+            lines.append(f"    column {entry['column']!r}: {entry['mismatches']} row(s) differ{max_diff}; first at row "
+                         f"{entry['first_row']}: expected {entry['expected']}, actual {entry['actual']}")
+        if len(result['columns']) > details:
+            lines.append(f"    ... {len(result['columns']) - details} more column(s)")
+
+    expected_stages = list(dict.fromkeys(result['stage'] for result in results if result['expected_diff'] is not None))
+    if expected_stages:
+        lines.append("Expected diffs:")
+        lines.extend(f"  {stage}: {EXPECTED_DIFFS[stage]}" for stage in expected_stages)
+    return "\n".join(lines)
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Checks every session and prints the report.
+    Returns 1 when a stage differs from its baseline other than as EXPECTED_DIFFS lists, or raised, 0 otherwise.
+    """
+    sessions = [] if args.no_bundled else bundled_sessions(args.input_folder)
+    for rows in args.sizes:
+        hw_info_csv, java_csv = cached_logs(args.work_folder, rows, cycles=args.cycles, columns=args.columns, seed=args.seed)
+        sessions.append((f"synthetic {rows}", hw_info_csv, java_csv))
+    if not sessions:
+        print("No sessions to check.")
+        return 1
+
+    # Full reads of wide HWiNFO logs make pandas warn about fragmented frames on every run
+    warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+    model = default_model() if args.solver == Solver.SKLEARN.value else NoiseModel.from_csv(solver=Solver(args.solver))
+    results = []
+    for name, hw_info_csv, java_csv in sessions:
+        print(f"Checking {name}...")
+        results.extend(check_session(name, hw_info_csv, java_csv, model, rtol=args.rtol, atol=args.atol))
+
+    print(format_results(results))
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+        with open(args.report, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Results saved to {args.report}")
+
+    failures = [result for result in results if not (result['equal'] or result['expected_diff'] is not None)
+                or (result['error'] and not result['error'].startswith('skipped'))]
+    if failures:
+        print(f"{len(failures)} stage check(s) differ from the baseline.")
+        return 1
+    expected = sum(result['expected_diff'] is not None for result in results)
+    print(f"All {len(results)} stage checks match the baseline ({expected} with an expected diff).")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Diff the optimized pipeline stages against their baseline (src/benchmark/reference.py)")
+    parser.add_argument('--input-folder', default=DEFAULT_INPUT_FOLDER, help="Folder of the bundled sessions (default: data/input)")
+    parser.add_argument('--no-bundled', action='store_true', help="Only check generated sessions")
+    parser.add_argument('--sizes', type=size_arg, nargs='*', default=DEFAULT_SIZES, metavar='ROWS',
+                        help="HWiNFO rows of each generated session; pass no value to skip them (default: 1e4)")
+    parser.add_argument('--cycles', type=int, default=DEFAULT_CYCLES, help=f"Test cycles of generated sessions (default: {DEFAULT_CYCLES})")
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS, help=f"HWiNFO columns of generated sessions (default: {DEFAULT_COLUMNS})")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of generated sessions (default: 0)")
+    parser.add_argument('--rtol', type=float, default=DEFAULT_RTOL, help=f"Relative tolerance of numeric columns (default: {DEFAULT_RTOL})")
+    parser.add_argument('--atol', type=float, default=DEFAULT_ATOL, help=f"Absolute tolerance of numeric columns (default: {DEFAULT_ATOL})")
+    parser.add_argument('--solver', default=Solver.SKLEARN.value, choices=[solver.value for solver in Solver],
+                        help=f"Solver of the noise model checked against the baseline one (default: {Solver.SKLEARN.value})")
+    parser.add_argument('--report', default=None, help="Also save every result to this JSON file")
+    parser.add_argument('--work-folder', default=DEFAULT_WORK_FOLDER, help="Folder of the generated logs (default: data/tmp/benchmark)")
+    parser.add_argument('--log-level', default='WARNING', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="Console log level of the pipeline (default: WARNING)")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_logging(args.log_level)
+    sys.exit(run(args))
@@ -0,0 +1,237 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.implm.merged.columns import MergedCol, JOIN_BASE_DATE, JOIN_RPM_TIMESTAMP, PC_FAN_RPM_COLUMNS
+from src.interval.timestamps import seconds_to_time_strings
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_COLUMNS = 304
+DEFAULT_CYCLES = 5
+DEFAULT_START = pd.Timestamp('2025-06-04 17:39:21.554')
+DEFAULT_BLOCK_ROWS = 100_000
+FILLER_POOL_ROWS = 4096
+
+SAMPLE_INTERVAL = 1.005         # Mean seconds between two HWiNFO samples, as in the sample sessions
+SAMPLE_JITTER = 0.010           # Standard deviation of that interval
+DUPLICATE_RATE = 0.001          # Share of samples written twice with the same 'Time'
+GAP_RATE = 0.002                # Share of samples followed by a gap of GAP_SECONDS
+GAP_SECONDS = (2, 6)
+RUNNING_SHARE = 0.6             # Share of every cycle with IsTestRunning true
+RPM_LEVELS = np.arange(1980, 2251, 30)
+
+# Share of float, integer and [Yes/No] flag columns among the filler sensors (as in the real logs)
+_FILLER_KINDS = (('float', 0.58), ('int', 0.18), ('flag', 0.24))
+_FILLER_UNITS = ('[MHz]', '[�C]', '[W]', '[V]', '[%]', '[MB]')
+
+# Columns the pipeline reads: (mean while idle, mean while a test runs, noise, decimals)
+_PIPELINE_SENSORS = {
+    MergedCol.CPU_PERCENTAGE.original: (8.0, 72.0, 6.0, 1),
+    MergedCol.CPU_PACKAGE_ENHANCED.original: (18.0, 95.0, 4.0, 3),
+    MergedCol.GPU_POWER.original: (12.0, 180.0, 8.0, 3),
+    MergedCol.GPU_TEMPERATURE.original: (42.0, 71.0, 1.0, 1),
+    MergedCol.GPU_HOT_SPOT.original: (50.0, 84.0, 1.5, 1),
+    PC_FAN_RPM_COLUMNS[0]: (900.0, 1650.0, 25.0, 0),
+    PC_FAN_RPM_COLUMNS[1]: (0.0, 1400.0, 30.0, 0),
+}
+
+
+def hw_info_header(columns: int = DEFAULT_COLUMNS) -> list[str]:
+    """
+    Returns the column names of a synthetic HWiNFO log with the given number of columns: 'Date', 'Time',
+    the sensors read by the pipeline, filler sensors and the empty column left by the trailing comma
+    of every HWiNFO row.
+    """
+    fixed = [JOIN_BASE_DATE, MergedCol.TIMESTAMP.original] + list(_PIPELINE_SENSORS)
+    if columns < len(fixed) + 1:
+        raise ValueError(f"A HWiNFO log needs at least {len(fixed) + 1} columns.")
+
+    fillers = columns - len(fixed) - 1
+    kinds = np.repeat([kind for kind, _ in _FILLER_KINDS], [round(fillers * share) for _, share in _FILLER_KINDS])
+    kinds = np.resize(kinds, fillers) if len(kinds) else np.array([], dtype=str)
+    names = []
+    for i, kind in enumerate(kinds):
+        unit = '[Yes/No]' if kind == 'flag' else _FILLER_UNITS[i % len(_FILLER_UNITS)]
+        names.append(f"Sensor {i + 1} {unit}")
+    return fixed + names + ['']
+
+
+def cycle_windows(duration: int, cycles: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Splits duration seconds into cycles of equal length, each idle first and then running for RUNNING_SHARE of it.
+    Returns the (starts, ends) seconds of the running windows, ends included.
+    """
+    if cycles < 1:
+        raise ValueError("At least one cycle is needed.")
+    bounds = np.linspace(0, duration, cycles + 1).astype(np.int64)
+    lengths = np.diff(bounds)
+    ends = bounds[1:] - 1 - np.maximum(lengths // 20, 1)
+    starts = np.minimum(ends, ends - (lengths * RUNNING_SHARE).astype(np.int64) + 1)
+    return starts, ends
+
+
+def sample_times(rows: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the offsets of every HWiNFO sample from the start of the log (float seconds, millisecond
+    jitter and occasional gaps) and the mask of samples that repeat the previous one.
+    """
+    steps = np.round(rng.normal(SAMPLE_INTERVAL, SAMPLE_JITTER, rows), 3).clip(0.9)
+    gaps = rng.random(rows) < GAP_RATE
+    steps[gaps] += rng.integers(*GAP_SECONDS, size=int(gaps.sum()))
+    steps[0] = 0.0
+
+    duplicates = rng.random(rows) < DUPLICATE_RATE
+    duplicates[0] = False
+    steps[duplicates] = 0.0
+    return np.cumsum(steps), duplicates
+
+
+def filler_rows(header: list[str], rng: np.random.Generator, pool: int = FILLER_POOL_ROWS) -> np.ndarray:
+    """
+    Returns pool CSV-formatted tails (filler sensors and the trailing empty column) that samples pick from.
+    The pipeline never reads these columns, so formatting a pool once instead of every row keeps
+    large logs fast to write while the file keeps the size and shape of a real one.
+    """
+    fillers = header[2 + len(_PIPELINE_SENSORS):-1]
+    columns = {}
+    for i, name in enumerate(fillers):
+        if name.endswith('[Yes/No]'):
+            columns[name] = np.where(rng.random(pool) < 0.01, 'Yes', 'No')
+        elif i % 4 == 3:
+            columns[name] = rng.integers(0, 20_000, pool)
+        else:
+            columns[name] = np.round(rng.normal(1000.0, 250.0, pool), 1)
+    columns[''] = np.full(pool, '', dtype=object)
+    text = pd.DataFrame(columns).to_csv(header=False, index=False, lineterminator='\n')
+    return np.array(text.splitlines(), dtype=object)
+
+
+def _hw_info_lines(
+    datetimes: pd.DatetimeIndex,
+    running: np.ndarray,
+    tails: np.ndarray,
+    rng: np.random.Generator
+) -> np.ndarray:
+    rows = len(datetimes)
+    hours, minutes, seconds = datetimes.hour.to_numpy(), datetimes.minute.to_numpy(), datetimes.second.to_numpy()
+    milliseconds = datetimes.microsecond.to_numpy() // 1000
+
+    # HWiNFO writes '4.6.2025' and '17:40:0.776' (unpadded day, month and seconds)
+    date = pd.Series(datetimes.day.astype(str)) + '.' + datetimes.month.astype(str) + '.' + datetimes.year.astype(str)
+    time = (pd.Series(np.char.zfill(hours.astype(str), 2)) + ':' + np.char.zfill(minutes.astype(str), 2) + ':'
+            + seconds.astype(str) + '.' + np.char.zfill(milliseconds.astype(str), 3))
+    columns = {JOIN_BASE_DATE: date.to_numpy(), MergedCol.TIMESTAMP.original: time.to_numpy()}
+
+    for name, (idle, active, noise, decimals) in _PIPELINE_SENSORS.items():
+        values = np.maximum(np.where(running, active, idle) + rng.normal(0.0, noise, rows), 0.0)
+        columns[name] = np.round(values, decimals) if decimals else values.astype(np.int64)
+
+    heads = pd.DataFrame(columns).to_csv(header=False, index=False, lineterminator='\n').splitlines()
+    return np.array(heads, dtype=object) + ',' + tails[rng.integers(0, len(tails), rows)]
+
+
+def generate_logs(
+    folder: str,
+    rows: int,
+    cycles: int = DEFAULT_CYCLES,
+    columns: int = DEFAULT_COLUMNS,
+    seed: int = 0,
+    start: pd.Timestamp = DEFAULT_START,
+    block_rows: int = DEFAULT_BLOCK_ROWS
+) -> tuple[str, str]:
+    """
+    Writes a synthetic pair of logs shaped like a real session into folder.
+
+    hw_info.csv has rows samples about SAMPLE_INTERVAL seconds apart with millisecond jitter, some
+    duplicated samples and time gaps. java.csv has one row per second over the same span, with
+    'Timestamp', 'relativeTime' ('MM:SS', minutes may exceed 59), 'RPM' and 'IsTestRunning' true
+    during each of the cycles. Long logs cross midnight. Both files are written in blocks of
+    block_rows rows, so memory stays bounded for any size.
+
+    Parameters:
+    - folder: Output folder (created if needed).
+    - rows: Number of HWiNFO rows.
+    - cycles: Number of test cycles (runs of IsTestRunning).
+    - columns: Number of HWiNFO columns, 'Date', 'Time' and the trailing empty column included.
+    - seed: Seed of the random generator; the same arguments always produce the same files.
+    - start: Date and time of the first sample.
+    - block_rows: Rows generated and written at once.
+
+    Returns:
+    - Tuple (hw_info_csv_path, java_csv_path).
+    """
+    if rows < 1:
+        raise ValueError("At least one row is needed.")
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    header = hw_info_header(columns)
+
+    offsets, duplicates = sample_times(rows, rng)
+    duration = int(offsets[-1]) + 1
+    run_starts, run_ends = cycle_windows(duration, cycles)
+    cycle_rpm = rng.choice(RPM_LEVELS, size=cycles)
+
+    # Running state of every second since the first whole second of the log
+    running_seconds = np.zeros(duration, dtype=bool)
+    for run_start, run_end in zip(run_starts, run_ends):
+        running_seconds[run_start:run_end + 1] = True
+
+    # A duplicated sample repeats every value of the last sample before it
+    source = np.maximum.accumulate(np.where(duplicates, 0, np.arange(rows)))
+    tails = filler_rows(header, rng)
+
+    hw_info_path = os.path.join(folder, 'hw_info.csv')
+    with open(hw_info_path, 'w', encoding='utf-8', newline='') as file:
+        file.write(','.join(f'"{name}"' if ' ' in name else name for name in header) + '\n')
+        for first in range(0, rows, block_rows):
+            block_offsets = offsets[first:first + block_rows]
+            datetimes = pd.DatetimeIndex(start + pd.to_timedelta(block_offsets, unit='s').round('ms'))
+            lines = _hw_info_lines(datetimes, running_seconds[block_offsets.astype(np.int64)], tails, rng)
+
+            repeat = source[first:first + block_rows] - first
+            lines = np.where(repeat >= 0, lines[np.maximum(repeat, 0)], lines)
+            file.write('\n'.join(lines) + '\n')
+
+    java_path = os.path.join(folder, 'java.csv')
+    day_second = int((start - start.normalize()).total_seconds())
+    cycle_of_second = np.searchsorted(run_ends, np.arange(duration), side='left').clip(max=cycles - 1)
+    for first in range(0, duration, block_rows):
+        seconds = np.arange(first, min(first + block_rows, duration))
+        block = pd.DataFrame({
+            JOIN_RPM_TIMESTAMP: seconds_to_time_strings((day_second + seconds) % 86_400, hours=True),
+            MergedCol.RELATIVE_TIME.original: seconds_to_time_strings(seconds),
+            MergedCol.RPM.original: cycle_rpm[cycle_of_second[seconds]],
+            MergedCol.IS_TEST_RUNNING.original: np.where(running_seconds[seconds], 'true', 'false'),
+        })
+        block.to_csv(java_path, mode='w' if first == 0 else 'a', header=first == 0, index=False)
+
+    log.info("Generated %d HWiNFO rows x %d columns and %d Java rows (%d cycles) in %s",
+             rows, len(header), duration, cycles, folder)
+    return hw_info_path, java_path
+
+
+def cached_logs(work_folder: str, rows: int, cycles: int = DEFAULT_CYCLES, columns: int = DEFAULT_COLUMNS, seed: int = 0) -> tuple[str, str]:
+    """
+    Returns the logs generated with these arguments in work_folder/<rows>_<cycles>_<columns>_<seed>,
+    generating them on the first call.
+    """
+    folder = os.path.join(work_folder, f"{rows}_{cycles}_{columns}_{seed}")
+    hw_info_path, java_path = os.path.join(folder, 'hw_info.csv'), os.path.join(folder, 'java.csv')
+    if not (os.path.exists(hw_info_path) and os.path.exists(java_path)):
+        generate_logs(folder, rows, cycles=cycles, columns=columns, seed=seed)
+    return hw_info_path, java_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic pair of HWiNFO and Java logs")
+    parser.add_argument('folder', help="Output folder")
+    parser.add_argument('--rows', type=int, default=1000, help="Number of HWiNFO rows (default: 1000)")
+    parser.add_argument('--cycles', type=int, default=DEFAULT_CYCLES, help=f"Number of test cycles (default: {DEFAULT_CYCLES})")
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS, help=f"Number of HWiNFO columns (default: {DEFAULT_COLUMNS})")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+    generate_logs(args.folder, args.rows, cycles=args.cycles, columns=args.columns, seed=args.seed)
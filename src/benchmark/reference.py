@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import Tuple, List
+
+import numpy as np
+import pandas as pd
+
+# scikit-learn is only needed to train and predict with the noise model
+if importlib.util.find_spec('sklearn') is not None:
+    from sklearn.preprocessing import PolynomialFeatures
+    from sklearn.linear_model import LinearRegression
+
+# The merged pipeline stages as of commit d62770b, copied verbatim (prints included) from
+# src/implm/merged/pipeline.py, src/interval/split_frame.py, src/interval/interval.py and
+# src/implm/merged/db_math_regression.py. Do not update them to follow the pipeline: they are the
+# original behaviour src.benchmark.equivalence diffs the optimized stages against, and the intended
+# changes since then are listed in its EXPECTED_DIFFS.
+
+# Set by the caller before predict_with_model, from train_polynomial_regression (the baseline set them in
+# create_polinomial_regression_from_csv)
+modelo_poly = None
+transformador_poly = None
+
+
+class Interval:
+    def __init__(self, start: int, end: int):
+        if start > end:
+            raise ValueError("Start time must be before end time.")
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Interval(start={self.start}, end={self.end})"
+    
+    def len(self) -> int:
+        return self.end-self.start+1
+     
+    @staticmethod
+    def from_time_strings(start_str: str, end_str: str) -> "Interval":
+        def time_str_to_seconds(s: str) -> int:
+            minutes, seconds = map(int, s.strip().split(":"))
+            return minutes * 60 + seconds
+
+        start_sec = time_str_to_seconds(start_str)
+        end_sec = time_str_to_seconds(end_str)
+        return Interval(start_sec, end_sec)
+
+    @staticmethod
+    def from_range_string(s: str) -> "Interval":
+        parts = s.strip().split("-")
+        if len(parts) != 2:
+            raise ValueError("Expected format 'MM:SS - MM:SS'")
+        start_str, end_str = parts[0].strip(), parts[1].strip()
+        return Interval.from_time_strings(start_str, end_str)
+
+    @staticmethod
+    def time_str_to_seconds(time_str: str) -> int:
+        minutes, seconds = map(int, time_str.split(":"))
+        return minutes * 60 + seconds
+
+
+def merge_csv_files(base_csv_path:str, java_csv_path:str) -> pd.DataFrame:
+    # Read both CSV files
+    base_df = pd.read_csv(base_csv_path)
+    rpm_df = pd.read_csv(java_csv_path)
+
+    # Remove last line of base_df
+    if not base_df.empty and base_df.iloc[-1].isnull().all():
+        base_df = base_df[:-1]
+    
+    # Convert 'Time' to string first, then create join key by removing milliseconds
+    base_df['join_time'] = base_df['Time'].astype(str).str.split('.').str[0]
+    
+    # Create corresponding join key from rpm_base_manual.csv Timestamp column
+    rpm_df['join_time'] = rpm_df['Timestamp']
+    
+    # Perform the join operation
+    merged_df = pd.merge(base_df, rpm_df, on='join_time', how='inner')
+    
+    # Remove the temporary join column
+    merged_df = merged_df.drop('join_time', axis=1)
+    merged_df = merged_df.drop('Time', axis=1, errors='ignore') 
+    return merged_df
+
+def pc_rpm_columns_merge(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge PC RPM columns into a single column.
+    """
+    # Cria a coluna Velocidade fan pc como média dos valores de CPU [RPM] e GPU [RPM]
+    if 'CPU [RPM]' in df.columns and 'GPU [RPM]' in df.columns:
+        df['Velocidade Fan PC'] = df[['CPU [RPM]', 'GPU [RPM]']].mean(axis=1)
+        # Calcula a diferença absoluta entre CPU e GPU RPM
+        df['Diferença fan (abs)'] = (df['CPU [RPM]'] - df['GPU [RPM]']).abs()
+        # Exibe estatísticas básicas da diferença
+        print("Diferença média entre CPU e GPU fan (RPM):", df['Diferença fan (abs)'].mean())
+        print("Diferença máxima:", df['Diferença fan (abs)'].max())
+        print("Diferença mínima:", df['Diferença fan (abs)'].min())
+    else:
+        print("Colunas 'CPU [RPM]' e/ou 'GPU [RPM]' não encontradas no DataFrame.")
+
+    return df
+
+def fix_dataframe_inconsistencies(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fix gaps in the CSV file by:
+    1. Converting timestamps to datetime format
+    2. Filling in missing timestamps (when gap > 1 second) with interpolated rows
+    3. Removing duplicates
+    """
+    # Ensure 'Timestamp' is in datetime format
+    dataframe['Timestamp'] = pd.to_datetime(dataframe['Timestamp'], errors='coerce', format="%H:%M:%S")
+    
+    # Sort by 'Timestamp'
+    dataframe = dataframe.sort_values(by='Timestamp')
+    
+    # Create a list to hold the original and interpolated rows
+    all_rows = []
+    
+    # Process rows to fill gaps
+    for i in range(len(dataframe) - 1):
+        current_row = dataframe.iloc[i].copy()
+        next_row = dataframe.iloc[i+1]
+        
+        all_rows.append(current_row)
+        
+        # Calculate the time difference in seconds
+        time_diff = (next_row['Timestamp'] - current_row['Timestamp']).total_seconds()
+        
+        # If gap is more than 1 second, create interpolated rows
+        if time_diff > 1.0:
+            print(f"Filling gap of {time_diff} seconds between {current_row['Timestamp']} and {next_row['Timestamp']}")
+            for sec in range(1, int(time_diff)):
+                # Create a new row by copying the current row
+                new_row = current_row.copy()
+                
+                # Update Timestamp
+                new_row['Timestamp'] = current_row['Timestamp'] + pd.Timedelta(seconds=sec)
+                
+                # Update relativeTime if it exists (format: MM:SS)
+                if 'relativeTime' in dataframe.columns:
+                    # Parse the relative time
+                    if isinstance(current_row['relativeTime'], str) and ':' in current_row['relativeTime']:
+                        mins, secs = map(int, current_row['relativeTime'].split(':'))
+                        total_secs = mins * 60 + secs + sec
+                        new_mins = total_secs // 60
+                        new_secs = total_secs % 60
+                        new_row['relativeTime'] = f"{new_mins:02d}:{new_secs:02d}"
+                
+                # Reset the index so the new row does not keep the original index
+                new_row = new_row.copy()
+                new_row.name = None  # Remove the index name
+                
+                all_rows.append(new_row)
+    
+    # Add the last row
+    if len(dataframe) > 0:
+        all_rows.append(dataframe.iloc[-1])
+    
+    # Create a new DataFrame from all rows
+    result_df = pd.DataFrame(all_rows)
+
+    # Remove duplicates based on 'Timestamp'
+    result_df = result_df.drop_duplicates(subset='Timestamp')
+    
+    # Sort again to ensure proper order
+    result_df = result_df.sort_values(by='Timestamp')
+    
+    # Reset index to ensure it is sequential
+    result_df = result_df.reset_index(drop=True)
+
+    # Convert 'Timestamp' back to string format HH:MM:SS
+    result_df['Timestamp'] = result_df['Timestamp'].dt.strftime('%H:%M:%S')
+    # result_df.drop(columns=['Unnamed: 294'], inplace=True, errors='ignore')
+
+    result_df.rename(columns={'RPM': 'Velocidade Fan Base'}, inplace=True)
+    
+
+    # # ensure 'relativeTime' is correctly crescent
+    # for i in range(0, len(result_df)-1, 1):
+    #     new_time = i
+    #     new_mins = new_time // 60
+    #     new_secs = new_time % 60
+    #     result_df.at[i, 'relativeTime'] = f"{new_mins:02d}:{new_secs:02d}"
+
+
+    # Use a public approach to deduplicate column names
+    # def deduplicate_columns(cols):
+    #     seen = {}
+    #     new_cols = []
+    #     for col in cols:
+    #         if col not in new_cols:
+    #             seen[col] = 0
+    #             new_cols.append(col)
+    #             # print(f"Column name {col} is unique.")
+    #         else:
+    #             seen[col] += 1
+    #             new_cols.append(f"{col}_{seen[col]}")
+    #             print(f"Duplicate column name found: {col}. Renaming to {new_cols[-1]}")
+    #     return new_cols
+    # result_df.columns = deduplicate_columns(result_df.columns)
+
+    return result_df
+
+def get_intervals_from_df(df: pd.DataFrame) -> list[Interval]:
+    """
+    Extracts the sequential intervals from the 'relativeTime' column of the DataFrame that IsTestRunning is true.
+    Returns a list of Interval objects.
+    """
+    intervals = []
+    
+    start_time = None
+    
+    for i, row in df.iterrows():
+        is_test_running = row['IsTestRunning']
+        relative_time = row['relativeTime']
+        
+
+        # If IsTestRunning is True and we don't have a start time, mark the start
+        if is_test_running and start_time is None:
+            start_time = relative_time
+        
+        # If IsTestRunning is False and we have a start time, mark the end and create interval
+        elif not is_test_running and start_time is not None:
+            # The end time is the previous row's time (last True value)
+            if i > 0:
+                end_time = df.iloc[i]['relativeTime']
+                intervals.append(Interval.from_range_string(f"{start_time} - {end_time}"))
+                print(f"Interval added: {start_time} - {end_time}")
+            start_time = None
+    # Handle case where the DataFrame ends with IsTestRunning = True
+    if start_time is not None:
+        end_time = df.iloc[-1]['relativeTime']
+        intervals.append(Interval.from_range_string(f"{start_time} - {end_time}"))
+        print(f"Final interval added: {start_time} - {end_time}")
+    
+    return intervals
+
+
+def parse_time_strings_to_seconds(series: pd.Series) -> pd.Series:
+    """
+    Converts a Series of time strings in 'M:SS' format to total seconds (as integers).
+    """
+    def convert(time_str):
+        minutes, seconds = time_str.split(":")
+        return int(minutes) * 60 + int(seconds)
+
+    return series.apply(convert)
+
+
+def split_df_by_intervals_as_relative_time(df: pd.DataFrame, intervals: list[Interval], time_col:str) -> list[pd.DataFrame]:
+    """
+    Splits the dataframe into parts based on a list of Interval(start, end).
+    Throws ValueError if there are rows in df[time_col] not covered by any interval.
+    """
+    time_in_seconds = parse_time_strings_to_seconds(df[time_col])
+    time_values = time_in_seconds.values
+
+    chunks = []
+
+    for interval in intervals:
+        start_idx = time_values.searchsorted(interval.start, side='left')
+        end_idx = time_values.searchsorted(interval.end, side='right') - 1
+
+        if start_idx > end_idx:
+            raise ValueError(f"No rows found in interval {interval.start}-{interval.end} seconds.")
+
+        print(f"Interval {interval.start}s to {interval.end}s → rows {start_idx} to {end_idx}")
+        chunks.append(df.iloc[start_idx:end_idx + 1].copy())
+
+    return chunks
+
+
+def predict_with_model(df: pd.DataFrame, output_path: str = None) -> pd.DataFrame:
+    """Predict noise levels using the trained model."""
+    global modelo_poly, transformador_poly
+    
+    if modelo_poly is None or transformador_poly is None:
+        raise ValueError("Modelo polinomial ou transformador não foram definidos.")
+    
+    # Preparar os dados
+    mask = df[['Velocidade Fan Base', 'Velocidade Fan PC']].notnull().all(axis=1)
+    X = df.loc[mask, ['Velocidade Fan Base', 'Velocidade Fan PC']]
+    X_poly = transformador_poly.transform(X)
+    
+    # Prever ruido
+    df['RuidoEstimadoPoly'] = np.nan
+    df.loc[mask, 'RuidoEstimadoPoly'] = np.round(modelo_poly.predict(X_poly), 2)
+
+    # Save predictions to CSV if output path is provided
+    if output_path:
+        df.to_csv(output_path, index=False)
+
+    return df
+
+
+def load_and_clean_csv(csv_path: str, is_train_csv: bool = False) -> pd.DataFrame:
+    """Load and clean CSV data."""
+    df = pd.read_csv(csv_path, encoding='ISO-8859-1', sep=',')
+    
+    # Convert 'Nivel de Ruido' to string first, then replace comma with dot, then convert to float
+    if 'Nivel de Ruido' in df.columns:
+        df['Nivel de Ruido'] = df['Nivel de Ruido'].astype(str).str.replace(',', '.').astype(float)
+    else:
+        if(is_train_csv):
+            raise ValueError("Coluna 'Nivel de Ruido' não encontrada no CSV de treino.")
+
+    if 'Velocidade Fan Base' in df.columns:
+        df['Velocidade Fan Base'] = pd.to_numeric(df['Velocidade Fan Base'], errors='coerce')
+    elif 'RPM' in df.columns:
+        df['Velocidade Fan Base'] = pd.to_numeric(df['RPM'], errors='coerce')
+    else:
+        raise ValueError("Coluna 'Velocidade Fan Base' ou 'RPM' não encontrada no CSV.")
+
+    if 'Velocidade Fan PC' in df.columns:
+        df['Velocidade Fan PC'] = pd.to_numeric(df['Velocidade Fan PC'], errors='coerce')
+    else:
+        raise ValueError("Coluna 'Velocidade Fan PC' não encontrada no CSV.")
+    
+    return df
+
+def split_train_test(df: pd.DataFrame, 
+                    train_values: List[int] = [0, 960, 1530, 1980, 2340],
+                    test_values: List[int] = [600, 1290, 1770, 2190]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split data into training and test sets based on Velocidade Fan Base values."""
+    df_treino = df[df['Velocidade Fan Base'].isin(train_values)].copy()
+    df_teste = df[df['Velocidade Fan Base'].isin(test_values)].copy()
+    
+    print(f"Dataset de treino: {len(df_treino)} amostras")
+    print(f"Dataset de teste: {len(df_teste)} amostras")
+    
+    return df_treino, df_teste
+
+def train_polynomial_regression(df: pd.DataFrame, grau: int = 2) -> Tuple[LinearRegression, PolynomialFeatures, pd.DataFrame]:
+    """Train polynomial regression model."""
+    # Preparar os dados
+    X = df[['Velocidade Fan Base', 'Velocidade Fan PC']].copy()
+    y = df['Nivel de Ruido'].copy()
+
+    # Remover entradas nulas
+    mask = X.notnull().all(axis=1) & y.notnull()
+    X = X[mask]
+    y = y[mask]
+
+    # Criar características polinomiais
+    poly = PolynomialFeatures(degree=grau, include_bias=False)
+    X_poly = poly.fit_transform(X)
+
+    # Regressão
+    model = LinearRegression()
+    model.fit(X_poly, y)
+
+    # Previsões
+    y_pred = model.predict(X_poly)
+
+    # Aplicar ao DataFrame original (onde possível)
+    df['RuidoEstimadoPoly'] = np.nan
+    df.loc[mask, 'RuidoEstimadoPoly'] = y_pred
+
+    return model, poly, df
@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Any, Callable
+
+import pandas as pd
+
+from src.benchmark.generator import DEFAULT_COLUMNS, DEFAULT_CYCLES, cached_logs
+from src.graph.bar_plot import plot_avg_bars
+from src.graph.line_binary_mask_plot import plot_multiple_binary_mask
+from src.graph.line_mask_plot import plot_multiple_masked_segments
+from src.graph.line_plot import plot_multiple_std
+from src.graph.renderer import PlotJob
+from src.implm.merged.columns import MergedCol
+from src.implm.merged.db_math_regression import default_model
+from src.implm.merged.pipeline import get_entries_frame, get_merged_frame, get_splitted_frames
+from src.implm.merged.streaming import FileSink, stream_merged_chunks, stream_to_sink
+from src.implm.output import OutputFormat, check_output_format, write_frame
+from src.interval.entries_frame import EntriesFrame
+from src.instrumentation import configure_logging, get_logger, profiling
+
+log = get_logger(__name__)
+
+dataFolder = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
+DEFAULT_BASELINE = os.path.normpath(os.path.join(dataFolder, 'benchmark_baseline.json'))
+DEFAULT_WORK_FOLDER = os.path.normpath(os.path.join(dataFolder, 'tmp', 'benchmark'))
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_TOLERANCE = 0.25        # A timing regresses when it grows by more than this share of the baseline...
+DEFAULT_MIN_SECONDS = 0.05      # ...and by more than this many seconds (ignores noise of very short stages)
+
+_PLOT_COLUMN = MergedCol.CPU_PERCENTAGE.original
+
+
+def size_arg(text: str) -> int:
+    """Parses a row count such as 1000, 1e6 or 10_000."""
+    rows = int(float(text.replace('_', '')))
+    if rows < 1:
+        raise argparse.ArgumentTypeError(f"invalid size: {text}")
+    return rows
+
+
+def run_step(timings: dict[str, float], name: str, fn: Callable[[], Any]) -> Any:
+    """
+    Runs fn under its own profiler and stores its wall time as timings[name], plus the time of
+    every pipeline stage it ran as timings['name/stage']. Returns the result of fn.
+    """
+    with profiling(memory=False, log_summary=False) as profiler:
+        start = time.perf_counter()
+        result = fn()
+        timings[name] = time.perf_counter() - start
+    for entry in profiler.summary():
+        timings[f"{name}/{entry['stage']}"] = entry['seconds']
+    return result
+
+
+def plot_jobs(frame: EntriesFrame, output_folder: str) -> list[PlotJob]:
+    """
+    One job per plot function, drawing the CPU usage of every case of frame as the entry points do.
+    """
+    y_series_list = frame.get_series(_PLOT_COLUMN)
+    x_series = pd.Series(range(len(y_series_list[0])))
+    labels = [f"caso {i + 1}" for i in range(len(y_series_list))]
+    # Above or below the mean of every case, so the masks change along the line
+    mask = y_series_list[0] > y_series_list[0].mean()
+    common = dict(x_series=x_series, y_series_list=y_series_list, x_label='Segundos', y_label='Cpu %', title='Cpu % por segundo')
+
+    def output(name: str) -> str:
+        return os.path.join(output_folder, f"{name}.png")
+
+    return [
+        PlotJob(plot_multiple_std, labels=labels, output=output('line'), **common),
+        PlotJob(plot_multiple_std, labels=labels, output=output('line_band'),
+                band=frame.stats([_PLOT_COLUMN]).band(_PLOT_COLUMN, kind='ci'), band_label='média (IC 95%)', **common),
+        PlotJob(plot_multiple_binary_mask, mask=mask, output=output('binary_mask'), **common),
+        PlotJob(plot_multiple_masked_segments, mask=mask, output=output('masked_segments'), **common),
+        PlotJob(plot_avg_bars, y_series_list=y_series_list, labels=labels, output=output('bars'), y_label='Cpu %',
+                title='Cpu % medio por caso'),
+    ]
+
+
+def benchmark_size(rows: int, work_folder: str, cycles: int = DEFAULT_CYCLES, columns: int = DEFAULT_COLUMNS, seed: int = 0,
+                   plots: bool = True) -> dict[str, float]:
+    """
+    Times every pipeline stage and plot function on a synthetic session of rows HWiNFO rows.
+
+    The logs are generated into work_folder on the first run and reused afterwards (see cached_logs).
+    The noise model is loaded before timing starts.
+
+    Returns:
+    - Dict of seconds per step ('merge', 'split', ...) and per stage of each step ('merge/read', ...).
+    """
+    hw_info_csv, java_csv = cached_logs(work_folder, rows, cycles=cycles, columns=columns, seed=seed)
+    output_folder = os.path.join(os.path.dirname(hw_info_csv), 'output')
+    cache_folder = os.path.join(output_folder, 'cache')
+    shutil.rmtree(output_folder, ignore_errors=True)
+    os.makedirs(output_folder)
+    model = default_model()
+
+    timings: dict[str, float] = {}
+    df = run_step(timings, 'merge', lambda: get_merged_frame(
+        hw_info_csv, java_csv, output_final_file=os.path.join(output_folder, 'merged_data.csv'), projected=True,
+        cache_dir=cache_folder, model=model))
+    # merge saved merged_data.csv already: the same frame is skipped, then written in a binary format
+    run_step(timings, 'write unchanged', lambda: write_frame(df, os.path.join(output_folder, 'merged_data.csv')))
+    try:
+        check_output_format(OutputFormat.PARQUET)
+    except ValueError as e:
+        log.warning("Skipping 'write parquet': %s", e)
+    else:
+        run_step(timings, 'write parquet', lambda: write_frame(df, os.path.join(output_folder, 'merged_data.parquet'), fmt=OutputFormat.PARQUET))
+    run_step(timings, 'cached merge', lambda: get_merged_frame(hw_info_csv, java_csv, projected=True, cache_dir=cache_folder, model=model))
+    run_step(timings, 'stream', lambda: stream_to_sink(
+        stream_merged_chunks(hw_info_csv, java_csv, model=model), FileSink(os.path.join(output_folder, 'streamed_data.csv'))))
+    run_step(timings, 'split', lambda: get_splitted_frames(df))
+    frame = run_step(timings, 'entries frame', lambda: get_entries_frame(df))
+    run_step(timings, 'stats', lambda: frame.stats())
+
+    if plots:
+        for job in plot_jobs(frame, output_folder):
+            name = os.path.splitext(os.path.basename(job.output))[0]
+            run_step(timings, f"plot/{name}", lambda: job.plot_fn(**job.kwargs))
+    return timings
+
+
+def find_regressions(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+                     tolerance: float = DEFAULT_TOLERANCE, min_seconds: float = DEFAULT_MIN_SECONDS) -> list[dict]:
+    """
+    Compares results with baseline (both {size: {timing name: seconds}}) and returns one row per
+    timing found in both, with 'regressed' set when it grew by more than tolerance (a share of the
+    baseline) and by more than min_seconds.
+    """
+    rows = []
+    for size, timings in results.items():
+        for name, seconds in timings.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            rows.append({
+                'size': size,
+                'timing': name,
+                'baseline': base,
+                'seconds': seconds,
+                'ratio': seconds / base if base > 0 else float('inf'),
+                'regressed': seconds > base * (1 + tolerance) and seconds - base > min_seconds,
+            })
+    return rows
+
+
+def format_results(results: dict[str, dict[str, float]], comparison: list[dict]) -> str:
+    """Console table of the timings of every size, with the baseline and ratio when there is one."""
+    compared = {(row['size'], row['timing']): row for row in comparison}
+    lines = [f"{'size':>9} {'timing':<32} {'seconds':>9} {'baseline':>9} {'ratio':>7}"]
+    for size, timings in results.items():
+        for name, seconds in timings.items():
+            row = compared.get((size, name))
+            base = '' if row is None else f"{row['baseline']:.3f}"
+            ratio = '' if row is None else f"{row['ratio']:.2f}"
+            flag = '  REGRESSION' if row is not None and row['regressed'] else ''
+            lines.append(f"{size:>9} {name:<32} {seconds:>9.3f} {base:>9} {ratio:>7}{flag}")
+    return "\n".join(lines)
+
+
+def load_baseline(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def store_baseline(path: str, settings: dict, results: dict[str, dict[str, float]]):
+    """Saves results as the baseline, keeping the timings of an existing baseline with the same settings that were not run."""
+    existing = load_baseline(path)
+    sizes = existing['sizes'] if existing is not None and existing.get('settings') == settings else {}
+    for size, timings in results.items():
+        sizes.setdefault(size, {}).update(timings)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump({'settings': settings, 'sizes': dict(sorted(sizes.items(), key=lambda item: int(item[0])))}, file, indent=2)
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Runs the suite and compares it with the baseline.
+    Returns 1 when a timing regressed (or the baseline was recorded with other settings), 0 otherwise.
+    """
+    settings = {'cycles': args.cycles, 'columns': args.columns, 'seed': args.seed}
+    results: dict[str, dict[str, float]] = {}
+    for rows in args.sizes:
+        print(f"Benchmarking {rows} rows...")
+        runs = [benchmark_size(rows, args.work_folder, cycles=args.cycles, columns=args.columns, seed=args.seed, plots=not args.no_plots)
+                for _ in range(args.repeat)]
+        # The fastest run of each timing is the least disturbed by the rest of the machine
+        results[str(rows)] = {name: min(run[name] for run in runs) for name in runs[0]}
+
+    baseline = load_baseline(args.baseline)
+    comparison = []
+    status = 0
+    if baseline is not None and baseline.get('settings') != settings:
+        print(f"Baseline {args.baseline} was recorded with other settings ({baseline.get('settings')}), not comparing.")
+        status = 0 if args.update_baseline else 1
+    elif baseline is not None:
+        comparison = find_regressions(results, baseline['sizes'], tolerance=args.tolerance, min_seconds=args.min_seconds)
+
+    print(format_results(results, comparison))
+
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+        with open(args.report, 'w') as file:
+            json.dump({'settings': settings, 'sizes': results, 'comparison': comparison}, file, indent=2)
+        print(f"Results saved to {args.report}")
+
+    if args.update_baseline:
+        store_baseline(args.baseline, settings, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = [row for row in comparison if row['regressed']]
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+    elif regressions:
+        print(f"{len(regressions)} timing(s) regressed by more than {args.tolerance:.0%} and {args.min_seconds}s.")
+        status = 1
+    return status
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time every pipeline stage and plot function on synthetic logs of growing size")
+    parser.add_argument('--sizes', type=size_arg, nargs='+', default=DEFAULT_SIZES, metavar='ROWS',
+                        help="HWiNFO rows of each benchmarked session, e.g. 1e3 1e5 1e7 (default: 1e3 1e4 1e5)")
+    parser.add_argument('--cycles', type=int, default=DEFAULT_CYCLES, help=f"Test cycles per session (default: {DEFAULT_CYCLES})")
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS, help=f"HWiNFO columns (default: {DEFAULT_COLUMNS})")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the generated logs (default: 0)")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per size; the fastest time of each stage is kept (default: 1)")
+    parser.add_argument('--no-plots', action='store_true', help="Skip the plot functions")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file (default: data/benchmark_baseline.json)")
+    parser.add_argument('--update-baseline', action='store_true', help="Save the results as the new baseline instead of failing on regressions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown as a share of the baseline (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                        help=f"Slowdowns below this many seconds never fail (default: {DEFAULT_MIN_SECONDS})")
+    parser.add_argument('--report', default=None, help="Also save the results and comparison to this JSON file")
+    parser.add_argument('--work-folder', default=DEFAULT_WORK_FOLDER, help="Folder of the generated logs (default: data/tmp/benchmark)")
+    parser.add_argument('--log-level', default='WARNING', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="Console log level of the pipeline (default: WARNING)")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_logging(args.log_level)
+    sys.exit(run(args))
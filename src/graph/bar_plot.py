@@ -1,5 +1,9 @@
-import matplotlib.pyplot as plt
 import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
 
 def plot_avg_bars(
     y_series_list: list[pd.Series],
@@ -16,11 +20,14 @@ def plot_avg_bars(
     if labels is None:
         labels = [f"Series {i+1}" for i in range(len(y_series_list))]
 
-    plt.figure(figsize=(10, 5))
-    plt.bar(labels, averages, color='skyblue')
-    plt.ylabel(y_label)
-    plt.title(title)
-    plt.grid(axis='y')
-    plt.tight_layout()
-    print(output)
-    plt.savefig(output)
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar(labels, averages, color='skyblue')
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    ax.grid(axis='y')
+    fig.tight_layout()
+    log.info("Saving %s", output)
+    fig.savefig(output)
+    fig.clear()
@@ -1,6 +1,12 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from src.graph.segments import plot_segments_by_codes
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
 
 
 def plot_multiple_binary_mask(
@@ -23,10 +29,13 @@ def plot_multiple_binary_mask(
     If group_col is specified, plots one line per group.
     """
 
-    plt.figure(figsize=(15, 5))
+    fig = Figure(figsize=(15, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
     
     for i, y_series in enumerate(y_series_list):
         plot_colored_by_binary_mask(
+            ax=ax,
             x=x_series, 
             y=y_series, 
             mask=mask, 
@@ -36,25 +45,27 @@ def plot_multiple_binary_mask(
             color_false=color_false
         )
 
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
-    plt.title(title)
-    plt.grid(True)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    ax.grid(True)
     
     
     if y_min is not None and y_max is not None:
-        plt.ylim(y_min, y_max)
+        ax.set_ylim(y_min, y_max)
         
     
-    plt.legend(loc='upper right')  # simple, top right inside
+    ax.legend(loc='upper right')  # simple, top right inside
     
-    plt.tight_layout()
-    print(output)
-    plt.savefig(output)
+    fig.tight_layout()
+    log.info("Saving %s", output)
+    fig.savefig(output)
+    fig.clear()
 
 
 
 def plot_colored_by_binary_mask(
+    ax: Axes,
     x: pd.Series, 
     y: pd.Series, 
     mask: pd.Series, 
@@ -62,73 +73,24 @@ def plot_colored_by_binary_mask(
     label_false='Inactive', 
     color_true: str = 'green',
     color_false: str = 'red',
-    **kwargs # Additional _plot_segment args
+    **kwargs # Additional LineCollection args
 ):
     """
     Plots a line where the color changes based on a boolean mask.
     True → one color, False → another.
+    The whole line is drawn as a single segment collection.
     """
     assert len(x) == len(y) == len(mask), "All series must be the same length"
     
+    # Code 0 is False, code 1 is True
+    codes = np.asarray(mask, dtype=bool).astype(np.intp)
     
-    # Plot consecutive segments with same mask value
-    start = 0
-    current = mask.iloc[0]
-    
-    for i in range(1, len(mask)):
-        if mask.iloc[i] != current:
-            # Plot the previous segment
-            _plot_segment(
-                x[start:i+1], 
-                y[start:i+1], 
-                current, 
-                label_true, 
-                label_false, 
-                color_true, 
-                color_false, 
-                **kwargs
-            )
-            start = i
-            current = mask.iloc[i]
-
-    # Plot the last segment
-    _plot_segment(
-        x[start:], 
-        y[start:], 
-        current, 
-        label_true, 
-        label_false,  
-        color_true, 
-        color_false, 
-        **kwargs
-    )
-    
-
-
-
-def _plot_segment(
-    x: pd.Series, 
-    y: pd.Series, 
-    is_true: bool, 
-    label_true: str, 
-    label_false: str, 
-    color_true: str, 
-    color_false:str, 
-    **kwargs
-):
-    """
-    Plots a single segment of a time series with the appropriate color and legend label.
-    """
-    color = color_true if is_true else color_false
-    label = label_true if is_true else label_false
-    
-    plt.plot(
-        x, y, 
-        color=color, 
-        # Only add new labels if they dont exist yet 
-        label=label if not plt.gca().get_legend_handles_labels()[1].count(label) else None, 
+    plot_segments_by_codes(
+        ax,
+        np.asarray(x),
+        np.asarray(y),
+        codes,
+        colors=[color_false, color_true],
+        labels=[label_false, label_true],
         **kwargs
     )
-    
-
-
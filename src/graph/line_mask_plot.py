@@ -1,8 +1,15 @@
 from typing import Callable, Any
-import matplotlib.pyplot as plt
+import logging
 import pandas as pd
 import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from src.graph.color import *
+from src.graph.segments import plot_segments_by_codes
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
 
 def plot_multiple_masked_segments(
     x_series: pd.Series,
@@ -24,40 +31,44 @@ def plot_multiple_masked_segments(
         mask_color_fn: A function that maps each mask value to a Color enum.
         mask_label_fn: A function that maps each mask value to a human-readable label.
     """
-    plt.figure(figsize=(15, 5))
+    fig = Figure(figsize=(15, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
 
-    print("x:", x_series.shape)
-    print("First 5 x:", x_series.head())
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("x: %s", x_series.shape)
+        log.debug("First 5 x: %s", x_series.head())
 
-    for i, y in enumerate(y_series_list):
-        print(f"y[{i}] shape:", y.shape)
-        print(f"First 5 y[{i}]:", y.head())
+        for i, y in enumerate(y_series_list):
+            log.debug("y[%d] shape: %s", i, y.shape)
+            log.debug("First 5 y[%d]: %s", i, y.head())
 
-    print("mask:", mask.shape)
-    print("Unique mask values:", mask.unique())
+        log.debug("mask: %s", mask.shape)
+        log.debug("Unique mask values: %s", mask.unique())
 
 
     for y_series in y_series_list:
         _plot_categorical_mask_segments(
-            x_series, y_series, mask, mask_color_fn, mask_label_fn
+            ax, x_series, y_series, mask, mask_color_fn, mask_label_fn
         )
 
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
-    plt.title(title)
-    plt.grid(True)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    ax.grid(True)
 
     if y_min is not None and y_max is not None:
-        plt.ylim(y_min, y_max)
+        ax.set_ylim(y_min, y_max)
 
-    plt.legend(loc='upper right')
-    plt.tight_layout()
-    print(f"Saved to {output}")
-    plt.savefig(output)
-    plt.close()
+    ax.legend(loc='upper right')
+    fig.tight_layout()
+    log.info("Saved to %s", output)
+    fig.savefig(output)
+    fig.clear()
 
 
 def _plot_categorical_mask_segments(
+    ax: Axes,
     x: pd.Series,
     y: pd.Series,
     mask: pd.Series,
@@ -67,57 +78,18 @@ def _plot_categorical_mask_segments(
 ):
     """
     Plot y over x, segmenting and coloring by the value in mask.
+    Colors and labels are computed once per distinct mask value and the line is drawn as a single segment collection.
     """
     assert len(x) == len(y) == len(mask), "All series must be the same length"
 
+    codes, values = pd.factorize(pd.Series(mask), use_na_sentinel=False)
 
-    start = 0
-    current_value = mask.iloc[0]
-
-    for i in range(1, len(mask)):
-        if mask.iloc[i] != current_value:
-            #print(f"Segment: {start} to {i}, value: {current_value}")
-            _plot_segment_by_value(
-                x[start:i+1],
-                y[start:i+1],
-                current_value,
-                color_fn,
-                label_fn,
-                **kwargs
-            )
-            start = i
-            current_value = mask.iloc[i]
-
-    _plot_segment_by_value(
-        x[start:], y[start:], current_value, color_fn, label_fn, **kwargs
-    )
-    
-
-
-def _plot_segment_by_value(
-    x: pd.Series,
-    y: pd.Series,
-    value: Any,
-    color_fn: Callable[[Any], Color],
-    label_fn: Callable[[Any], str],
-    **kwargs
-):
-    """
-    Plot a single segment of the time series with appropriate color and legend label.
-    """
-    color = str(color_fn(value))
-    label = label_fn(value)
-
-    existing_labels = plt.gca().get_legend_handles_labels()[1]
-
-    print(x)
-    print(y)
-    print(color)
-    plt.plot(
-        x,
-        y,
-        color=color,
-        label=label if label not in existing_labels else None,
+    plot_segments_by_codes(
+        ax,
+        np.asarray(x),
+        np.asarray(y),
+        codes,
+        colors=[str(color_fn(value)) for value in values],
+        labels=[label_fn(value) for value in values],
         **kwargs
     )
-    
@@ -1,5 +1,9 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
 
 
 def plot_multiple_std(
@@ -11,37 +15,48 @@ def plot_multiple_std(
     y_label: str, 
     title: str,
     y_min: float | None = None,
-    y_max: float | None = None
+    y_max: float | None = None,
+    band: tuple[pd.Series, pd.Series, pd.Series] | None = None,
+    band_label: str | None = None
 ):
     """
     Plots time series data.
     If group_col is specified, plots one line per group.
+    If band is given as (center, low, high), e.g. from CaseStats.band, the center line is drawn
+    over a shaded area from low to high.
     """
 
-    plt.figure(figsize=(15, 5))
+    fig = Figure(figsize=(15, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
     
     for i, y_series in enumerate(y_series_list):
         if labels is None:
-            plt.plot(x_series, y_series)
+            ax.plot(x_series, y_series)
         else:
-            plt.plot(x_series, y_series, label=labels[i])
+            ax.plot(x_series, y_series, label=labels[i])
+
+    if band is not None:
+        center, low, high = band
+        ax.fill_between(x_series, low, high, color='gray', alpha=0.3, linewidth=0)
+        ax.plot(x_series, center, color='black', linewidth=1.5, label=band_label)
 
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
-    plt.title(title)
-    plt.grid(True)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    ax.grid(True)
     
     
     if y_min is not None and y_max is not None:
-        plt.ylim(y_min, y_max)
+        ax.set_ylim(y_min, y_max)
         
-    if labels is not None:
-        plt.legend(loc='upper right')  # simple, top right inside
+    if labels is not None or band_label is not None:
+        ax.legend(loc='upper right')  # simple, top right inside
     
-    plt.tight_layout()
-    print(output)
-    plt.savefig(output)
-
+    fig.tight_layout()
+    log.info("Saving %s", output)
+    fig.savefig(output)
+    fig.clear()
 
 
 
@@ -0,0 +1,61 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
+
+
+class PlotJob:
+    """
+    A plot function together with the keyword arguments it is called with.
+    The function must be defined at module level (e.g. plot_multiple_std) so it can be sent to worker processes.
+    """
+
+    def __init__(self, plot_fn: Callable[..., Any], **kwargs):
+        self.plot_fn = plot_fn
+        self.kwargs = kwargs
+
+    @property
+    def output(self) -> str:
+        return self.kwargs.get('output') or self.kwargs.get('img_path', '')
+
+    def __repr__(self):
+        return f"PlotJob({self.plot_fn.__name__}, output={self.output!r})"
+
+
+def _render_job(job: PlotJob) -> tuple[str, float, str | None]:
+    start = time.perf_counter()
+    try:
+        job.plot_fn(**job.kwargs)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return job.output, time.perf_counter() - start, error
+
+
+def render_plot_jobs(jobs: list[PlotJob], workers: int | None = None, log_in_terminal: bool = True) -> list[tuple[str, float, str | None]]:
+    """
+    Renders a batch of plot jobs in parallel worker processes.
+
+    Every plot function builds its own Figure on the Agg canvas and frees it after saving,
+    so no pyplot state is shared between jobs.
+
+    :param jobs: Plot jobs to render.
+    :param workers: Maximum number of worker processes. With 1 the jobs are rendered in this process.
+    :param log_in_terminal: Print the render time of each plot.
+    :return: List of (output, seconds, error) in the order of jobs; error is None on success.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        results = [_render_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_render_job, jobs))
+
+    if log_in_terminal:
+        for output, elapsed, error in results:
+            status = f"FAILED ({error})" if error else f"{elapsed:.3f}s"
+            log.info("Rendered %s: %s", output, status)
+
+    return results
@@ -0,0 +1,63 @@
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.lines import Line2D
+
+
+def _accepts(artist: type, key: str) -> bool:
+    return hasattr(artist, f"set_{key}")
+
+
+def plot_segments_by_codes(
+    ax: Axes,
+    x: np.ndarray,
+    y: np.ndarray,
+    codes: np.ndarray,
+    colors: list[str],
+    labels: list[str],
+    **kwargs
+):
+    """
+    Plots y over x as a single LineCollection, coloring each segment by an integer code.
+
+    The segment between point i and i+1 takes the color of codes[i], so a run of equal codes
+    ends on the first point of the next run, without gaps in the line.
+    Legend entries are added once per code present, skipping labels the Axes already has.
+
+    kwargs are the ones of Axes.plot. The segments get those LineCollection accepts (linewidth,
+    linestyle, alpha...) and the legend entries those Line2D accepts. Marker options, which only
+    Line2D has, draw the points in the color of their code.
+
+    :param codes: Integer array (same length as x) indexing colors and labels.
+    :param colors: Matplotlib color of each code.
+    :param labels: Legend label of each code.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    codes = np.asarray(codes)
+
+    # Unknown options stay with the collection, so they raise as they would in Axes.plot
+    marker_kwargs = {key: value for key, value in kwargs.items() if _accepts(Line2D, key) and not _accepts(LineCollection, key)}
+    collection_kwargs = {key: value for key, value in kwargs.items() if key not in marker_kwargs}
+    line_kwargs = {key: value for key, value in kwargs.items() if _accepts(Line2D, key)}
+
+    if len(x) > 1:
+        points = np.column_stack((x, y))
+        segments = np.stack((points[:-1], points[1:]), axis=1)
+        collection = LineCollection(segments, colors=to_rgba_array(colors)[codes[:-1]], **collection_kwargs)
+        ax.add_collection(collection)
+        ax.autoscale_view()
+
+    if marker_kwargs.get('marker') not in (None, '', 'None', 'none'):
+        for code in np.unique(codes):
+            mask = codes == code
+            ax.plot(x[mask], y[mask], linestyle='none', color=colors[code], **marker_kwargs)
+
+    # Legend entries follow the order in which the codes first appear
+    _, first_index = np.unique(codes, return_index=True)
+    existing_labels = set(ax.get_legend_handles_labels()[1])
+    for code in codes[np.sort(first_index)]:
+        if labels[code] not in existing_labels:
+            ax.plot([], [], color=colors[code], label=labels[code], **line_kwargs)
+            existing_labels.add(labels[code])
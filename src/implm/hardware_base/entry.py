@@ -1,10 +1,16 @@
+import argparse
 
 import src.implm.hardware_base.pipeline as pipeline
 import src.implm.hardware_base.graph_implm as graph_implm
 import pandas as pd
 
+from src.implm.output import OutputFormat
 from src.interval.interval import Interval
 from src.interval.entries_frame import EntriesFrame
+from src.graph.renderer import PlotJob, render_plot_jobs
+from src.instrumentation import Stage, add_instrumentation_args, configure_logging, get_logger, profiling, stage
+
+log = get_logger(__name__)
 
 
 
@@ -22,12 +28,34 @@ input_csv_path = 'data_sem_base/sem_base.csv'
 output_prefix = 'example/sem_base/case'
 
         
+def run(output_format:OutputFormat = OutputFormat.CSV):
+    frame:EntriesFrame = pipeline.get_entries_frame(input_csv_path, intervals, output_prefix, output_format=output_format)
+    log.debug("%s", frame.frames)
+    
+    # Computed once here, the plot jobs receive the frame with its statistics cache
+    frame.stats()
+    jobs = [
+        PlotJob(graph_implm.plot_cpu_percentage, frame=frame, img_path='example/graph_sem_base.png'),
+        PlotJob(graph_implm.plot_cpu_percentage_band, frame=frame, img_path='example/graph_sem_base_band.png'),
+        PlotJob(graph_implm.test_plot_with_color, frame=frame, img_path='example/graph_sem_base_cor.png'),
+        PlotJob(graph_implm.test_bar_avg, frame=frame, img_path='example/graph_sem_base_bar.png'),
+    ]
+    with stage(Stage.PLOT, rows_in=len(jobs)) as s:
+        results = render_plot_jobs(jobs)
+        s.rows_out = sum(1 for _, _, error in results if error is None)
+
+
 if __name__ == '__main__':  
-    frame:EntriesFrame = pipeline.get_entries_frame(input_csv_path, intervals, output_prefix)
-    print(frame.frames)
-    graph_implm.plot_cpu_percentage(frame, 'example/graph_sem_base.png')
-    graph_implm.test_plot_with_color(frame, 'example/graph_sem_base_cor.png')
-    graph_implm.test_bar_avg(frame, 'example/graph_sem_base_bar.png')
-    graph_implm.test_plot_all_cases(frame, 'example/graph_sem_base_all_cases.png')
+    parser = argparse.ArgumentParser(description="Split and plot the hardware base example")
+    parser.add_argument('--output-format', default=OutputFormat.CSV.value, choices=[fmt.value for fmt in OutputFormat], help="File format of the saved cases (default: csv)")
+    add_instrumentation_args(parser)
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    if args.profile or args.cprofile:
+        with profiling(report_path=args.profile, cprofile_path=args.cprofile):
+            run(OutputFormat(args.output_format))
+    else:
+        run(OutputFormat(args.output_format))
 
     
\ No newline at end of file
@@ -8,10 +8,13 @@ from src.interval.entries_frame import EntriesFrame
 from src.graph.line_plot import plot_multiple_std
 from src.graph.line_binary_mask_plot import plot_multiple_binary_mask
 from src.graph.bar_plot import plot_avg_bars
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
 
 def plot_cpu_percentage(frame:EntriesFrame, img_path:str):
     y_series_list = frame.get_series(BaseCol.CPU_PERCENTAGE.standard)
-    print(y_series_list)
+    log.debug("%s", y_series_list)
     x_series = pd.Series(range(len(y_series_list[0])))
     
     plot_multiple_std(
@@ -26,6 +29,25 @@ def plot_cpu_percentage(frame:EntriesFrame, img_path:str):
         y_max=100
     )
     
+def plot_cpu_percentage_band(frame:EntriesFrame, img_path:str):
+    column = BaseCol.CPU_PERCENTAGE.standard
+    y_series_list = frame.get_series(column)
+    x_series = pd.Series(range(len(y_series_list[0])))
+    
+    plot_multiple_std(
+        y_series_list= y_series_list,
+        x_series = x_series,
+        labels=['caso 1', 'caso 2', 'caso 3', 'caso 4'],
+        output=img_path,
+        x_label='Segundos',
+        y_label='Cpu %',
+        title='Cpu % por segundo',
+        y_min=30,
+        y_max=100,
+        band=frame.stats([column]).band(column, kind='ci'),
+        band_label='média (IC 95%)'
+    )
+    
 def test_plot_with_color(frame:EntriesFrame, img_path:str):
     y_series_list = frame.get_series(BaseCol.CPU_PERCENTAGE.standard)
     x_series = pd.Series(range(len(y_series_list[0])))
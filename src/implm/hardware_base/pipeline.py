@@ -9,16 +9,21 @@ import os
 
 
 from src.implm.hardware_base.columns import BaseCol
-from src.interval.split_frame import split_df_by_intervals_as_index
+from src.implm.output import OutputFormat, write_frames
 from src.interval.entries_frame import EntriesFrame
 from src.interval.interval import Interval
+from src.instrumentation import Stage, get_logger, stage
+
+log = get_logger(__name__)
 
 
 def read_csv(base_csv_path:str) -> pd.DataFrame:
-    print(base_csv_path)
+    log.info("Reading %s", base_csv_path)
     # Read both CSV files
     try:
-        dataframe = pd.read_csv(base_csv_path, index_col=False, usecols=BaseCol.original_names())
+        with stage(Stage.READ) as s:
+            dataframe = pd.read_csv(base_csv_path, index_col=False, usecols=BaseCol.original_names())
+            s.rows_out = len(dataframe)
         
     except pd.errors.EmptyDataError:
         raise ValueError("The provided CSV file is empty")
@@ -47,22 +52,33 @@ def read_csv(base_csv_path:str) -> pd.DataFrame:
 
 
 
-def get_entries_frame(base_csv_path:str, intervals:list[Interval], output_prefix:str|None) -> EntriesFrame:
+def get_entries_frame(base_csv_path:str, intervals:list[Interval], output_prefix:str|None, output_format:OutputFormat = OutputFormat.CSV,
+                      workers:int | None = None) -> EntriesFrame:
+    """
+    Split the HWiNFO CSV file into one case per interval.
+    
+    Parameters:
+    - base_csv_path: Path to the HWiNFO CSV file.
+    - intervals: Relative time intervals of the cases.
+    - output_prefix: When set, every case is saved as {output_prefix}{n} and the whole file as
+      {output_prefix}_original, with the extension of output_format. Unchanged files are not written again.
+    - output_format: File format of the saved frames (see OutputFormat).
+    - workers: Maximum number of threads writing the files.
+    
+    Returns:
+    - EntriesFrame with one case per interval.
+    """
     df:pd.DataFrame = read_csv(base_csv_path)
-    frames:list[pd.DataFrame] = split_df_by_intervals_as_index(df, intervals)
+    with stage(Stage.SPLIT, rows_in=len(df)) as s:
+        frame = EntriesFrame.from_intervals(df, intervals)
+        s.rows_out = frame.values.shape[0] * frame.values.shape[1]
     
     if (output_prefix is not None):
-        for i, chunk in enumerate(frames):
-            output_path = f"{output_prefix}{i+1}.csv"
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)  # Ensure folder exists
-            chunk.to_csv(output_path, index=False)
-        
-        output_path = f"{output_prefix}_original.csv"
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)  # Ensure folder exists
-        df.to_csv(output_path, index=False)
-
-    return EntriesFrame(frames)
-
-
+        with stage(Stage.WRITE, rows_in=frame.values.shape[0] * frame.values.shape[1] + len(df)) as s:
+            outputs = {f"{output_prefix}{i+1}{output_format.extension}": chunk for i, chunk in enumerate(frame.frames)}
+            outputs[f"{output_prefix}_original{output_format.extension}"] = df
+            written = write_frames(outputs, fmt=output_format, workers=workers)
+            s.rows_out = sum(len(outputs[path]) for path in written)
+        log.info("Saved %d of %d file(s) to %s (the others did not change)", len(written), len(outputs), Path(output_prefix).parent)
 
-    
\ No newline at end of file
+    return frame
@@ -0,0 +1,150 @@
+import hashlib
+import importlib.util
+import json
+import os
+import pandas as pd
+
+from src.implm.merged.columns import MergedCol
+
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024
+# Bump when merge, gap fill or prediction change the output for the same inputs and parameters,
+# so entries written by older code are never served (2: EXACT join on parsed seconds, gap fill
+# anchored on 'Date'; 3: EXACT join kept in the HWiNFO order, gap fill sorted stably)
+CACHE_VERSION = 3
+
+
+def cache_format() -> str:
+    """
+    Returns the file extension of the binary format used by the cache.
+    Parquet is used when pyarrow is installed, otherwise pandas' pickle format.
+    """
+    return 'parquet' if importlib.util.find_spec('pyarrow') is not None else 'pkl'
+
+
+def file_hash(path: str, block_size: int = 1 << 20, size: int | None = None) -> str:
+    """
+    Returns the sha256 hex digest of a file content, or of its first size bytes.
+    """
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            block = f.read(block_size if remaining is None else min(block_size, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def cache_key(hw_info_csv: str, java_csv: str, **params) -> str:
+    """
+    Builds the cache key of a merged run.
+
+    The key covers CACHE_VERSION, the content of both input files, the MergedCol schema and any
+    extra parameters that change the result (model fingerprint, fill policy...).
+    """
+    payload = {
+        'version': CACHE_VERSION,
+        'hw_info': file_hash(hw_info_csv),
+        'java': file_hash(java_csv),
+        'schema': [col.value for col in MergedCol],
+        'params': {name: str(value) for name, value in sorted(params.items())},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _cache_files(cache_dir: str) -> list[str]:
+    if not os.path.isdir(cache_dir):
+        return []
+    return [
+        os.path.join(cache_dir, file) for file in os.listdir(cache_dir)
+        if file.endswith(('.parquet', '.pkl'))
+    ]
+
+
+def load_cached_frame(cache_dir: str, key: str) -> pd.DataFrame | None:
+    """
+    Loads the cached frame stored under key, or returns None on a cache miss.
+    A hit refreshes the entry modification time, which is used as the LRU clock.
+    """
+    for ext in ('parquet', 'pkl'):
+        path = os.path.join(cache_dir, f"{key}.{ext}")
+        if not os.path.exists(path):
+            continue
+        if ext == 'parquet' and cache_format() != 'parquet':
+            continue
+
+        df = pd.read_parquet(path) if ext == 'parquet' else pd.read_pickle(path)
+        os.utime(path)
+        return df
+
+    return None
+
+
+def store_cached_frame(cache_dir: str, key: str, df: pd.DataFrame, max_bytes: int = DEFAULT_MAX_CACHE_BYTES) -> str:
+    """
+    Stores the frame under key and evicts the least recently used entries above max_bytes.
+    Returns the path of the stored entry.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    ext = cache_format()
+    path = os.path.join(cache_dir, f"{key}.{ext}")
+    tmp_path = f"{path}.tmp"
+
+    if ext == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+    evict_cache(cache_dir, max_bytes, keep=path)
+    return path
+
+
+def evict_cache(cache_dir: str, max_bytes: int, keep: str | None = None) -> list[str]:
+    """
+    Removes the least recently used entries until the cache fits in max_bytes.
+    Returns the list of removed files.
+    """
+    # Other processes may store or evict entries at the same time, so vanished files are skipped
+    entries = []
+    for file in _cache_files(cache_dir):
+        try:
+            stat = os.stat(file)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, file))
+
+    total = sum(size for _, size, _ in entries)
+    removed = []
+
+    for _, size, file in sorted(entries):
+        if total <= max_bytes:
+            break
+        if file == keep:
+            continue
+        total -= size
+        try:
+            os.remove(file)
+            removed.append(file)
+        except FileNotFoundError:
+            pass
+
+    return removed
+
+
+def invalidate_cache(cache_dir: str, key: str | None = None) -> int:
+    """
+    Removes the entry stored under key, or every entry when key is None.
+    Returns the number of removed files.
+    """
+    files = _cache_files(cache_dir)
+    if key is not None:
+        files = [file for file in files if os.path.basename(file).split('.')[0] == key]
+
+    for file in files:
+        os.remove(file)
+
+    return len(files)
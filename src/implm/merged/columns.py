@@ -48,6 +48,30 @@ class MergedCol(Enum):
             MergedCol.RPM,
         ]
         
+    @staticmethod
+    def hardware_read_columns() -> list[str]:
+        """Returns the raw HWiNFO column names the merged pipeline needs to read from the log."""
+        return (
+            [JOIN_BASE_DATE]
+            + [col.original for col in MergedCol.hardware_columns() if col is not MergedCol.RPM]
+            + PC_FAN_RPM_COLUMNS
+        )
+
+    @staticmethod
+    def hardware_dtypes(columns: list[str]) -> dict[str, str]:
+        """Returns compact dtypes for the given raw HWiNFO columns (text for date/time, float32 for sensors)."""
+        return {col: 'str' if col in (JOIN_BASE_DATE, JOIN_BASE_TIMESTAMP) else 'float32' for col in columns}
+
+    @staticmethod
+    def java_dtypes() -> dict[str, str]:
+        """Returns compact dtypes for the columns of the Java fan controller log."""
+        return {
+            JOIN_RPM_TIMESTAMP: 'str',
+            MergedCol.RELATIVE_TIME.original: 'str',
+            MergedCol.RPM.original: 'int32',
+            MergedCol.IS_TEST_RUNNING.original: 'bool',
+        }
+
     @staticmethod
     def fan_columns():
         return [
@@ -86,6 +110,8 @@ class MergedCol(Enum):
 
 JOIN_BASE_TIMESTAMP = MergedCol.TIMESTAMP.original
 JOIN_RPM_TIMESTAMP = 'Timestamp'
+JOIN_BASE_DATE = 'Date'
+PC_FAN_RPM_COLUMNS = ['CPU [RPM]', 'GPU [RPM]']
         
 # MIGHT CONSIDER LATER
 # def normalize_string(name):
@@ -1,17 +1,420 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import threading
+from enum import Enum
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, mean_absolute_error
-from typing import Tuple, List, Dict
+from typing import TYPE_CHECKING, Tuple, List, Dict
+
+from src.implm.merged.cache import file_hash
+from src.implm.merged.polynomial import PolynomialTable, export_polynomial
+from src.implm.merged.least_squares import LeastSquaresStats, polynomial_exponents
+from src.instrumentation import get_logger
+
+# scikit-learn is only needed to train the model, prediction runs on the exported PolynomialTable
+if TYPE_CHECKING:
+    from sklearn.preprocessing import PolynomialFeatures
+    from sklearn.linear_model import LinearRegression
+
+log = get_logger(__name__)
+
+DEFAULT_TRAIN_CSV = "data/fans_db_tests.csv"
+DEFAULT_TRAIN_VALUES = [0, 960, 1530, 1980, 2340]
+DEFAULT_TEST_VALUES = [600, 1290, 1770, 2190]
+DEFAULT_MODEL_DIR = "data/tmp/models"
+DEFAULT_RIG = "default"
+
+# Bump when the content of the saved artifacts changes.
+# 5: the solver is stored in the artifact and in its key. Solver.SKLEARN, the default, keeps the
+#    LinearRegression coefficients as before version 4. The predictions of Solver.LEAST_SQUARES differ
+#    from degree 3 on, by up to 1.37 dB on data/fans_db_tests.csv at degree 3 (0.40 dB on the
+#    RuidoEstimadoPoly of data/input/base_automatica).
+MODEL_ARTIFACT_VERSION = 5
+
+
+class Solver(Enum):
+    """
+    How NoiseModel.fit solves the coefficients.
+
+    SKLEARN is the LinearRegression fit on the raw monomials, the reference the predictions are
+    checked against. LEAST_SQUARES solves the scaled least-squares statistics (LeastSquaresStats)
+    instead: the exact least-squares solution, which sklearn drifts from at degree 3 and above
+    (fan speeds ** 3 ~ 1e10 make its system badly conditioned), and the only solver that
+    NoiseModel.update can extend with appended rows without a full refit.
+    """
+    SKLEARN = 'sklearn'
+    LEAST_SQUARES = 'least_squares'
+
 
-# Global variables to store the trained model and transformer
-modelo_poly: LinearRegression | None = None
-transformador_poly: PolynomialFeatures | None = None
+def sklearn_version() -> str | None:
+    """Return the installed scikit-learn version, or None if it is not installed."""
+    if importlib.util.find_spec('sklearn') is None:
+        return None
+    import sklearn
+    return sklearn.__version__
 
-def load_and_clean_csv(csv_path: str, is_train_csv: bool = False) -> pd.DataFrame:
-    """Load and clean CSV data."""
-    df = pd.read_csv(csv_path, encoding='ISO-8859-1', sep=',')
+def model_artifact_path(artifact_dir: str, grau: int, csv_hash: str, train_values: List[int], test_values: List[int],
+                        solver: Solver = Solver.SKLEARN) -> str:
+    """Return the artifact path for a training CSV content and set of parameters."""
+    params = {'grau': grau, 'csv_hash': csv_hash, 'train_values': list(train_values), 'test_values': list(test_values),
+              'solver': solver.value}
+    key = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+    return os.path.join(artifact_dir, f"noise_model_v{MODEL_ARTIFACT_VERSION}_{key}.pkl")
+
+
+class NoiseModel:
+    """
+    Polynomial regression of the noise level ('Nivel de Ruido') on the fan speeds
+    ('Velocidade Fan Base', 'Velocidade Fan PC') of one fan rig.
+    
+    A fitted model is never modified by predict/score, so one instance can be shared by threads.
+    Prediction uses the PolynomialTable (tabela) of the coefficients solved by solver (see Solver).
+    With Solver.LEAST_SQUARES the least-squares statistics of the training rows (estatisticas) are
+    kept, so update() can add calibration rows without refitting on the whole table. The sklearn
+    objects (modelo, transformador) carry the same coefficients and are only kept for reports and
+    refits: a loaded model restores them on first access (importing scikit-learn), and they are
+    None when scikit-learn is missing or is not the version that saved them.
+    """
+    
+    def __init__(self, grau: int = 3, solver: Solver = Solver.SKLEARN):
+        self.grau = grau
+        self.solver = solver
+        self._modelo: LinearRegression | None = None
+        self._transformador: PolynomialFeatures | None = None
+        # (pickled sklearn objects, sklearn version that pickled them) of a loaded artifact, until restored
+        self._sklearn_objects: tuple[bytes, str | None] | None = None
+        self.tabela: PolynomialTable | None = None
+        self.estatisticas: LeastSquaresStats | None = None
+        self.metadata: Dict = {}
+    
+    @property
+    def is_fitted(self) -> bool:
+        return self.tabela is not None
+    
+    @property
+    def modelo(self) -> LinearRegression | None:
+        self._restore_sklearn_objects()
+        return self._modelo
+    
+    @property
+    def transformador(self) -> PolynomialFeatures | None:
+        self._restore_sklearn_objects()
+        return self._transformador
+    
+    def _restore_sklearn_objects(self):
+        # Importing scikit-learn and unpickling its objects takes most of the time of a load, so only
+        # the reports and refits that use them pay it
+        pending = self._sklearn_objects
+        if pending is None:
+            return
+        
+        objects, version = pending
+        modelo = transformador = None
+        if version is not None and version == sklearn_version():
+            modelo, transformador = pickle.loads(objects)
+            # The table is the fitted state, update() may have moved it since the artifact was saved
+            modelo.coef_, modelo.intercept_ = self.tabela.coefficients.copy(), self.tabela.intercept
+        self._modelo, self._transformador, self._sklearn_objects = modelo, transformador, None
+    
+    def fit(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fit the model on the training rows of df.
+        
+        With Solver.LEAST_SQUARES the coefficients are solved from the scaled least-squares statistics,
+        like in update(), so a model fitted at once and one updated with appended rows predict the same;
+        the sklearn objects are kept for reports with the solved coefficients.
+        
+        Returns:
+        - Copy of df with the 'RuidoEstimadoPoly' column of the fitted values.
+        """
+        modelo, transformador, df = train_polynomial_regression(df.copy(), grau=self.grau)
+        
+        estatisticas = None
+        if self.solver == Solver.LEAST_SQUARES:
+            estatisticas = LeastSquaresStats(polynomial_exponents(self.grau))
+            estatisticas.update(df['Velocidade Fan Base'], df['Velocidade Fan PC'], df['Nivel de Ruido'])
+            tabela = estatisticas.table()
+            modelo.coef_, modelo.intercept_ = tabela.coefficients.copy(), tabela.intercept
+            
+            mask = df['RuidoEstimadoPoly'].notnull()
+            df.loc[mask, 'RuidoEstimadoPoly'] = tabela(df.loc[mask, 'Velocidade Fan Base'], df.loc[mask, 'Velocidade Fan PC'])
+        else:
+            tabela = export_polynomial(modelo, transformador)
+        
+        self._modelo, self._transformador, self._sklearn_objects = modelo, transformador, None
+        self.tabela, self.estatisticas = tabela, estatisticas
+        return df
+    
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Add calibration rows to the fit without revisiting the rows it was fitted on.
+        The coefficients are solved again from the updated least-squares statistics, as in fit().
+        Only models fitted with Solver.LEAST_SQUARES keep those statistics.
+        
+        Returns:
+        - Number of rows added (rows with a missing speed or noise level are skipped).
+        """
+        if self.estatisticas is None:
+            raise ValueError("NoiseModel has no least-squares statistics, fit it with Solver.LEAST_SQUARES first.")
+        
+        # Work on a copy and swap the references at the end, so threads predicting with this model
+        # never see a half updated state
+        estatisticas = copy.deepcopy(self.estatisticas)
+        added = estatisticas.update(df['Velocidade Fan Base'], df['Velocidade Fan PC'], df['Nivel de Ruido'])
+        if added == 0:
+            return 0
+        
+        tabela = estatisticas.table()
+        # sklearn objects still pickled take the coefficients of the table when restored
+        if self._modelo is not None:
+            modelo = copy.deepcopy(self._modelo)
+            modelo.coef_, modelo.intercept_ = tabela.coefficients.copy(), tabela.intercept
+            self._modelo = modelo
+        self.estatisticas = estatisticas
+        self.tabela = tabela
+        return added
+    
+    def update_from_csv(self, csv_path: str = DEFAULT_TRAIN_CSV) -> int:
+        """
+        Add the rows appended to csv_path since the model was trained (metadata 'rows_seen'), reading only those rows.
+        Like in from_csv, only the rows at a 'Velocidade Fan Base' level of metadata 'train_values' are
+        used for training, so the test levels never leak into the fit.
+        
+        Returns:
+        - Number of rows added to the fit.
+        """
+        rows_seen = self.metadata.get('rows_seen')
+        if rows_seen is None or 'train_values' not in self.metadata:
+            raise ValueError("NoiseModel does not know how many rows of the CSV it has seen, train it with from_csv().")
+        
+        df = load_and_clean_csv(csv_path, is_train_csv=True, skip_rows=rows_seen)
+        df_treino, _ = split_train_test(df, train_values=self.metadata['train_values'],
+                                        test_values=self.metadata.get('test_values', DEFAULT_TEST_VALUES))
+        added = self.update(df_treino)
+        self.metadata = {**self.metadata, 'rows_seen': rows_seen + len(df), 'csv_hash': file_hash(csv_path),
+                         'csv_bytes': os.path.getsize(csv_path)}
+        return added
+    
+    def is_prefix_of(self, csv_path: str) -> bool:
+        """
+        Return True if the CSV the model was trained on is the start of csv_path (rows were only appended)
+        and the model can be updated with the new rows (Solver.LEAST_SQUARES).
+        """
+        csv_bytes = self.metadata.get('csv_bytes')
+        if self.estatisticas is None or csv_bytes is None or os.path.getsize(csv_path) < csv_bytes:
+            return False
+        return file_hash(csv_path, size=csv_bytes) == self.metadata.get('csv_hash')
+    
+    def refit_difference(self, csv_path: str = DEFAULT_TRAIN_CSV) -> float:
+        """
+        Train a model from scratch on csv_path, with the degree, solver and train/test levels of this one
+        (from_csv without artifacts), and return the largest absolute difference between the
+        current and the refitted predictions on every row of the CSV.
+        Used to check that a model updated with appended rows matches a full refit.
+        """
+        refit = NoiseModel.from_csv(grau=self.grau, csv_path=csv_path, solver=self.solver,
+                                    train_values=self.metadata.get('train_values', DEFAULT_TRAIN_VALUES),
+                                    test_values=self.metadata.get('test_values', DEFAULT_TEST_VALUES), artifact_dir=None)
+        
+        df = load_and_clean_csv(csv_path, is_train_csv=True)
+        mask = df[['Velocidade Fan Base', 'Velocidade Fan PC']].notnull().all(axis=1)
+        x0, x1 = df.loc[mask, 'Velocidade Fan Base'], df.loc[mask, 'Velocidade Fan PC']
+        return float(np.max(np.abs(self.tabela(x0, x1) - refit.tabela(x0, x1)), initial=0.0))
+    
+    def matches_refit(self, csv_path: str = DEFAULT_TRAIN_CSV, atol: float = 1e-6) -> bool:
+        """Return True if refit_difference(csv_path) is within atol (well below the 0.01 rounding of the predictions)."""
+        difference = self.refit_difference(csv_path)
+        log.info("Incremental vs full refit: max difference %.3e", difference)
+        return difference <= atol
+    
+    def predict(self, df: pd.DataFrame, output_path: str = None) -> pd.DataFrame:
+        """Add the 'RuidoEstimadoPoly' column (rounded to 2 decimals) to df, NaN where a fan speed is missing."""
+        if not self.is_fitted:
+            raise ValueError("NoiseModel is not fitted, call fit() or load() first.")
+        
+        # Preparar os dados
+        mask = df[['Velocidade Fan Base', 'Velocidade Fan PC']].notnull().all(axis=1)
+        X = df.loc[mask, ['Velocidade Fan Base', 'Velocidade Fan PC']]
+        
+        # Prever ruido
+        df['RuidoEstimadoPoly'] = np.nan
+        df.loc[mask, 'RuidoEstimadoPoly'] = np.round(self.tabela(X['Velocidade Fan Base'], X['Velocidade Fan PC']), 2)
+        
+        if output_path:
+            df.to_csv(output_path, index=False)
+        
+        return df
+    
+    def score(self, df: pd.DataFrame, real_col: str = 'Nivel de Ruido') -> Dict[str, float]:
+        """Predict on a copy of df and return the metrics of calculate_metrics against real_col."""
+        return calculate_metrics(self.predict(df.copy()), real_col=real_col)
+    
+    def fingerprint(self) -> str | None:
+        """Return a hash of the fitted polynomial (exponents and coefficients), or None if not fitted."""
+        if not self.is_fitted:
+            return None
+        
+        digest = hashlib.sha256()
+        digest.update(self.tabela.exponents.tobytes())
+        digest.update(self.tabela.coefficients.tobytes())
+        digest.update(np.float64(self.tabela.intercept).tobytes())
+        return digest.hexdigest()
+    
+    def save(self, path: str) -> str:
+        """
+        Save the model as a versioned artifact together with its metadata.
+        The sklearn objects are pickled separately inside the artifact, so it can be loaded without scikit-learn.
+        Objects of a loaded model that were never restored are written back as loaded, without importing it.
+        """
+        if not self.is_fitted:
+            raise ValueError("NoiseModel is not fitted, nothing to save.")
+        
+        if self._sklearn_objects is not None:
+            sklearn_objects, saved_version = self._sklearn_objects
+        else:
+            sklearn_objects = pickle.dumps((self._modelo, self._transformador))
+            saved_version = sklearn_version() if self._modelo is not None else None
+        
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        artifact = {
+            'version': MODEL_ARTIFACT_VERSION,
+            'sklearn_version': saved_version,
+            **self.metadata,
+            'grau': self.grau,
+            'solver': self.solver.value,
+            'table': self.tabela,
+            'stats': self.estatisticas,
+            'sklearn_objects': sklearn_objects,
+        }
+        
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(artifact, f)
+        os.replace(tmp_path, path)
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> NoiseModel | None:
+        """
+        Load a saved artifact, or return None if it is missing or was written by another artifact version.
+        Only the PolynomialTable is needed to predict: the sklearn objects stay pickled until modelo or
+        transformador is read, and are only restored when the installed scikit-learn version is the one
+        that saved them.
+        """
+        if not os.path.exists(path):
+            return None
+        
+        with open(path, 'rb') as f:
+            artifact = pickle.load(f)
+        
+        if artifact.get('version') != MODEL_ARTIFACT_VERSION:
+            return None
+        
+        model = cls(grau=artifact.pop('grau'), solver=Solver(artifact.pop('solver')))
+        model.tabela = artifact.pop('table')
+        model.estatisticas = artifact.pop('stats', None)
+        sklearn_objects = artifact.pop('sklearn_objects', None)
+        if sklearn_objects is not None:
+            model._sklearn_objects = (sklearn_objects, artifact.get('sklearn_version'))
+        model.metadata = artifact
+        return model
+    
+    @classmethod
+    def from_csv(cls, grau: int = 3, csv_path: str = DEFAULT_TRAIN_CSV,
+                 train_values: List[int] = DEFAULT_TRAIN_VALUES, test_values: List[int] = DEFAULT_TEST_VALUES,
+                 artifact_dir: str | None = DEFAULT_MODEL_DIR, solver: Solver = Solver.SKLEARN) -> NoiseModel:
+        """
+        Load the saved artifact matching the training CSV content and parameters from artifact_dir,
+        or train the model on csv_path and save it there when no such artifact exists.
+        When rows were only appended to the CSV since the last saved Solver.LEAST_SQUARES model, that
+        model is updated with the new rows (update_from_csv) instead of being trained again.
+        With artifact_dir None the model is always trained and nothing is saved.
+        """
+        csv_hash = file_hash(csv_path)
+        path = latest_path = None
+        if artifact_dir is not None:
+            path = model_artifact_path(artifact_dir, grau, csv_hash, train_values, test_values, solver)
+            model = cls.load(path)
+            if model is not None:
+                return model
+            
+            latest_path = model_artifact_path(artifact_dir, grau, 'latest', train_values, test_values, solver)
+            model = cls.load(latest_path)
+            if model is not None and model.is_prefix_of(csv_path):
+                added = model.update_from_csv(csv_path)
+                log.info("Noise model updated with %d appended calibration rows", added)
+                model.save(path)
+                model.save(latest_path)
+                return model
+        
+        df = load_and_clean_csv(csv_path, is_train_csv=True)
+        df_treino, _ = split_train_test(df, train_values=train_values, test_values=test_values)
+        model = cls(grau=grau, solver=solver)
+        model.fit(df_treino)
+        model.metadata = {'csv_hash': csv_hash, 'csv_bytes': os.path.getsize(csv_path), 'rows_seen': len(df),
+                          'train_values': list(train_values), 'test_values': list(test_values)}
+        
+        if path is not None:
+            model.save(path)
+            model.save(latest_path)
+        return model
+
+
+class NoiseModelRegistry:
+    """
+    Thread-safe collection of NoiseModels keyed by fan rig, so runs of different rigs
+    can be scored concurrently against their own calibration.
+    """
+    
+    def __init__(self):
+        self._models: Dict[str, NoiseModel] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, rig: str, model: NoiseModel):
+        with self._lock:
+            self._models[rig] = model
+    
+    def get(self, rig: str = DEFAULT_RIG) -> NoiseModel:
+        """Return the model of rig. The default rig is loaded (or trained) with the default parameters on first use."""
+        with self._lock:
+            model = self._models.get(rig)
+            if model is None:
+                if rig != DEFAULT_RIG:
+                    raise KeyError(f"No noise model registered for rig '{rig}'.")
+                model = self._models[rig] = NoiseModel.from_csv()
+            return model
+    
+    def load_or_train(self, rig: str, **params) -> NoiseModel:
+        """Load or train a model with NoiseModel.from_csv(**params) and register it under rig."""
+        model = NoiseModel.from_csv(**params)
+        self.register(rig, model)
+        return model
+    
+    def rigs(self) -> List[str]:
+        with self._lock:
+            return list(self._models)
+    
+    def __contains__(self, rig: str) -> bool:
+        with self._lock:
+            return rig in self._models
+
+
+# Models used when no NoiseModel is passed explicitly
+registry = NoiseModelRegistry()
+
+def default_model() -> NoiseModel:
+    """Return the model of the default rig, loading or training it on first use."""
+    return registry.get(DEFAULT_RIG)
+
+def load_and_clean_csv(csv_path: str, is_train_csv: bool = False, skip_rows: int = 0) -> pd.DataFrame:
+    """Load and clean CSV data, skipping the first skip_rows data rows (the header is always read)."""
+    df = pd.read_csv(csv_path, encoding='ISO-8859-1', sep=',', skiprows=range(1, skip_rows + 1))
     
     # Convert 'Nivel de Ruido' to string first, then replace comma with dot, then convert to float
     if 'Nivel de Ruido' in df.columns:
@@ -35,19 +438,22 @@ def load_and_clean_csv(csv_path: str, is_train_csv: bool = False) -> pd.DataFram
     return df
 
 def split_train_test(df: pd.DataFrame, 
-                    train_values: List[int] = [0, 960, 1530, 1980, 2340],
-                    test_values: List[int] = [600, 1290, 1770, 2190]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+                    train_values: List[int] = DEFAULT_TRAIN_VALUES,
+                    test_values: List[int] = DEFAULT_TEST_VALUES) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Split data into training and test sets based on Velocidade Fan Base values."""
     df_treino = df[df['Velocidade Fan Base'].isin(train_values)].copy()
     df_teste = df[df['Velocidade Fan Base'].isin(test_values)].copy()
     
-    print(f"Dataset de treino: {len(df_treino)} amostras")
-    print(f"Dataset de teste: {len(df_teste)} amostras")
+    log.debug("Dataset de treino: %d amostras", len(df_treino))
+    log.debug("Dataset de teste: %d amostras", len(df_teste))
     
     return df_treino, df_teste
 
 def train_polynomial_regression(df: pd.DataFrame, grau: int = 2) -> Tuple[LinearRegression, PolynomialFeatures, pd.DataFrame]:
     """Train polynomial regression model."""
+    from sklearn.preprocessing import PolynomialFeatures
+    from sklearn.linear_model import LinearRegression
+    
     # Preparar os dados
     X = df[['Velocidade Fan Base', 'Velocidade Fan PC']].copy()
     y = df['Nivel de Ruido'].copy()
@@ -74,31 +480,15 @@ def train_polynomial_regression(df: pd.DataFrame, grau: int = 2) -> Tuple[Linear
 
     return model, poly, df
 
-def predict_with_model(df: pd.DataFrame, output_path: str = None) -> pd.DataFrame:
-    """Predict noise levels using the trained model."""
-    global modelo_poly, transformador_poly
-    
-    if modelo_poly is None or transformador_poly is None:
-        raise ValueError("Modelo polinomial ou transformador não foram definidos.")
-    
-    # Preparar os dados
-    mask = df[['Velocidade Fan Base', 'Velocidade Fan PC']].notnull().all(axis=1)
-    X = df.loc[mask, ['Velocidade Fan Base', 'Velocidade Fan PC']]
-    X_poly = transformador_poly.transform(X)
-    
-    # Prever ruido
-    df['RuidoEstimadoPoly'] = np.nan
-    df.loc[mask, 'RuidoEstimadoPoly'] = np.round(modelo_poly.predict(X_poly), 2)
-
-    # Save predictions to CSV if output path is provided
-    if output_path:
-        df.to_csv(output_path, index=False)
-
-    return df
+def predict_with_model(df: pd.DataFrame, output_path: str = None, model: NoiseModel | None = None) -> pd.DataFrame:
+    """Predict noise levels with model (the default rig model when None)."""
+    if model is None:
+        model = default_model()
+    return model.predict(df, output_path=output_path)
 
-def predict_with_csv(csv_path: str, output_path: str = None) -> pd.DataFrame:
+def predict_with_csv(csv_path: str, output_path: str = None, model: NoiseModel | None = None) -> pd.DataFrame:
     df = load_and_clean_csv(csv_path)
-    df = predict_with_model(df)
+    df = predict_with_model(df, model=model)
     if output_path:
         df.to_csv(output_path, index=False)
     return df
@@ -106,6 +496,8 @@ def predict_with_csv(csv_path: str, output_path: str = None) -> pd.DataFrame:
 def calculate_metrics(df: pd.DataFrame, real_col: str = 'Nivel de Ruido', 
                      pred_col: str = 'RuidoEstimadoPoly') -> Dict[str, float]:
     """Calculate RMSE, MAE, mean difference, and max difference."""
+    from sklearn.metrics import mean_squared_error, mean_absolute_error
+    
     mask = df[[real_col, pred_col]].notnull().all(axis=1)
     
     if not mask.any():
@@ -162,8 +554,17 @@ def print_comparison_table(df: pd.DataFrame, title: str, metrics: Dict[str, floa
     print("Base RPM\tPC RPM\t\tRuído Real\tRuído Estimado (Poly)\tDiferença")
     print("------------------------------------------------------------------------------")
 
-    for _, row in df[['Velocidade Fan Base', 'Velocidade Fan PC', 'Nivel de Ruido', 'RuidoEstimadoPoly', 'Diferença Ruido']].iterrows():
-        print(f"{row['Velocidade Fan Base']:.0f}\t\t{row['Velocidade Fan PC']:.0f}\t\t{row['Nivel de Ruido']:.3f}\t\t{row['RuidoEstimadoPoly']:.3f}\t\t\t{row['Diferença Ruido']:.3f}")
+    # Format whole columns at once instead of iterating over the rows
+    columns = [('Velocidade Fan Base', '%.0f'), ('Velocidade Fan PC', '%.0f'), ('Nivel de Ruido', '%.3f'),
+               ('RuidoEstimadoPoly', '%.3f'), ('Diferença Ruido', '%.3f')]
+    cells = [np.char.mod(fmt, df[col].to_numpy(dtype=np.float64)) for col, fmt in columns]
+    separators = ['\t\t', '\t\t', '\t\t', '\t\t\t']
+    
+    lines = cells[0]
+    for separator, cell in zip(separators, cells[1:]):
+        lines = np.char.add(np.char.add(lines, separator), cell)
+    if len(lines):
+        print('\n'.join(lines.tolist()))
 
     print(f"\nMétricas do conjunto de {title}:")
     print(f"RMSE: {metrics['rmse']:.3f}")
@@ -171,34 +572,46 @@ def print_comparison_table(df: pd.DataFrame, title: str, metrics: Dict[str, floa
     print(f"Diferença média: {metrics['mean_diff']:.3f}")
     print(f"Diferença máxima: {metrics['max_diff']:.3f}")
 
-def create_polinomial_regression_from_csv(grau: int = 3, csv_path: str = "data/fans_db_tests.csv", log_in_terminal: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def create_polinomial_regression_from_csv(grau: int = 3, csv_path: str = DEFAULT_TRAIN_CSV, log_in_terminal: bool = False,
+                                          train_values: List[int] = DEFAULT_TRAIN_VALUES, test_values: List[int] = DEFAULT_TEST_VALUES,
+                                          artifact_dir: str | None = None, rig: str = DEFAULT_RIG,
+                                          solver: Solver = Solver.SKLEARN) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Main function to create polynomial regression model from CSV data.
     
     Parameters:
     - grau: Degree of polynomial (default is 3)
     - csv_path: Path to CSV file
+    - train_values / test_values: 'Velocidade Fan Base' values used for training and testing
+    - artifact_dir: If set, the trained model is saved there as a versioned artifact (see NoiseModel.from_csv)
+    - rig: Registry key the trained model is registered under
+    - solver: How the coefficients are solved (see Solver)
     
     Returns:
     - Tuple of (training_df, test_df)
     """
-    global modelo_poly, transformador_poly
-    
     # Load and clean data
     df = load_and_clean_csv(csv_path, is_train_csv=True)
     
     # Split into train/test sets
-    df_treino, df_teste = split_train_test(df)
+    df_treino, df_teste = split_train_test(df, train_values=train_values, test_values=test_values)
     
     # Train model on training set
-    modelo_poly, transformador_poly, df_treino = train_polynomial_regression(df_treino, grau=grau)
+    model = NoiseModel(grau=grau, solver=solver)
+    df_treino = model.fit(df_treino)
+    model.metadata = {'csv_hash': file_hash(csv_path), 'csv_bytes': os.path.getsize(csv_path), 'rows_seen': len(df),
+                      'train_values': list(train_values), 'test_values': list(test_values)}
+    registry.register(rig, model)
+    
+    if artifact_dir is not None:
+        model.save(model_artifact_path(artifact_dir, grau, model.metadata['csv_hash'], train_values, test_values, solver))
     
     # Print polynomial equation
-    if log_in_terminal:
-        print_polynomial_equation(modelo_poly, transformador_poly)
+    if log_in_terminal and model.modelo is not None:
+        print_polynomial_equation(model.modelo, model.transformador)
     
     # Predict on test set
-    df_teste = predict_with_model(df_teste)
+    df_teste = model.predict(df_teste)
     
     # Calculate metrics for both sets
     metrics_treino = calculate_metrics(df_treino)
@@ -209,4 +622,4 @@ def create_polinomial_regression_from_csv(grau: int = 3, csv_path: str = "data/f
         print_comparison_table(df_treino, "CONJUNTO DE TREINO", metrics_treino)
         print_comparison_table(df_teste, "CONJUNTO DE TESTE", metrics_teste)
     
-    return df_treino, df_teste
\ No newline at end of file
+    return df_treino, df_teste
@@ -0,0 +1,404 @@
+import io
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.implm.merged.columns import MergedCol, JOIN_RPM_TIMESTAMP
+from src.implm.merged.db_math_regression import NoiseModel
+from src.implm.merged.gap_fill import FillPolicy
+from src.implm.merged.pipeline import hw_info_columns
+from src.implm.merged.streaming import FileSink, IncrementalMerger
+from src.implm.merged.time_join import JOIN_KEY, TimeJoin, hw_info_datetimes, java_datetimes
+from src.interval.timestamps import time_strings_to_timedelta, with_midnight_rollover
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_POLL_SECONDS = 1.0
+
+# The Java logger writes one row per second on whole seconds: once the row of a second exists,
+# no later Java row can be the backward match of a sample taken during that second
+_JAVA_PERIOD = pd.Timedelta(seconds=1)
+
+
+class CsvTail:
+    """
+    Reads the rows appended to a growing CSV file since the previous call.
+
+    Only the new bytes are read (from the last byte offset), and only up to the last complete line,
+    so a row the logger is still writing is picked up on the next call. The header is kept from the
+    first read and prepended to every batch; header lines repeated by the logger are skipped.
+    """
+
+    def __init__(self, path: str, usecols: list[str] | None = None, dtype: dict[str, str] | None = None):
+        self.path = path
+        self.usecols = usecols
+        self.dtype = dtype
+        self.offset = 0
+        self.header: bytes | None = None
+        self.rows_read = 0
+
+    def has_header(self) -> bool:
+        """Returns whether the file exists and its header line is complete."""
+        if self.header is not None:
+            return True
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'rb') as file:
+            return b'\n' in file.readline()
+
+    def read_new_rows(self, final: bool = False) -> pd.DataFrame | None:
+        """
+        Returns the complete rows appended since the previous call, or None when there are none.
+        With final, a last line without a line break is read too (the logger stopped writing).
+        A file that shrank (truncated or replaced by the logger) is read again from the start.
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            log.warning("%s shrank, reading it again from the start", self.path)
+            self.offset, self.header = 0, None
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(size - self.offset)
+
+        end = len(data) - 1 if final and data else data.rfind(b'\n')
+        if end < 0:
+            return None
+        data = data[:end + 1]
+        self.offset += end + 1
+
+        if self.header is None:
+            if b'\n' not in data:
+                return None
+            header_end = data.index(b'\n') + 1
+            self.header, data = data[:header_end], data[header_end:]
+        else:
+            data = data.replace(self.header, b'')
+        if not data.endswith(b'\n'):
+            data += b'\n'
+
+        if not data.strip():
+            return None
+
+        rows = pd.read_csv(io.BytesIO(self.header + data), usecols=self.usecols, dtype=self.dtype)
+        self.rows_read += len(rows)
+        return rows
+
+
+def case_summary(case: int, frame: pd.DataFrame) -> dict:
+    """
+    Summary of one test case: its relativeTime boundaries, number of rows and the mean of every numeric column.
+    """
+    relative_time = MergedCol.RELATIVE_TIME.original
+    summary = {
+        'case': case,
+        'start': frame[relative_time].iloc[0],
+        'end': frame[relative_time].iloc[-1],
+        'rows': len(frame),
+    }
+    numeric = frame.select_dtypes(include='number')
+    summary.update({f"mean {col}": value for col, value in numeric.mean().items()})
+    return summary
+
+
+class CaseTracker:
+    """
+    Detects IsTestRunning edges as merged rows arrive and emits every case as soon as it closes.
+
+    A case holds the rows where IsTestRunning is true plus the first row after it, the same
+    boundaries used by get_intervals_from_df. Only the rows of the open case are kept in memory.
+    Closed cases are written to {output_folder}/case{n}.csv (n starting at 1) and their summary
+    is appended to {output_folder}/cases_summary.csv.
+    """
+
+    def __init__(self, output_folder: str | None = None, flag_col: str = MergedCol.IS_TEST_RUNNING.original):
+        self.output_folder = output_folder
+        self.flag_col = flag_col
+        self.cases = 0
+        self.summaries: list[dict] = []
+        self._in_run = False
+        self._open_case = 0
+        self._open_rows: list[pd.DataFrame] = []
+
+        if output_folder is not None:
+            Path(output_folder).mkdir(parents=True, exist_ok=True)
+            # Summaries are appended case by case, so one left by a previous run is removed first
+            if os.path.exists(self.summary_path()):
+                os.remove(self.summary_path())
+
+    def case_path(self, case: int) -> str:
+        return os.path.join(self.output_folder, f"case{case}.csv")
+
+    def summary_path(self) -> str:
+        return os.path.join(self.output_folder, 'cases_summary.csv')
+
+    def write(self, chunk: pd.DataFrame) -> list[dict]:
+        """
+        Adds merged rows and returns the summaries of the cases they closed.
+        """
+        if chunk.empty:
+            return []
+
+        flag = chunk[self.flag_col].to_numpy(dtype=bool)
+        previous = np.concatenate(([self._in_run], flag[:-1]))
+
+        case_ids = self.cases + np.cumsum(flag & ~previous)
+        include = flag | previous
+        closes = ~flag & previous
+
+        closed = []
+        for case in np.unique(case_ids[include]):
+            in_case = case_ids == case
+            if case != self._open_case:
+                self._open_case, self._open_rows = int(case), []
+            self._open_rows.append(chunk[include & in_case])
+            if (closes & in_case).any():
+                closed.append(self._emit())
+
+        self.cases = int(case_ids[-1])
+        self._in_run = bool(flag[-1])
+        return closed
+
+    def finish(self) -> list[dict]:
+        """
+        Emits the case still running when the logs stopped, ending at its last row as get_intervals_from_df does.
+        """
+        if not self._open_rows:
+            return []
+        log.info("Case %d was still running when the logs stopped", self._open_case)
+        return [self._emit()]
+
+    def _emit(self) -> dict:
+        frame = pd.concat(self._open_rows, ignore_index=True)
+        self._open_rows = []
+        summary = case_summary(self._open_case, frame)
+        self.summaries.append(summary)
+
+        if self.output_folder is not None:
+            frame.to_csv(self.case_path(self._open_case), index=False)
+            first = not os.path.exists(self.summary_path())
+            pd.DataFrame([summary]).to_csv(self.summary_path(), mode='w' if first else 'a', header=first, index=False)
+
+        log.info("Case %d closed: %s - %s (%d rows)", summary['case'], summary['start'], summary['end'], summary['rows'])
+        return summary
+
+
+class LiveFollower:
+    """
+    Incrementally merges and splits the HWiNFO and Java logs while they are being written.
+
+    Every tick reads only the bytes appended to both files, merges the new samples (see IncrementalMerger)
+    and feeds them to a CaseTracker, so its cost is proportional to the new rows. HWiNFO samples newer
+    than the last Java row wait until the Java log catches up, since their Java row was not written yet.
+    Waiting samples keep the datetimes parsed when they were read, and are not looked at again until
+    the Java log reaches the first of them, so a Java log that stopped early costs nothing per tick.
+    The merged rows are appended to {output_folder}/merged_data.csv.
+    """
+
+    def __init__(
+        self,
+        base_csv_path: str,
+        java_csv_path: str,
+        output_folder: str | None = None,
+        extra_columns: list[str] | None = None,
+        fill_policy: FillPolicy = FillPolicy.FFILL,
+        join: TimeJoin = TimeJoin.BACKWARD,
+        tolerance: str = '1s',
+        model: NoiseModel | None = None
+    ):
+        self.base_csv_path = base_csv_path
+        self.java_csv_path = java_csv_path
+        self.extra_columns = extra_columns
+        self.tolerance = pd.Timedelta(tolerance)
+
+        self.merger = IncrementalMerger(fill_policy=fill_policy, join=join, tolerance=tolerance, model=model)
+        self.tracker = CaseTracker(output_folder)
+        self.sink = FileSink(os.path.join(output_folder, 'merged_data.csv')) if output_folder is not None else None
+        self.rows_merged = 0
+
+        self._hw_tail: CsvTail | None = None
+        self._java_tail = CsvTail(java_csv_path, dtype=MergedCol.java_dtypes())
+        # Samples waiting for their Java rows, in batches as read, with the datetimes of every sample
+        self._pending_hw: list[pd.DataFrame] = []
+        self._pending_times: list[np.ndarray] = []
+        self._pending_count = 0
+        self._blocked_until: pd.Timestamp | None = None   # The first waiting sample is not ready before the Java log passes this
+        self._rpm_df: pd.DataFrame | None = None    # Java rows samples can still be matched with, with their JOIN_KEY
+        self._raw_java: list[pd.DataFrame] = []     # Java rows read before the first HWiNFO sample anchored the log
+
+    @property
+    def pending_rows(self) -> int:
+        """Number of HWiNFO samples read but still waiting for their Java rows."""
+        return self._pending_count
+
+    def _read_hw(self, final: bool = False) -> pd.DataFrame | None:
+        if self._hw_tail is None:
+            probe = CsvTail(self.base_csv_path)
+            if not probe.has_header():
+                return None
+            # The projected columns are known once the logger has written the header
+            columns = hw_info_columns(self.base_csv_path, self.extra_columns)
+            self._hw_tail = CsvTail(self.base_csv_path, usecols=columns, dtype=MergedCol.hardware_dtypes(columns))
+        return self._hw_tail.read_new_rows(final=final)
+
+    def _add_java_rows(self, rows: pd.DataFrame):
+        """Parses the datetime of new Java rows, continuing the midnight rollover of the rows before them."""
+        if self._rpm_df is None or self._rpm_df.empty:
+            keys = java_datetimes(rows, self.merger.start)
+        else:
+            last = self._rpm_df[JOIN_KEY].iloc[-1]
+            day = last.normalize()
+            times = pd.concat([pd.Series([last - day]), pd.Series(time_strings_to_timedelta(rows[JOIN_RPM_TIMESTAMP]))], ignore_index=True)
+            keys = with_midnight_rollover(times, day).iloc[1:].to_numpy()
+
+        rows = rows.assign(**{JOIN_KEY: keys}).dropna(subset=[JOIN_KEY])
+        self._rpm_df = rows if self._rpm_df is None else pd.concat([self._rpm_df, rows], ignore_index=True)
+
+    def _ready_until(self) -> pd.Timestamp | None:
+        """Samples before this datetime already have every Java row they can be matched with."""
+        if self._rpm_df is None or self._rpm_df.empty:
+            return None
+        last = self._rpm_df[JOIN_KEY].iloc[-1]
+        if self.merger.join == TimeJoin.NEAREST:
+            return last - self.tolerance
+        return last + _JAVA_PERIOD
+
+    def tick(self, flush: bool = False) -> list[dict]:
+        """
+        Processes the rows appended since the previous tick. With flush, samples still waiting for
+        Java rows are merged anyway (the logs stopped). Returns the summaries of the cases closed.
+        """
+        hw_rows = self._read_hw(final=flush)
+        if hw_rows is not None:
+            hw_rows = hw_rows.dropna(how='all')
+            if not hw_rows.empty:
+                # Every sample carries its own 'Date', so a batch is parsed on its own, once
+                self._pending_hw.append(hw_rows)
+                self._pending_times.append(hw_info_datetimes(hw_rows).to_numpy(dtype='datetime64[ns]'))
+                self._pending_count += len(hw_rows)
+
+        java_rows = self._java_tail.read_new_rows(final=flush)
+        if java_rows is not None:
+            self._raw_java.append(java_rows)
+
+        if not self._pending_count:
+            return []
+
+        if self.merger.start is None:
+            self.merger.start = pd.Series(np.concatenate(self._pending_times)).min()
+            if pd.isna(self.merger.start):
+                self.merger.start = None
+                return []
+        if self._raw_java:
+            self._add_java_rows(pd.concat(self._raw_java, ignore_index=True))
+            self._raw_java = []
+        # Without Java rows no sample can be merged, even on flush: they stay pending for a later tick
+        if self._rpm_df is None:
+            return []
+
+        ready_until = self._ready_until()
+        if ready_until is None and not flush:
+            return []
+        if not flush and self._blocked_until is not None and ready_until <= self._blocked_until:
+            return []
+
+        pending = pd.concat(self._pending_hw, ignore_index=True) if len(self._pending_hw) > 1 else self._pending_hw[0]
+        hw_times = pd.Series(np.concatenate(self._pending_times))
+        ready = np.ones(len(hw_times), dtype=bool) if flush else (hw_times < ready_until).to_numpy()
+        # Samples are merged in file order, so a sample waits as long as any sample before it waits
+        ready = np.logical_and.accumulate(ready)
+        chunk = pending[ready]
+        if ready.all():
+            self._pending_hw, self._pending_times, self._blocked_until = [], [], None
+        else:
+            self._pending_hw = [pending[~ready].reset_index(drop=True)]
+            self._pending_times = [hw_times[~ready].to_numpy()]
+            self._blocked_until = ready_until
+        self._pending_count = len(pending) - len(chunk)
+        if chunk.empty:
+            return []
+
+        rpm_df = self._rpm_df if self.merger.join != TimeJoin.EXACT else self._rpm_df.drop(columns=[JOIN_KEY])
+        merged = self.merger.merge(chunk, rpm_df)
+
+        # Java rows older than every sample still to come cannot be matched anymore
+        oldest = hw_times[~ready].min() if (~ready).any() else hw_times.max()
+        if not pd.isna(oldest):
+            keep = (self._rpm_df[JOIN_KEY] >= oldest - self.tolerance - _JAVA_PERIOD).to_numpy().copy()
+            keep[-1] = True
+            self._rpm_df = self._rpm_df[keep].reset_index(drop=True)
+
+        if merged.empty:
+            return []
+        self.rows_merged += len(merged)
+        if self.sink is not None:
+            self.sink.write(merged)
+        return self.tracker.write(merged)
+
+    def close(self) -> list[dict]:
+        """
+        Merges the samples still waiting, emits the open case and closes the merged file.
+        """
+        try:
+            closed = self.tick(flush=True)
+            return closed + self.tracker.finish()
+        finally:
+            if self.sink is not None:
+                self.sink.close()
+
+
+def follow(
+    base_csv_path: str,
+    java_csv_path: str,
+    output_folder: str,
+    poll_seconds: float = DEFAULT_POLL_SECONDS,
+    idle_timeout: float | None = None,
+    model: NoiseModel | None = None
+) -> list[dict]:
+    """
+    Follows the HWiNFO and Java logs while a test is running, emitting every case as soon as it closes.
+
+    Parameters:
+    - base_csv_path: Path to the HWiNFO CSV file (it may not exist yet).
+    - java_csv_path: Path to the Java CSV file (it may not exist yet).
+    - output_folder: Folder of merged_data.csv, case{n}.csv and cases_summary.csv.
+    - poll_seconds: Time between two reads of the logs.
+    - idle_timeout: Stop after this many seconds without new rows. None follows until Ctrl+C.
+    - model: NoiseModel used to estimate the noise level. Defaults to the model of the default rig.
+
+    Returns:
+    - Summaries of every emitted case.
+    """
+    follower = LiveFollower(base_csv_path, java_csv_path, output_folder=output_folder, model=model)
+    log.info("Following %s and %s (Ctrl+C to stop)", base_csv_path, java_csv_path)
+
+    last_growth = time.monotonic()
+    try:
+        while True:
+            rows_before = follower.rows_merged + follower.pending_rows
+            tick_start = time.perf_counter()
+            follower.tick()
+            rows_after = follower.rows_merged + follower.pending_rows
+
+            if rows_after > rows_before:
+                last_growth = time.monotonic()
+                log.info("%d rows merged, %d case(s) detected (tick: %.1f ms)",
+                         follower.rows_merged, follower.tracker.cases, (time.perf_counter() - tick_start) * 1000)
+            elif idle_timeout is not None and time.monotonic() - last_growth >= idle_timeout:
+                log.info("No new rows for %gs, stopping", idle_timeout)
+                break
+
+            time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        log.info("Stopped following")
+    finally:
+        follower.close()
+
+    return follower.tracker.summaries
@@ -0,0 +1,94 @@
+import numpy as np
+
+from src.implm.merged.polynomial import PolynomialTable
+
+# Fan speeds are divided by this value before building the monomials, so the statistics of
+# high-degree terms (RPM ** 6 ~ 1e20) stay in a range where float64 keeps its precision
+DEFAULT_FEATURE_SCALE = 1000.0
+
+
+def polynomial_exponents(grau: int) -> np.ndarray:
+    """
+    Returns the (x0, x1) exponents of every monomial of degree 1 to grau, in the order of
+    sklearn's PolynomialFeatures(degree=grau, include_bias=False) for two features.
+    """
+    return np.array([(d - j, j) for d in range(1, grau + 1) for j in range(d + 1)], dtype=np.int64).reshape(-1, 2)
+
+
+class LeastSquaresStats:
+    """
+    Running sufficient statistics of an ordinary least-squares fit (with intercept) of y on the
+    polynomial monomials of (x0, x1): row count, means and centered co-moment matrices.
+
+    Batches of rows are merged with the pairwise update of Chan et al., so appending rows costs
+    O(rows * terms^2) and never needs the rows seen before. solve() gives the least-squares solution
+    of all the rows, up to floating point rounding. LinearRegression on the unscaled monomials drifts
+    from it at degree 3 and above, see Solver in db_math_regression.
+    """
+
+    def __init__(self, exponents: np.ndarray, scale: float = DEFAULT_FEATURE_SCALE):
+        self.exponents = np.asarray(exponents, dtype=np.int64).reshape(-1, 2)
+        self.scale = float(scale)
+        terms = len(self.exponents)
+
+        self.n = 0
+        self.mean_x = np.zeros(terms)
+        self.mean_y = 0.0
+        self.cxx = np.zeros((terms, terms))
+        self.cxy = np.zeros(terms)
+        self.cyy = 0.0
+
+    def features(self, x0: np.ndarray, x1: np.ndarray) -> np.ndarray:
+        """Scaled monomials of a batch, shape (rows, terms)."""
+        x0 = np.asarray(x0, dtype=np.float64)[:, None] / self.scale
+        x1 = np.asarray(x1, dtype=np.float64)[:, None] / self.scale
+        return x0 ** self.exponents[:, 0] * x1 ** self.exponents[:, 1]
+
+    def update(self, x0, x1, y) -> int:
+        """
+        Adds a batch of rows to the statistics. Rows with a missing value are skipped.
+        Returns the number of rows added.
+        """
+        x0 = np.asarray(x0, dtype=np.float64)
+        x1 = np.asarray(x1, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        valid = ~(np.isnan(x0) | np.isnan(x1) | np.isnan(y))
+        nb = int(valid.sum())
+        if nb == 0:
+            return 0
+
+        X = self.features(x0[valid], x1[valid])
+        y = y[valid]
+        mean_xb, mean_yb = X.mean(axis=0), y.mean()
+        Xc, yc = X - mean_xb, y - mean_yb
+
+        na = self.n
+        n = na + nb
+        dx, dy = mean_xb - self.mean_x, mean_yb - self.mean_y
+        weight = na * nb / n
+
+        self.cxx += Xc.T @ Xc + weight * np.outer(dx, dx)
+        self.cxy += Xc.T @ yc + weight * dx * dy
+        self.cyy += float(yc @ yc) + weight * dy * dy
+        self.mean_x += dx * nb / n
+        self.mean_y += dy * nb / n
+        self.n = n
+        return nb
+
+    def solve(self) -> tuple[np.ndarray, float]:
+        """
+        Returns (coefficients, intercept) in the original (unscaled) units, ordered like the exponents.
+        Rank deficient systems get the minimum norm solution, as with LinearRegression.
+        """
+        if self.n == 0:
+            raise ValueError("No rows were added to the least-squares statistics.")
+
+        coef_scaled = np.linalg.lstsq(self.cxx, self.cxy, rcond=None)[0]
+        intercept = self.mean_y - float(self.mean_x @ coef_scaled)
+        coefficients = coef_scaled / self.scale ** self.exponents.sum(axis=1)
+        return coefficients, intercept
+
+    def table(self) -> PolynomialTable:
+        """Returns the fitted polynomial as a PolynomialTable."""
+        coefficients, intercept = self.solve()
+        return PolynomialTable(self.exponents, coefficients, intercept)
@@ -0,0 +1,141 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.implm.merged.cache import file_hash
+from src.implm.merged.db_math_regression import MODEL_ARTIFACT_VERSION, NoiseModel, DEFAULT_TRAIN_CSV, load_and_clean_csv
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_DEGREES = [1, 2, 3, 4, 5]
+DEFAULT_SELECTION_DIR = "data/tmp/model_selection"
+
+METRICS = ['rmse', 'mae', 'mean_diff', 'max_diff']
+
+
+def rpm_levels(df: pd.DataFrame) -> list[int]:
+    """Returns the sorted 'Velocidade Fan Base' levels of the training data."""
+    return sorted(int(level) for level in df['Velocidade Fan Base'].dropna().unique())
+
+
+def _evaluate_candidate(df: pd.DataFrame, grau: int, held_out: int) -> dict:
+    """Trains on every RPM level except held_out and returns the metrics on held_out."""
+    is_held_out = df['Velocidade Fan Base'] == held_out
+
+    model = NoiseModel(grau=grau)
+    model.fit(df[~is_held_out])
+    metrics = model.score(df[is_held_out])
+
+    return {'grau': grau, 'held_out': held_out, 'samples': int(is_held_out.sum()),
+            **{name: float(metrics[name]) for name in METRICS}}
+
+
+def _load_results(path: str) -> dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _store_results(path: str, results: dict[str, dict]):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def sweep_folds(
+    csv_path: str = DEFAULT_TRAIN_CSV,
+    degrees: list[int] = DEFAULT_DEGREES,
+    jobs: int | None = None,
+    cache_dir: str | None = DEFAULT_SELECTION_DIR
+) -> pd.DataFrame:
+    """
+    Evaluates every polynomial degree with leave-one-RPM-level-out cross-validation: for each
+    'Velocidade Fan Base' level, a model is trained on the other levels and scored on the held-out one.
+
+    Candidates are evaluated in a process pool. Results are cached in cache_dir per training data hash
+    and model version (MODEL_ARTIFACT_VERSION), so only the candidates that were never evaluated on this data are computed.
+
+    Parameters:
+    - csv_path: Training CSV (same format as create_polinomial_regression_from_csv).
+    - degrees: Polynomial degrees to evaluate.
+    - jobs: Maximum number of worker processes. With 1 the candidates are evaluated in this process.
+    - cache_dir: Folder of the results cache. None disables the cache.
+
+    Returns:
+    - DataFrame with one row per (grau, held_out) fold and the calculate_metrics columns.
+    """
+    df = load_and_clean_csv(csv_path, is_train_csv=True)
+    candidates = [(grau, held_out) for grau in degrees for held_out in rpm_levels(df)]
+
+    cache_path = None
+    results = {}
+    if cache_dir is not None:
+        # MODEL_ARTIFACT_VERSION is bumped when the fit changes, so metrics of an older fit are never read back
+        cache_path = os.path.join(cache_dir, f"sweep_v{MODEL_ARTIFACT_VERSION}_{file_hash(csv_path)[:16]}.json")
+        results = _load_results(cache_path)
+
+    missing = [(grau, held_out) for grau, held_out in candidates if f"{grau}|{held_out}" not in results]
+    if missing:
+        log.info("Evaluating %d of %d candidates (%d cached)", len(missing), len(candidates), len(candidates) - len(missing))
+        if jobs == 1 or len(missing) <= 1:
+            evaluated = [_evaluate_candidate(df, grau, held_out) for grau, held_out in missing]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                evaluated = list(executor.map(_evaluate_candidate, [df] * len(missing), *zip(*missing)))
+
+        for row in evaluated:
+            results[f"{row['grau']}|{row['held_out']}"] = row
+        if cache_path is not None:
+            _store_results(cache_path, results)
+
+    return pd.DataFrame([results[f"{grau}|{held_out}"] for grau, held_out in candidates])
+
+
+def rank_degrees(folds: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates the folds of sweep_folds per degree and ranks the degrees by mean held-out RMSE.
+
+    Returns:
+    - DataFrame indexed by rank with the columns grau, rmse, mae, mean_diff (means over the folds),
+      max_diff (worst fold), worst_held_out (level of the worst RMSE fold) and folds.
+    """
+    grouped = folds.groupby('grau')
+    ranking = grouped[['rmse', 'mae', 'mean_diff']].mean()
+    ranking['max_diff'] = grouped['max_diff'].max()
+    ranking['worst_held_out'] = folds.loc[grouped['rmse'].idxmax(), ['grau', 'held_out']].set_index('grau')['held_out']
+    ranking['folds'] = grouped.size()
+
+    ranking = ranking.sort_values(['rmse', 'mae']).reset_index()
+    ranking.index = pd.RangeIndex(1, len(ranking) + 1, name='rank')
+    return ranking
+
+
+def format_ranking(ranking: pd.DataFrame) -> str:
+    """Formats the rank_degrees table for the terminal."""
+    return ranking.to_string(float_format=lambda value: f"{value:.3f}")
+
+
+def select_model(
+    csv_path: str = DEFAULT_TRAIN_CSV,
+    degrees: list[int] = DEFAULT_DEGREES,
+    jobs: int | None = None,
+    cache_dir: str | None = DEFAULT_SELECTION_DIR,
+    log_in_terminal: bool = True
+) -> pd.DataFrame:
+    """
+    Runs the degree sweep (sweep_folds) and returns the ranking of rank_degrees, best degree first.
+    """
+    ranking = rank_degrees(sweep_folds(csv_path, degrees=degrees, jobs=jobs, cache_dir=cache_dir))
+
+    if log_in_terminal:
+        print("\n=== SELEÇÃO DE MODELO (leave-one-RPM-level-out) ===")
+        print(format_ranking(ranking))
+        print(f"\nMelhor grau: {int(ranking['grau'].iloc[0])}")
+
+    return ranking
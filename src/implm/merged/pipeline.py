@@ -1,14 +1,25 @@
-import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
 
 import sys
 import os
+import importlib.util
+import logging
 
 from src.interval.split_frame import split_df_by_intervals_as_relative_time
 from src.interval.interval import Interval
-from src.implm.merged.db_math_regression import predict_with_model
+from src.interval.entries_frame import EntriesFrame
+from src.interval.alignment import AlignMode
+from src.interval.timestamps import clock_datetimes, format_clock_times, time_strings_to_seconds
+from src.implm.merged.columns import MergedCol, JOIN_BASE_DATE
+from src.interval.detection import detect_runs
+from src.implm.merged.db_math_regression import NoiseModel, default_model
+from src.implm.merged.cache import cache_key, load_cached_frame, store_cached_frame, DEFAULT_MAX_CACHE_BYTES
+from src.implm.merged.gap_fill import FillPolicy, fill_time_gaps
+from src.implm.merged.time_join import TimeJoin, asof_join
+from src.implm.output import OutputFormat, with_extension, write_frame
+from src.instrumentation import Stage, get_logger, stage
+
+log = get_logger(__name__)
 
 
 dataFolder = os.path.join(os.path.dirname(__file__), 'data')
@@ -23,26 +34,117 @@ merged_csv_path = os.path.join(tmp_folder, 'merged_data.csv')
 
 _frames:list[pd.DataFrame] | None = None
 
-def merge_csv_files(base_csv_path:str, java_csv_path:str) -> pd.DataFrame:
+def fast_csv_engine() -> str | None:
+    """
+    Returns the fastest installed CSV parse engine for pd.read_csv ('pyarrow'), or None for the default one.
+    """
+    return 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else None
+
+
+def hw_info_columns(base_csv_path:str, extra_columns:list[str] | None = None) -> list[str]:
+    """
+    Returns the projected HWiNFO columns (MergedCol plus extra_columns), checking they exist in the file header.
+    """
+    header = pd.read_csv(base_csv_path, nrows=0).columns
+    columns = list(dict.fromkeys(MergedCol.hardware_read_columns() + list(extra_columns or [])))
+    
+    missing = [col for col in columns if col not in header]
+    if missing:
+        raise ValueError(f"Missing required columns in {base_csv_path}: {missing}")
+    
+    # Keep the file order, so every parse engine returns the same layout
+    return [col for col in header if col in columns]
+
+
+def read_hw_info_csv(base_csv_path:str, extra_columns:list[str] | None = None, engine:str | None = None) -> pd.DataFrame:
+    """
+    Read only the HWiNFO columns used by the merged pipeline, with compact dtypes.
+    
+    Parameters:
+    - base_csv_path: Path to the HWiNFO CSV file.
+    - extra_columns: Additional raw columns to read besides the ones listed by MergedCol.
+    - engine: pd.read_csv engine. Use fast_csv_engine() to pick the fastest installed one.
+    
+    Returns:
+    - DataFrame with the projected columns.
+    """
+    columns = hw_info_columns(base_csv_path, extra_columns)
+    return pd.read_csv(base_csv_path, usecols=columns, dtype=MergedCol.hardware_dtypes(columns), engine=engine)
+
+
+def read_java_csv(java_csv_path:str) -> pd.DataFrame:
+    """
+    Read the Java fan controller CSV file with compact dtypes.
+    The default parse engine is always used: the file is small (one row per second) and
+    pyarrow infers 'MM:SS' relative times as time of day, turning '00:01' into '00:01:00'.
+    """
+    return pd.read_csv(java_csv_path, dtype=MergedCol.java_dtypes())
+
+
+def merge_csv_files(base_csv_path:str, java_csv_path:str, projected:bool = False, extra_columns:list[str] | None = None, engine:str | None = None,
+                    join:TimeJoin = TimeJoin.BACKWARD, tolerance:str = '1s') -> pd.DataFrame:
+    """
+    Merge the HWiNFO and Java CSV files on the timestamp.
+    
+    Parameters:
+    - base_csv_path: Path to the HWiNFO CSV file.
+    - java_csv_path: Path to the Java CSV file.
+    - projected: Read only the columns listed by MergedCol (plus extra_columns) with compact dtypes,
+      instead of all the HWiNFO columns.
+    - extra_columns: Additional raw HWiNFO columns kept when projected is True.
+    - engine: pd.read_csv engine used when projected is True.
+    - join: How samples are matched with Java rows (see TimeJoin and join_base_and_rpm).
+    - tolerance: Maximum time distance of an as-of join.
+    """
     # Read both CSV files
-    base_df = pd.read_csv(base_csv_path)
-    rpm_df = pd.read_csv(java_csv_path)
+    with stage(Stage.READ) as s:
+        if projected:
+            base_df = read_hw_info_csv(base_csv_path, extra_columns=extra_columns, engine=engine)
+            rpm_df = read_java_csv(java_csv_path)
+        else:
+            base_df = pd.read_csv(base_csv_path)
+            rpm_df = pd.read_csv(java_csv_path)
+        s.rows_out = len(base_df) + len(rpm_df)
 
     # Remove last line of base_df
     if not base_df.empty and base_df.iloc[-1].isnull().all():
         base_df = base_df[:-1]
     
-    # Convert 'Time' to string first, then create join key by removing milliseconds
-    base_df['join_time'] = base_df['Time'].astype(str).str.split('.').str[0]
+    with stage(Stage.MERGE, rows_in=len(base_df) + len(rpm_df)) as s:
+        merged_df = join_base_and_rpm(base_df, rpm_df, join=join, tolerance=tolerance)
+        s.rows_out = len(merged_df)
+    return merged_df
+
+def join_base_and_rpm(base_df: pd.DataFrame, rpm_df: pd.DataFrame, join:TimeJoin = TimeJoin.BACKWARD, tolerance:str = '1s',
+                      start:pd.Timestamp | None = None) -> pd.DataFrame:
+    """
+    Join HWiNFO rows with Java rows.
+    
+    TimeJoin.EXACT is an inner join on the seconds of the time of day, parsed from 'Time' and
+    'Timestamp' with the milliseconds truncated. It does not reproduce the original string-split
+    join, which missed the unpadded seconds 0-9 of every minute ('17:40:0.776'), and it matches
+    the same time of day on different days, so it only suits logs shorter than a day.
+    The other modes parse both sides to datetime64 and run a sorted as-of join within tolerance,
+    collapsing duplicated timestamps first so the join cannot multiply rows (see asof_join).
+    """
+    if join != TimeJoin.EXACT:
+        return asof_join(base_df, rpm_df, direction=join, tolerance=tolerance, start=start)
+
+    # Join key: seconds since midnight, milliseconds of 'Time' truncated (unparsable times never match)
+    base_df['join_time'] = time_strings_to_seconds(base_df['Time'], errors='coerce')
+    base_df = base_df.dropna(subset=['join_time'])
     
     # Create corresponding join key from rpm_base_manual.csv Timestamp column
-    rpm_df['join_time'] = rpm_df['Timestamp']
+    rpm_df['join_time'] = time_strings_to_seconds(rpm_df['Timestamp'], errors='coerce')
     
-    # Perform the join operation
+    # Perform the join operation. On numeric keys pandas may move HWiNFO rows when a Java second is
+    # duplicated and another one is missing, so the rows are put back in the HWiNFO order
+    base_df = base_df.assign(join_row=range(len(base_df)))
     merged_df = pd.merge(base_df, rpm_df, on='join_time', how='inner')
+    merged_df = merged_df.sort_values('join_row', kind='stable', ignore_index=True)
     
-    # Remove the temporary join column
-    merged_df = merged_df.drop('join_time', axis=1)
+    # Remove the temporary join columns
+    merged_df = merged_df.drop(['join_time', 'join_row'], axis=1)
     merged_df = merged_df.drop('Time', axis=1, errors='ignore') 
     return merged_df
 
@@ -55,85 +157,33 @@ def pc_rpm_columns_merge(df: pd.DataFrame) -> pd.DataFrame:
         df['Velocidade Fan PC'] = df[['CPU [RPM]', 'GPU [RPM]']].mean(axis=1)
         # Calcula a diferença absoluta entre CPU e GPU RPM
         df['Diferença fan (abs)'] = (df['CPU [RPM]'] - df['GPU [RPM]']).abs()
-        # Exibe estatísticas básicas da diferença
-        print("Diferença média entre CPU e GPU fan (RPM):", df['Diferença fan (abs)'].mean())
-        print("Diferença máxima:", df['Diferença fan (abs)'].max())
-        print("Diferença mínima:", df['Diferença fan (abs)'].min())
+        # Exibe estatísticas básicas da diferença (calculadas só com DEBUG ativo, a função roda a cada chunk)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Diferença média entre CPU e GPU fan (RPM): %s", df['Diferença fan (abs)'].mean())
+            log.debug("Diferença máxima: %s", df['Diferença fan (abs)'].max())
+            log.debug("Diferença mínima: %s", df['Diferença fan (abs)'].min())
     else:
-        print("Colunas 'CPU [RPM]' e/ou 'GPU [RPM]' não encontradas no DataFrame.")
+        log.warning("Colunas 'CPU [RPM]' e/ou 'GPU [RPM]' não encontradas no DataFrame.")
 
     return df
 
-def fix_dataframe_inconsistencies(dataframe: pd.DataFrame) -> pd.DataFrame:
+def fix_dataframe_inconsistencies(dataframe: pd.DataFrame, fill_policy: FillPolicy = FillPolicy.FFILL) -> pd.DataFrame:
     """
     Fix gaps in the CSV file by:
-    1. Converting timestamps to datetime format
-    2. Filling in missing timestamps (when gap > 1 second) with interpolated rows
+    1. Converting timestamps to datetime format, on the day of the HWiNFO 'Date' column when present
+       (so runs crossing midnight stay in order)
+    2. Filling in missing timestamps (when gap > 1 second) according to fill_policy
     3. Removing duplicates
     """
     # Ensure 'Timestamp' is in datetime format
-    dataframe['Timestamp'] = pd.to_datetime(dataframe['Timestamp'], errors='coerce', format="%H:%M:%S")
-    
-    # Sort by 'Timestamp'
-    dataframe = dataframe.sort_values(by='Timestamp')
-    
-    # Create a list to hold the original and interpolated rows
-    all_rows = []
-    
-    # Process rows to fill gaps
-    for i in range(len(dataframe) - 1):
-        current_row = dataframe.iloc[i].copy()
-        next_row = dataframe.iloc[i+1]
-        
-        all_rows.append(current_row)
-        
-        # Calculate the time difference in seconds
-        time_diff = (next_row['Timestamp'] - current_row['Timestamp']).total_seconds()
-        
-        # If gap is more than 1 second, create interpolated rows
-        if time_diff > 1.0:
-            print(f"Filling gap of {time_diff} seconds between {current_row['Timestamp']} and {next_row['Timestamp']}")
-            for sec in range(1, int(time_diff)):
-                # Create a new row by copying the current row
-                new_row = current_row.copy()
-                
-                # Update Timestamp
-                new_row['Timestamp'] = current_row['Timestamp'] + pd.Timedelta(seconds=sec)
-                
-                # Update relativeTime if it exists (format: MM:SS)
-                if 'relativeTime' in dataframe.columns:
-                    # Parse the relative time
-                    if isinstance(current_row['relativeTime'], str) and ':' in current_row['relativeTime']:
-                        mins, secs = map(int, current_row['relativeTime'].split(':'))
-                        total_secs = mins * 60 + secs + sec
-                        new_mins = total_secs // 60
-                        new_secs = total_secs % 60
-                        new_row['relativeTime'] = f"{new_mins:02d}:{new_secs:02d}"
-                
-                # Reset the index so the new row does not keep the original index
-                new_row = new_row.copy()
-                new_row.name = None  # Remove the index name
-                
-                all_rows.append(new_row)
-    
-    # Add the last row
-    if len(dataframe) > 0:
-        all_rows.append(dataframe.iloc[-1])
+    dates = dataframe[JOIN_BASE_DATE] if JOIN_BASE_DATE in dataframe.columns else None
+    dataframe['Timestamp'] = clock_datetimes(dataframe['Timestamp'], dates=dates)
     
-    # Create a new DataFrame from all rows
-    result_df = pd.DataFrame(all_rows)
-
-    # Remove duplicates based on 'Timestamp'
-    result_df = result_df.drop_duplicates(subset='Timestamp')
-    
-    # Sort again to ensure proper order
-    result_df = result_df.sort_values(by='Timestamp')
-    
-    # Reset index to ensure it is sequential
-    result_df = result_df.reset_index(drop=True)
+    # Reindex onto a continuous per second timeline (sorted, deduplicated and with sequential index)
+    result_df = fill_time_gaps(dataframe, time_col='Timestamp', relative_time_col='relativeTime', policy=fill_policy)
 
     # Convert 'Timestamp' back to string format HH:MM:SS
-    result_df['Timestamp'] = result_df['Timestamp'].dt.strftime('%H:%M:%S')
+    result_df['Timestamp'] = format_clock_times(result_df['Timestamp'])
     # result_df.drop(columns=['Unnamed: 294'], inplace=True, errors='ignore')
 
     result_df.rename(columns={'RPM': 'Velocidade Fan Base'}, inplace=True)
@@ -165,60 +215,92 @@ def fix_dataframe_inconsistencies(dataframe: pd.DataFrame) -> pd.DataFrame:
 
     return result_df
 
-def get_intervals_from_df(df: pd.DataFrame) -> list[Interval]:
+def get_intervals_from_df(df: pd.DataFrame, min_duration: int = 0, debounce: int = 0) -> list[Interval]:
     """
     Extracts the sequential intervals from the 'relativeTime' column of the DataFrame that IsTestRunning is true.
     Returns a list of Interval objects.
+
+    Parameters:
+    - min_duration: Intervals shorter than this many seconds are discarded.
+    - debounce: IsTestRunning drops of up to this many seconds are ignored instead of splitting the interval.
     """
-    intervals = []
-    
-    start_time = None
-    
-    for i, row in df.iterrows():
-        is_test_running = row['IsTestRunning']
-        relative_time = row['relativeTime']
-        
+    with stage(Stage.INTERVAL_DETECTION, rows_in=len(df)) as s:
+        runs = detect_runs(df, flag_col='IsTestRunning', time_col='relativeTime', min_duration=min_duration, debounce=debounce)
 
-        # If IsTestRunning is True and we don't have a start time, mark the start
-        if is_test_running and start_time is None:
-            start_time = relative_time
-        
-        # If IsTestRunning is False and we have a start time, mark the end and create interval
-        elif not is_test_running and start_time is not None:
-            # The end time is the previous row's time (last True value)
-            if i > 0:
-                end_time = df.iloc[i]['relativeTime']
-                intervals.append(Interval.from_range_string(f"{start_time} - {end_time}"))
-                print(f"Interval added: {start_time} - {end_time}")
-            start_time = None
-    # Handle case where the DataFrame ends with IsTestRunning = True
-    if start_time is not None:
-        end_time = df.iloc[-1]['relativeTime']
-        intervals.append(Interval.from_range_string(f"{start_time} - {end_time}"))
-        print(f"Final interval added: {start_time} - {end_time}")
-    
+        intervals = []
+        for start, end in zip(runs['start'].tolist(), runs['end'].tolist()):
+            intervals.append(Interval(start, end))
+            log.debug("Interval added: %ss - %ss", start, end)
+        s.rows_out = len(intervals)
+
+    log.info("Detected %d interval(s)", len(intervals))
     return intervals
 
-def get_merged_frame(HW_info_csv:str, java_csv_path:str, output_final_file:str = None) -> pd.DataFrame:
+def get_merged_frame(HW_info_csv:str, java_csv_path:str, output_final_file:str = None, fill_policy: FillPolicy = FillPolicy.FFILL, projected: bool = False,
+                     cache_dir:str | None = None, max_cache_bytes:int = DEFAULT_MAX_CACHE_BYTES,
+                     join:TimeJoin = TimeJoin.BACKWARD, tolerance:str = '1s', model: NoiseModel | None = None,
+                     output_format:OutputFormat = OutputFormat.CSV, skip_unchanged:bool = True) -> pd.DataFrame:
     """
     Get the merged DataFrame from base and RPM CSV files.
     
     Parameters:
     - HW_info_csv: Path to the base CSV file.
     - java_csv_path: Path to the RPM CSV file.
-    - interpolate: Whether to fill gaps in the data.
+    - output_final_file: Optional path where the merged DataFrame is saved, with its extension replaced by the one of output_format.
+    - fill_policy: How rows inserted into time gaps are filled (see FillPolicy).
+    - projected: Read only the HWiNFO columns listed by MergedCol, using the fastest installed parse engine.
+    - cache_dir: Folder of the merged frame cache. When set, a run whose inputs, schema and model
+      did not change is loaded from the cache instead of running the pipeline again.
+    - max_cache_bytes: Size limit of the cache folder (least recently used entries are evicted).
+    - join: How HWiNFO samples are matched with Java rows (see TimeJoin).
+    - tolerance: Maximum time distance of an as-of join.
+    - model: NoiseModel used to estimate the noise level. Defaults to the model of the default rig.
+    - output_format: File format of output_final_file (see OutputFormat).
+    - skip_unchanged: Do not write output_final_file again when its content did not change.
     
     Returns:
     - Merged DataFrame with fixed inconsistencies.
     """
-    df = merge_csv_files(HW_info_csv, java_csv_path)
-    df = pc_rpm_columns_merge(df)
-    df = fix_dataframe_inconsistencies(df)
-    df = predict_with_model(df)
+    if model is None:
+        model = default_model()
+    
+    key = None
+    df = None
+    if cache_dir is not None:
+        key = cache_key(HW_info_csv, java_csv_path, model=model.fingerprint(), fill_policy=fill_policy.value, projected=projected,
+                        join=join.value, tolerance=tolerance)
+        with stage(Stage.CACHE) as s:
+            df = load_cached_frame(cache_dir, key)
+            s.rows_out = None if df is None else len(df)
+        if df is not None:
+            log.info("Merged DataFrame loaded from cache %s", key[:12])
+    
+    if df is None:
+        df = merge_csv_files(HW_info_csv, java_csv_path, projected=projected, engine=fast_csv_engine() if projected else None,
+                             join=join, tolerance=tolerance)
+        with stage(Stage.RPM_MERGE, rows_in=len(df)) as s:
+            df = pc_rpm_columns_merge(df)
+            s.rows_out = len(df)
+        with stage(Stage.GAP_FILL, rows_in=len(df)) as s:
+            df = fix_dataframe_inconsistencies(df, fill_policy=fill_policy)
+            s.rows_out = len(df)
+        with stage(Stage.PREDICT, rows_in=len(df)) as s:
+            df = model.predict(df)
+            s.rows_out = len(df)
+        
+        if key is not None:
+            with stage(Stage.CACHE, rows_in=len(df)):
+                store_cached_frame(cache_dir, key, df, max_bytes=max_cache_bytes)
     
     if output_final_file:
-        df.to_csv(output_final_file, index=False)
-        print(f"Merged DataFrame saved to {output_final_file}")
+        output_final_file = with_extension(output_final_file, output_format)
+        with stage(Stage.WRITE, rows_in=len(df)) as s:
+            written = write_frame(df, output_final_file, fmt=output_format, skip_unchanged=skip_unchanged)
+            s.rows_out = len(df) if written else 0
+        if written:
+            log.info("Merged DataFrame saved to %s", output_final_file)
+        else:
+            log.info("Merged DataFrame unchanged in %s", output_final_file)
     
     return df
 
@@ -229,8 +311,10 @@ def get_splitted_frames(df: pd.DataFrame) -> list[pd.DataFrame]:
     """
  
     intervals = get_intervals_from_df(df)
-    frames = split_df_by_intervals_as_relative_time(df, intervals, time_col='relativeTime')
-    print(frames)
+    with stage(Stage.SPLIT, rows_in=len(df)) as s:
+        frames = split_df_by_intervals_as_relative_time(df, intervals, time_col='relativeTime')
+        s.rows_out = sum(len(frame) for frame in frames)
+    log.debug("%s", frames)
     # frames = []
     # for interval in intervals:
     #     start_time = interval.start
@@ -250,19 +334,45 @@ def get_splitted_frames(df: pd.DataFrame) -> list[pd.DataFrame]:
     return frames
 
 
-def get_splitted_frames_from_csv(Base_csv:str, java_csv_path:str = None, output_path:str = None) -> list[pd.DataFrame]:
+def get_entries_frame(df: pd.DataFrame, align: AlignMode = AlignMode.INTERPOLATE, points: int | None = None) -> EntriesFrame:
+    """
+    Build the EntriesFrame of the test cases detected in a merged DataFrame.
+    
+    Detected cases rarely have exactly the same length, so they are aligned onto a shared timeline.
+    
+    Parameters:
+    - df: Merged DataFrame (see get_merged_frame).
+    - align: How cases of different lengths are aligned (see AlignMode).
+    - points: Length of the shared timeline. Defaults to the longest case (INTERPOLATE) or the shortest (TRUNCATE).
+    
+    Returns:
+    - EntriesFrame with one case per detected interval.
+    """
+    intervals = get_intervals_from_df(df)
+    with stage(Stage.SPLIT, rows_in=len(df)) as s:
+        frame = EntriesFrame.from_intervals(df, intervals, align=align, points=points, time_col='relativeTime')
+        s.rows_out = frame.values.shape[0] * frame.values.shape[1]
+    return frame
+
+def get_splitted_frames_from_csv(Base_csv:str, java_csv_path:str = None, output_path:str = None, cache_dir:str | None = None,
+                                 model: NoiseModel | None = None, output_format:OutputFormat = OutputFormat.CSV) -> list[pd.DataFrame]:
     """
     Get the splitted DataFrames from base and RPM CSV files.
     
     Parameters:
     - Base_csv: Path to the base CSV file.
     - java_csv_path: Path to the RPM CSV file.
+    - output_path: Folder where merged_data is saved.
+    - cache_dir: Optional merged frame cache folder (see get_merged_frame).
+    - model: NoiseModel used to estimate the noise level (see get_merged_frame).
+    - output_format: File format of merged_data (see OutputFormat).
     
     Returns:
     - List of DataFrames split by intervals.
     """
     if java_csv_path is not None:
-        df = get_merged_frame(Base_csv, java_csv_path, output_final_file=os.path.join(output_path, 'merged_data.csv'))
+        df = get_merged_frame(Base_csv, java_csv_path, output_final_file=os.path.join(output_path, 'merged_data.csv'), cache_dir=cache_dir,
+                              model=model, output_format=output_format)
     else:
         df = pd.read_csv(Base_csv)
         
@@ -0,0 +1,103 @@
+import numpy as np
+
+DEFAULT_BLOCK_ROWS = 1 << 20
+
+
+class PolynomialTable:
+    """
+    Fitted polynomial of two variables stored as a coefficient/exponent table:
+    value = intercept + sum(coefficients[i] * x0 ** exponents[i, 0] * x1 ** exponents[i, 1]).
+
+    Only NumPy arrays are stored, so a table can be pickled and evaluated without scikit-learn.
+    """
+
+    def __init__(self, exponents: np.ndarray, coefficients: np.ndarray, intercept: float):
+        self.exponents = np.asarray(exponents, dtype=np.int64).reshape(-1, 2)
+        self.coefficients = np.asarray(coefficients, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+
+        if len(self.exponents) != len(self.coefficients):
+            raise ValueError("Every coefficient needs one exponent pair.")
+        if (self.exponents < 0).any():
+            raise ValueError("Exponents must be non-negative.")
+
+    @property
+    def degree(self) -> int:
+        return int(self.exponents.sum(axis=1).max(initial=0))
+
+    def coefficient_grid(self) -> np.ndarray:
+        """
+        Returns the (degree + 1) x (degree + 1) matrix C where C[a, b] multiplies x0 ** a * x1 ** b.
+        The intercept is stored in C[0, 0].
+        """
+        size = self.degree + 1
+        grid = np.zeros((size, size), dtype=np.float64)
+        np.add.at(grid, (self.exponents[:, 0], self.exponents[:, 1]), self.coefficients)
+        grid[0, 0] += self.intercept
+        return grid
+
+    def __call__(self, x0, x1, block_rows: int = DEFAULT_BLOCK_ROWS) -> np.ndarray:
+        return evaluate_polynomial(self, x0, x1, block_rows=block_rows)
+
+    def __repr__(self):
+        return f"PolynomialTable(degree={self.degree}, terms={len(self.coefficients)})"
+
+
+def export_polynomial(model, poly_features) -> PolynomialTable:
+    """
+    Exports a fitted sklearn PolynomialFeatures + LinearRegression pair of two input features as a PolynomialTable.
+
+    :param model: Fitted LinearRegression (coef_ and intercept_).
+    :param poly_features: Fitted PolynomialFeatures (powers_).
+    :return: PolynomialTable computing the same values as model.predict(poly_features.transform(X)).
+    """
+    powers = np.asarray(poly_features.powers_)
+    if powers.shape[1] != 2:
+        raise ValueError(f"Expected a polynomial of 2 features, got {powers.shape[1]}.")
+
+    return PolynomialTable(powers, model.coef_, model.intercept_)
+
+
+def evaluate_polynomial(table: PolynomialTable, x0, x1, block_rows: int = DEFAULT_BLOCK_ROWS) -> np.ndarray:
+    """
+    Evaluates the polynomial for every (x0, x1) pair with a nested Horner scheme.
+
+    The expanded feature matrix is never built: rows are processed in blocks of block_rows
+    and each block only needs two temporary arrays, so memory stays bounded for any input size.
+
+    :param table: Polynomial to evaluate.
+    :param x0: First feature values (e.g. 'Velocidade Fan Base').
+    :param x1: Second feature values (e.g. 'Velocidade Fan PC'), same length as x0.
+    :param block_rows: Number of rows evaluated at once.
+    :return: float64 array with one value per pair.
+    """
+    x0 = np.asarray(x0, dtype=np.float64).ravel()
+    x1 = np.asarray(x1, dtype=np.float64).ravel()
+    if x0.shape != x1.shape:
+        raise ValueError("x0 and x1 must have the same length.")
+
+    grid = table.coefficient_grid()
+    result = np.empty_like(x0)
+
+    for begin in range(0, len(x0), block_rows):
+        block = slice(begin, begin + block_rows)
+        a, b = x0[block], x1[block]
+        out = result[block]
+        inner = np.empty_like(b)
+
+        # value = (...(P_d(x1) * x0 + P_{d-1}(x1)) * x0 + ...) + P_0(x1), with P_k(x1) = sum_j C[k, j] * x1 ** j
+        out.fill(0.0)
+        for row in grid[::-1]:
+            _horner(row, b, inner)
+            out *= a
+            out += inner
+
+    return result
+
+
+def _horner(coefficients: np.ndarray, x: np.ndarray, out: np.ndarray):
+    """Writes sum(coefficients[j] * x ** j) into out."""
+    out.fill(coefficients[-1])
+    for coefficient in coefficients[-2::-1]:
+        out *= x
+        out += coefficient
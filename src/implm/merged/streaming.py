@@ -0,0 +1,208 @@
+import importlib.util
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.implm.merged.columns import MergedCol
+from src.implm.merged.db_math_regression import NoiseModel, default_model
+from src.implm.merged.gap_fill import FillPolicy
+from src.implm.merged.time_join import TimeJoin, hw_info_datetimes
+from src.implm.merged.pipeline import (
+    hw_info_columns, read_java_csv, join_base_and_rpm, pc_rpm_columns_merge, fix_dataframe_inconsistencies
+)
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+class IncrementalMerger:
+    """
+    Merges consecutive HWiNFO chunks with the Java rows, keeping only the state needed at chunk boundaries:
+    the last 'Time' seen (deduplication), the datetime the Java log is anchored on and the last merged row
+    (gap filling across the boundary). The HWiNFO chunks are expected in time order, as written by the logger.
+    """
+
+    def __init__(
+        self,
+        fill_policy: FillPolicy = FillPolicy.FFILL,
+        join: TimeJoin = TimeJoin.BACKWARD,
+        tolerance: str = '1s',
+        model: NoiseModel | None = None
+    ):
+        self.fill_policy = fill_policy
+        self.join = join
+        self.tolerance = tolerance
+        self.model = model if model is not None else default_model()
+
+        self.last_time = None
+        self.start: pd.Timestamp | None = None
+        self.carry: pd.DataFrame | None = None
+
+    def merge(self, chunk: pd.DataFrame, rpm_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the merged, gap-filled and predicted rows of chunk (possibly none).
+        rpm_df must hold every Java row the samples of chunk can be matched with.
+        """
+        chunk = chunk.dropna(how='all')
+        if self.last_time is not None:
+            chunk = chunk[chunk['Time'] != self.last_time]
+        chunk = chunk.drop_duplicates(subset='Time')
+        if chunk.empty:
+            return chunk
+        self.last_time = chunk['Time'].iloc[-1]
+
+        # The Java log is anchored on the first sample of the whole log, not of each chunk
+        if self.start is None and self.join != TimeJoin.EXACT:
+            self.start = hw_info_datetimes(chunk).dropna().min()
+
+        merged = join_base_and_rpm(chunk, rpm_df, join=self.join, tolerance=self.tolerance, start=self.start)
+        if merged.empty:
+            return merged
+
+        # The last merged row of the previous chunk is prepended so gaps across the boundary are filled,
+        # then removed again since it was already emitted. The gap fill sorts stably and keeps the first
+        # row of a duplicated second, so a sample of the same second as the carry row is dropped here
+        # and the carry row is always the first one
+        has_carry = self.carry is not None
+        if has_carry:
+            merged = pd.concat([self.carry, merged], ignore_index=True)
+        self.carry = merged.iloc[[-1]].copy()
+
+        merged = pc_rpm_columns_merge(merged)
+        merged = fix_dataframe_inconsistencies(merged, fill_policy=self.fill_policy)
+        if has_carry:
+            merged = merged.iloc[1:].reset_index(drop=True)
+
+        return self.model.predict(merged) if not merged.empty else merged
+
+
+def stream_merged_chunks(
+    base_csv_path: str,
+    java_csv_path: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    extra_columns: list[str] | None = None,
+    fill_policy: FillPolicy = FillPolicy.FFILL,
+    join: TimeJoin = TimeJoin.BACKWARD,
+    tolerance: str = '1s',
+    model: NoiseModel | None = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads the HWiNFO log in bounded chunks and yields merged, gap-filled and predicted chunks.
+
+    Only the projected columns (MergedCol plus extra_columns) are read. The Java log is small
+    (one row per second) and is loaded once. The HWiNFO log is expected in time order, as written
+    by the logger, so deduplication on 'Time' and gap filling only need the last row of the previous chunk.
+    When two samples fall in the same second, the first one in file order is kept and the rows filling
+    the gap after it copy the last one, as in the in-memory path (get_merged_frame), also when the
+    two samples are in different chunks.
+
+    Parameters:
+    - base_csv_path: Path to the HWiNFO CSV file.
+    - java_csv_path: Path to the Java CSV file.
+    - chunk_rows: Number of HWiNFO rows read per chunk. Peak memory is bounded by this value.
+    - extra_columns: Additional raw HWiNFO columns to keep.
+    - fill_policy: How rows inserted into time gaps are filled (see FillPolicy).
+    - join: How samples are matched with Java rows (see TimeJoin).
+    - tolerance: Maximum time distance of an as-of join.
+    - model: NoiseModel used to estimate the noise level. Defaults to the model of the default rig.
+    """
+    merger = IncrementalMerger(fill_policy=fill_policy, join=join, tolerance=tolerance, model=model)
+
+    columns = hw_info_columns(base_csv_path, extra_columns)
+    rpm_df = read_java_csv(java_csv_path)
+
+    reader = pd.read_csv(base_csv_path, usecols=columns, dtype=MergedCol.hardware_dtypes(columns), chunksize=chunk_rows)
+    for chunk in reader:
+        merged = merger.merge(chunk, rpm_df)
+        if not merged.empty:
+            yield merged
+
+
+class FileSink:
+    """
+    Appends merged chunks to a single file: parquet when the path ends with '.parquet'
+    (requires pyarrow), CSV otherwise.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer = None
+        self._started = False
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        if path.endswith('.parquet') and importlib.util.find_spec('pyarrow') is None:
+            raise ValueError("Writing parquet files requires pyarrow to be installed.")
+
+    def write(self, chunk: pd.DataFrame):
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            chunk.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class IntervalSplitSink:
+    """
+    Splits merged chunks into one CSV file per test case ({output_prefix}{n}.csv) as they arrive.
+
+    A case holds the rows where IsTestRunning is true plus the first row after it,
+    the same boundaries used by get_intervals_from_df.
+    """
+
+    def __init__(self, output_prefix: str, flag_col: str = MergedCol.IS_TEST_RUNNING.original):
+        self.output_prefix = output_prefix
+        self.flag_col = flag_col
+        self.cases = 0
+        self._in_run = False
+        self._written: set[int] = set()
+        Path(f"{output_prefix}0").parent.mkdir(parents=True, exist_ok=True)
+
+    def case_path(self, case: int) -> str:
+        return f"{self.output_prefix}{case}.csv"
+
+    def write(self, chunk: pd.DataFrame):
+        flag = chunk[self.flag_col].to_numpy(dtype=bool)
+        previous = np.concatenate(([self._in_run], flag[:-1]))
+
+        starts = flag & ~previous
+        case_ids = self.cases + np.cumsum(starts)
+        include = flag | previous
+
+        for case in np.unique(case_ids[include]):
+            rows = chunk[include & (case_ids == case)]
+            started = int(case) in self._written
+            rows.to_csv(self.case_path(int(case)), mode='a' if started else 'w', header=not started, index=False)
+            self._written.add(int(case))
+
+        self.cases = int(case_ids[-1])
+        self._in_run = bool(flag[-1])
+
+    def close(self):
+        pass
+
+
+def stream_to_sink(chunks: Iterator[pd.DataFrame], sink) -> int:
+    """
+    Writes every chunk into the sink and closes it.
+    Returns the number of rows written.
+    """
+    rows = 0
+    try:
+        for chunk in chunks:
+            sink.write(chunk)
+            rows += len(chunk)
+    finally:
+        sink.close()
+    return rows
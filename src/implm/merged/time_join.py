@@ -0,0 +1,113 @@
+from enum import Enum
+import pandas as pd
+
+from src.implm.merged.columns import JOIN_BASE_DATE, JOIN_BASE_TIMESTAMP, JOIN_RPM_TIMESTAMP
+from src.interval.timestamps import (
+    ROLLOVER_THRESHOLD, combine_date_time, time_strings_to_timedelta, with_midnight_rollover
+)
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
+
+JOIN_KEY = 'join_datetime'
+
+
+class TimeJoin(Enum):
+    """How HWiNFO samples are matched with the Java fan controller rows."""
+    EXACT = 'exact'         # Inner join on the parsed seconds of the time of day (milliseconds truncated)
+    BACKWARD = 'backward'   # Last Java row at or before the sample, within the tolerance
+    NEAREST = 'nearest'     # Closest Java row to the sample, within the tolerance
+
+
+def hw_info_datetimes(base_df: pd.DataFrame) -> pd.Series:
+    """
+    Parses the HWiNFO 'Date' (D.M.YYYY) and 'Time' (HH:MM:SS.fff) columns into datetime64.
+    Without a 'Date' column, times are placed on DEFAULT_DAY and a day is added on every midnight rollover.
+    """
+    if JOIN_BASE_DATE in base_df.columns:
+        return combine_date_time(base_df[JOIN_BASE_DATE], base_df[JOIN_BASE_TIMESTAMP])
+    return with_midnight_rollover(base_df[JOIN_BASE_TIMESTAMP])
+
+
+def java_datetimes(rpm_df: pd.DataFrame, start: pd.Timestamp) -> pd.Series:
+    """
+    Parses the Java 'Timestamp' (HH:MM:SS) column into datetime64, anchored on the day of start.
+    The Java log has no date, so a day is added on every midnight rollover.
+    """
+    times = pd.Series(time_strings_to_timedelta(rpm_df[JOIN_RPM_TIMESTAMP]), index=rpm_df.index)
+    day = start.normalize()
+
+    # A Java log started shortly before midnight belongs to the previous day of the first HWiNFO sample
+    first = times.dropna()
+    if not first.empty and first.iloc[0] - (start - day) > ROLLOVER_THRESHOLD:
+        day -= pd.Timedelta(days=1)
+
+    return with_midnight_rollover(times, day)
+
+
+def collapse_duplicate_times(df: pd.DataFrame, key: str, label: str) -> pd.DataFrame:
+    """
+    Keeps the first row of every duplicated key, so the join cannot multiply rows.
+    Reports how many rows were collapsed.
+    """
+    duplicated = df[key].duplicated(keep='first')
+    count = int(duplicated.sum())
+    if count:
+        log.info("Collapsed %d rows with duplicated timestamps in %s", count, label)
+        df = df[~duplicated]
+    return df
+
+
+def asof_join(
+    base_df: pd.DataFrame,
+    rpm_df: pd.DataFrame,
+    direction: TimeJoin = TimeJoin.BACKWARD,
+    tolerance: str = '1s',
+    start: pd.Timestamp | None = None
+) -> pd.DataFrame:
+    """
+    Sorted as-of join of HWiNFO samples with the Java rows.
+
+    Parameters:
+    - base_df: HWiNFO DataFrame with 'Time' (and optionally 'Date').
+    - rpm_df: Java DataFrame with 'Timestamp'.
+    - direction: TimeJoin.BACKWARD or TimeJoin.NEAREST.
+    - tolerance: Maximum distance between a sample and its Java row. With BACKWARD and '1s'
+      the result matches the exact join on the truncated second, except that a sample landing
+      exactly on a missing second is matched with the previous one instead of being dropped.
+    - start: Datetime the Java log is anchored on. Defaults to the first HWiNFO sample.
+      Ignored when rpm_df already holds the JOIN_KEY column (Java datetimes parsed beforehand,
+      e.g. incrementally by the live follower).
+
+    Returns:
+    - DataFrame with the HWiNFO columns followed by the Java columns, without 'Time'.
+      Samples without a Java row within the tolerance are dropped.
+    """
+    if direction == TimeJoin.EXACT:
+        raise ValueError("asof_join only supports TimeJoin.BACKWARD and TimeJoin.NEAREST")
+
+    base_df = base_df.assign(**{JOIN_KEY: hw_info_datetimes(base_df)})
+    base_df = base_df.dropna(subset=[JOIN_KEY])
+    if base_df.empty:
+        return base_df.drop(columns=[JOIN_KEY, JOIN_BASE_TIMESTAMP], errors='ignore')
+
+    if start is None:
+        start = base_df[JOIN_KEY].iloc[0]
+    if JOIN_KEY not in rpm_df.columns:
+        rpm_df = rpm_df.assign(**{JOIN_KEY: java_datetimes(rpm_df, start)})
+    rpm_df = rpm_df.dropna(subset=[JOIN_KEY])
+
+    base_df = collapse_duplicate_times(base_df.sort_values(JOIN_KEY, kind='stable'), JOIN_KEY, 'HWiNFO log')
+    rpm_df = collapse_duplicate_times(rpm_df.sort_values(JOIN_KEY, kind='stable'), JOIN_KEY, 'Java log')
+
+    merged_df = pd.merge_asof(
+        base_df, rpm_df.drop(columns=['join_time'], errors='ignore'),
+        on=JOIN_KEY, direction=direction.value, tolerance=pd.Timedelta(tolerance)
+    )
+    merged_df = merged_df.dropna(subset=[JOIN_RPM_TIMESTAMP]).reset_index(drop=True)
+
+    # Unmatched samples turned the Java columns into float/object, restore their dtypes
+    rpm_columns = [col for col in rpm_df.columns if col in merged_df.columns and col != JOIN_KEY]
+    merged_df = merged_df.astype(rpm_df[rpm_columns].dtypes.to_dict())
+
+    return merged_df.drop(columns=[JOIN_KEY, JOIN_BASE_TIMESTAMP])
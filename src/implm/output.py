@@ -0,0 +1,192 @@
+import hashlib
+import importlib.util
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
+
+MANIFEST_FILE = '.output_hashes.json'
+DEFAULT_COMPRESSION = 'zstd'
+
+
+class OutputFormat(Enum):
+    """
+    File formats of the frames written by the pipelines.
+
+    CSV is plain text readable anywhere. PARQUET and FEATHER are compressed columnar formats
+    (zstd) written by pyarrow: much faster to write and read back, and several times smaller.
+    """
+    CSV = 'csv'
+    PARQUET = 'parquet'
+    FEATHER = 'feather'
+
+    @property
+    def extension(self) -> str:
+        return f".{self.value}"
+
+    @classmethod
+    def from_path(cls, path: str) -> 'OutputFormat | None':
+        """Returns the format whose extension path ends with, or None."""
+        ext = os.path.splitext(path)[1].lower()
+        return next((fmt for fmt in cls if fmt.extension == ext), None)
+
+
+def _write_csv(df: pd.DataFrame, path: str):
+    df.to_csv(path, index=False)
+
+
+def _write_parquet(df: pd.DataFrame, path: str):
+    df.to_parquet(path, index=False, compression=DEFAULT_COMPRESSION)
+
+
+def _write_feather(df: pd.DataFrame, path: str):
+    # Feather needs a default index; the other writers drop it as well
+    df.reset_index(drop=True).to_feather(path, compression=DEFAULT_COMPRESSION)
+
+
+# One writer per format: a new format needs an OutputFormat member and its writer here
+_WRITERS: dict[OutputFormat, Callable[[pd.DataFrame, str], None]] = {
+    OutputFormat.CSV: _write_csv,
+    OutputFormat.PARQUET: _write_parquet,
+    OutputFormat.FEATHER: _write_feather,
+}
+
+
+def check_output_format(fmt: OutputFormat):
+    """Raises ValueError when fmt cannot be written in this environment."""
+    if fmt != OutputFormat.CSV and importlib.util.find_spec('pyarrow') is None:
+        raise ValueError(f"Writing {fmt.value} files requires pyarrow (pip install pyarrow).")
+
+
+def with_extension(path: str, fmt: OutputFormat) -> str:
+    """
+    Returns path with the extension of fmt, replacing the extension of another OutputFormat
+    ('merged_data.csv' becomes 'merged_data.parquet') or appending it otherwise.
+    """
+    if OutputFormat.from_path(path) is not None:
+        path = os.path.splitext(path)[0]
+    return f"{path}{fmt.extension}"
+
+
+def frame_digest(df: pd.DataFrame, fmt: OutputFormat) -> str:
+    """
+    Returns the sha256 hex digest of what writing df as fmt produces: the format, the column names,
+    the dtypes and the values of every row (the index is never written, so it is not hashed).
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([fmt.value, [str(col) for col in df.columns], [str(dtype) for dtype in df.dtypes]]).encode())
+    if len(df.columns) and len(df):
+        digest.update(np.ascontiguousarray(pd.util.hash_pandas_object(df, index=False).to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+def _manifest_path(folder: str) -> str:
+    return os.path.join(folder, MANIFEST_FILE)
+
+
+def load_manifest(folder: str) -> dict[str, dict]:
+    """
+    Returns the digests of the frames written to folder ({file name: {'digest', 'size', 'mtime_ns'}}),
+    or an empty dict when there is none or it cannot be read.
+    """
+    try:
+        with open(_manifest_path(folder)) as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _store_manifest(folder: str, entries: dict[str, dict]):
+    # Entries are merged into the manifest on disk, keeping the ones of files written by other calls
+    manifest = load_manifest(folder)
+    manifest.update(entries)
+    path = _manifest_path(folder)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _unchanged(path: str, digest: str, entry: dict | None) -> bool:
+    # A file edited or replaced since it was written no longer has the recorded size and modification time
+    if entry is None or entry.get('digest') != digest:
+        return False
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return stat.st_size == entry.get('size') and stat.st_mtime_ns == entry.get('mtime_ns')
+
+
+def _write_one(df: pd.DataFrame, path: str, fmt: OutputFormat, skip_unchanged: bool, manifest: dict[str, dict]) -> tuple[str, dict | None]:
+    digest = frame_digest(df, fmt) if skip_unchanged else None
+    if skip_unchanged and _unchanged(path, digest, manifest.get(os.path.basename(path))):
+        return path, None
+
+    # Written next to the target and renamed, so a crash never leaves a truncated output
+    tmp_path = f"{path}.tmp"
+    _WRITERS[fmt](df, tmp_path)
+    os.replace(tmp_path, path)
+
+    stat = os.stat(path)
+    return path, {'digest': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_frames(frames: dict[str, pd.DataFrame], fmt: OutputFormat = OutputFormat.CSV, workers: int | None = None,
+                 skip_unchanged: bool = True) -> list[str]:
+    """
+    Writes every frame to its path (without the index), in parallel threads.
+
+    The pyarrow writers release the GIL, so PARQUET and FEATHER files are encoded on several cores;
+    CSV files overlap mostly their I/O. With skip_unchanged, the digest of every written frame is
+    kept in a manifest (MANIFEST_FILE) in its folder, and a frame whose digest, file size and
+    modification time match the manifest is not written again, so reruns do near-zero I/O.
+
+    :param frames: Frames to write by output path. The extension of the path is kept as given (see with_extension).
+    :param fmt: File format of every frame.
+    :param workers: Maximum number of threads. With 1 the frames are written in this thread.
+    :param skip_unchanged: Skip frames whose content did not change since the last write.
+    :return: Paths actually written, in the order of frames.
+    """
+    check_output_format(fmt)
+    folders = {os.path.dirname(path) or '.' for path in frames}
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+    manifests = {folder: load_manifest(folder) if skip_unchanged else {} for folder in folders}
+
+    def write(item: tuple[str, pd.DataFrame]) -> tuple[str, dict | None]:
+        path, df = item
+        return _write_one(df, path, fmt, skip_unchanged, manifests[os.path.dirname(path) or '.'])
+
+    if workers == 1 or len(frames) <= 1:
+        results = [write(item) for item in frames.items()]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(write, frames.items()))
+
+    written = [path for path, entry in results if entry is not None]
+    if skip_unchanged:
+        for folder in folders:
+            entries = {os.path.basename(path): entry for path, entry in results
+                       if entry is not None and (os.path.dirname(path) or '.') == folder}
+            if entries:
+                _store_manifest(folder, entries)
+
+    log.debug("Wrote %d of %d %s file(s)", len(written), len(frames), fmt.value)
+    return written
+
+
+def write_frame(df: pd.DataFrame, path: str, fmt: OutputFormat = OutputFormat.CSV, skip_unchanged: bool = True) -> bool:
+    """
+    Writes one frame to path (see write_frames). Returns False when it was skipped as unchanged.
+    """
+    return bool(write_frames({path: df}, fmt=fmt, workers=1, skip_unchanged=skip_unchanged))
@@ -0,0 +1,264 @@
+import cProfile
+import csv
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from enum import Enum
+
+LOGGER_NAME = 'src'
+DEFAULT_LOG_LEVEL = logging.INFO
+
+
+class Stage(Enum):
+    """Pipeline stages recorded by the profiler."""
+    CACHE = 'cache'
+    READ = 'read'
+    MERGE = 'merge'
+    RPM_MERGE = 'rpm merge'
+    GAP_FILL = 'gap fill'
+    PREDICT = 'predict'
+    INTERVAL_DETECTION = 'interval detection'
+    SPLIT = 'split'
+    WRITE = 'write'
+    PLOT = 'plot'
+
+
+def _console_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    return handler
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns the logger of a module (pass __name__). Loggers of the package print plain messages to the
+    console at DEFAULT_LOG_LEVEL until configure_logging changes the level. Use lazy arguments
+    (log.debug("rows: %s", df)) so disabled messages are never formatted.
+    """
+    root = logging.getLogger(LOGGER_NAME)
+    if not root.handlers:
+        root.addHandler(_console_handler())
+        root.setLevel(DEFAULT_LOG_LEVEL)
+        root.propagate = False
+    return logging.getLogger(name if name.startswith(LOGGER_NAME) else f"{LOGGER_NAME}.{name}")
+
+
+def configure_logging(level: str | int = DEFAULT_LOG_LEVEL):
+    """
+    Sets the console level of every logger of the package ('DEBUG', 'INFO', 'WARNING' or 'ERROR').
+    """
+    get_logger(LOGGER_NAME).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def add_instrumentation_args(parser):
+    """Adds the --log-level, --profile and --cprofile options shared by the command line entry points."""
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help="Console log level (default: INFO)")
+    parser.add_argument('--profile', metavar='REPORT', default=None, help="Record wall time, rows and peak memory per pipeline stage and save them as JSON (or CSV with a .csv path)")
+    parser.add_argument('--cprofile', metavar='PATH', default=None, help="Save cProfile statistics of the run to PATH")
+
+
+class StageHandle:
+    """Open stage; the code inside the stage sets rows_out once its output is known."""
+
+    def __init__(self, name: str, rows_in: int | None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out: int | None = None
+        self.peak = 0
+
+
+class _NullStage:
+    """Stage used without an active profiler: entering and leaving it costs two method calls."""
+    name = None
+    rows_in = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, key, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    """
+    Records the wall time, rows in/out and peak memory of every pipeline stage.
+
+    Peak memory is the largest amount of memory traced by tracemalloc during the stage above what
+    was allocated when it started (NumPy and pandas buffers included). Stages may be nested; the
+    peak of an inner stage also counts for the outer one. With cprofile, a cProfile profile of the
+    whole run is kept for dump_cprofile.
+    """
+
+    def __init__(self, memory: bool = True, cprofile: bool = False):
+        self.memory = memory
+        self.records: list[dict] = []
+        self._stack: list[StageHandle] = []
+        self._started_tracing = False
+        self._cprofile = cProfile.Profile() if cprofile else None
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: Stage | str, rows_in: int | None = None):
+        handle = StageHandle(name.value if isinstance(name, Stage) else name, rows_in)
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # The outer stage keeps the peak reached so far, since reset_peak also resets it
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+        self._stack.append(handle)
+        start = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            peak_bytes = None
+            if tracing:
+                handle.peak = max(handle.peak, tracemalloc.get_traced_memory()[1])
+                peak_bytes = max(0, handle.peak - current)
+                if self._stack:
+                    self._stack[-1].peak = max(self._stack[-1].peak, handle.peak)
+            self.records.append({
+                'stage': handle.name,
+                'depth': len(self._stack),
+                'seconds': elapsed,
+                'rows_in': handle.rows_in,
+                'rows_out': handle.rows_out,
+                'peak_bytes': peak_bytes,
+            })
+
+    def add_records(self, records: list[dict], **tags):
+        """Adds records made by another profiler (e.g. in a worker process), with extra columns such as folder=..."""
+        self.records.extend({**record, **tags} for record in records)
+
+    def summary(self) -> list[dict]:
+        """
+        Records aggregated per stage, in the order stages first ran: number of calls, total seconds,
+        total rows in/out and the largest peak.
+        """
+        stages: dict[str, dict] = {}
+        for record in self.records:
+            entry = stages.setdefault(record['stage'], {
+                'stage': record['stage'], 'calls': 0, 'seconds': 0.0, 'rows_in': None, 'rows_out': None, 'peak_bytes': None
+            })
+            entry['calls'] += 1
+            entry['seconds'] += record['seconds']
+            for key in ('rows_in', 'rows_out'):
+                if record[key] is not None:
+                    entry[key] = (entry[key] or 0) + record[key]
+            if record['peak_bytes'] is not None:
+                entry['peak_bytes'] = max(entry['peak_bytes'] or 0, record['peak_bytes'])
+        return list(stages.values())
+
+    def format_summary(self) -> str:
+        """Console table of summary()."""
+        lines = [f"{'stage':<20} {'calls':>5} {'seconds':>9} {'rows in':>9} {'rows out':>9} {'peak MB':>9}"]
+        for entry in self.summary():
+            rows_in = '' if entry['rows_in'] is None else entry['rows_in']
+            rows_out = '' if entry['rows_out'] is None else entry['rows_out']
+            peak = '' if entry['peak_bytes'] is None else f"{entry['peak_bytes'] / 2**20:.1f}"
+            lines.append(f"{entry['stage']:<20} {entry['calls']:>5} {entry['seconds']:>9.3f} {rows_in:>9} {rows_out:>9} {peak:>9}")
+        return "\n".join(lines)
+
+    def write_report(self, path: str):
+        """
+        Writes the records to path: CSV (one row per stage run) when it ends with '.csv',
+        JSON with the records and the per-stage summary otherwise.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as file:
+                fieldnames = list(dict.fromkeys(['stage', 'depth', 'seconds', 'rows_in', 'rows_out', 'peak_bytes']
+                                                + [key for record in self.records for key in record]))
+                writer = csv.DictWriter(file, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(path, 'w') as file:
+                json.dump({'stages': self.summary(), 'records': self.records}, file, indent=2)
+
+    def dump_cprofile(self, path: str):
+        """Writes the cProfile statistics of the run (open with pstats or snakeviz)."""
+        if self._cprofile is None:
+            raise ValueError("The profiler was created without cprofile=True.")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._cprofile.dump_stats(path)
+
+
+_active: Profiler | None = None
+
+
+def active_profiler() -> Profiler | None:
+    return _active
+
+
+def stage(name: Stage | str, rows_in: int | None = None):
+    """
+    Context manager recording a stage on the active profiler. Without one (the default) it does nothing,
+    so instrumented code pays no measurable cost:
+
+        with stage(Stage.GAP_FILL, rows_in=len(df)) as s:
+            df = fix_dataframe_inconsistencies(df)
+            s.rows_out = len(df)
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, rows_in)
+
+
+@contextmanager
+def profiling(report_path: str | None = None, cprofile_path: str | None = None, memory: bool = True, log_summary: bool = True):
+    """
+    Activates a Profiler for the enclosed code, then logs its summary and writes the report and cProfile dump.
+
+    Parameters:
+    - report_path: Optional JSON (or .csv) report path (see Profiler.write_report).
+    - cprofile_path: Optional path of a cProfile dump of the whole run.
+    - memory: Trace peak memory per stage with tracemalloc (slows allocation heavy code down).
+    - log_summary: Log the per-stage summary table when the enclosed code ends.
+    """
+    global _active
+    previous = _active
+    profiler = Profiler(memory=memory, cprofile=cprofile_path is not None)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = previous
+
+        log = get_logger(__name__)
+        if log_summary:
+            log.info("%s", profiler.format_summary())
+        if report_path is not None:
+            profiler.write_report(report_path)
+            log.info("Profile report saved to %s", report_path)
+        if cprofile_path is not None:
+            profiler.dump_cprofile(cprofile_path)
+            log.info("cProfile statistics saved to %s", cprofile_path)
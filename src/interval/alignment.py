@@ -0,0 +1,101 @@
+from enum import Enum
+import numpy as np
+import pandas as pd
+
+from src.interval.interval import Interval, IntervalSet
+from src.interval.timestamps import time_strings_to_seconds
+
+
+class AlignMode(Enum):
+    """How cases of different lengths are mapped onto a shared timeline."""
+    NONE = 'none'                  # Cases must have the same number of rows (raises otherwise)
+    TRUNCATE = 'truncate'          # Keep the first rows of every case, as many as the shortest case has
+    INTERPOLATE = 'interpolate'    # Resample every case linearly onto the same number of points
+
+
+def interval_rows(df: pd.DataFrame, intervals: list[Interval], time_col: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the first row position and the number of rows of every interval.
+
+    :param df: DataFrame sampled once per second.
+    :param intervals: Intervals of row positions, or of seconds of time_col when it is given
+                      (e.g. the intervals of get_intervals_from_df with 'relativeTime').
+    :param time_col: Optional 'M:SS' column the interval seconds refer to.
+    :return: Tuple (starts, lengths) of int64 arrays.
+    """
+    interval_set = IntervalSet.from_intervals(intervals)
+    starts, ends = interval_set.starts, interval_set.ends
+
+    if time_col is not None:
+        starts, ends = interval_set.validate_rows(time_strings_to_seconds(df[time_col]))
+
+    if len(ends) and ends.max() >= len(df):
+        raise ValueError(f"Interval ends after the last row of the DataFrame ({len(df)} rows).")
+
+    return starts, ends - starts + 1
+
+
+def sample_positions(
+    starts: np.ndarray,
+    lengths: np.ndarray,
+    mode: AlignMode = AlignMode.INTERPOLATE,
+    points: int | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes where every case is sampled on the shared timeline, for all cases at once.
+
+    Point k of case i lies at the normalized time k / (points - 1) of the case, i.e. at the fractional
+    row starts[i] + k * (lengths[i] - 1) / (points - 1). With TRUNCATE (and NONE) the points are the
+    first rows of every case.
+
+    :param starts: First row position of every case.
+    :param lengths: Number of rows of every case.
+    :param mode: Alignment mode.
+    :param points: Number of points of the timeline. Defaults to the shortest length with TRUNCATE
+                   and to the longest length with INTERPOLATE.
+    :return: Tuple (below, above, fraction) shaped (cases, points): value = row[below] * (1 - fraction) + row[above] * fraction.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if len(lengths) == 0:
+        empty = np.empty((0, points or 0), dtype=np.int64)
+        return empty, empty, empty.astype(np.float64)
+
+    if mode == AlignMode.NONE and (lengths != lengths[0]).any():
+        details = ", ".join(f"#{i}:len={length}" for i, length in enumerate(lengths))
+        raise ValueError(f"Not all chunks have the same number of rows. Intervals: [{details}]")
+
+    if mode in (AlignMode.NONE, AlignMode.TRUNCATE):
+        points = int(lengths.min()) if points is None else points
+        if points > lengths.min():
+            raise ValueError(f"Cannot truncate to {points} points, the shortest case has {lengths.min()} rows.")
+        below = starts[:, None] + np.arange(points, dtype=np.int64)
+        return below, below, np.zeros(below.shape)
+
+    points = int(lengths.max()) if points is None else points
+    if points < 1:
+        raise ValueError("The timeline needs at least one point.")
+
+    timeline = np.linspace(0.0, 1.0, points) if points > 1 else np.zeros(1)
+    position = timeline[None, :] * (lengths[:, None] - 1)
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, lengths[:, None] - 1)
+    fraction = position - below
+    return starts[:, None] + below, starts[:, None] + above, fraction
+
+
+def interpolate_rows(data: np.ndarray, below: np.ndarray, above: np.ndarray, fraction: np.ndarray) -> np.ndarray:
+    """
+    Gathers the sampled rows of a (rows, columns) array into a (cases, points, columns) array.
+    """
+    result = data[below]
+    if fraction.any():
+        result = result + (data[above] - result) * fraction[:, :, None]
+    return result
+
+
+def nearest_rows(below: np.ndarray, above: np.ndarray, fraction: np.ndarray) -> np.ndarray:
+    """
+    Row of every sampled point for values that cannot be interpolated (text columns, row labels).
+    """
+    return np.where(fraction < 0.5, below, above)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from src.interval.split_frame import parse_time_strings_to_seconds
+
+
+def find_true_runs(mask: np.ndarray, debounce: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the runs of consecutive True values in a boolean array using edge detection.
+
+    :param mask: 1D boolean array.
+    :param debounce: False gaps of up to this many rows between two runs are bridged into a single run.
+    :return: Tuple (starts, stops) with the first row of each run and the row right after it (exclusive).
+    """
+    edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+
+    if debounce > 0 and len(starts) > 1:
+        keep = (starts[1:] - stops[:-1]) > debounce
+        starts = starts[np.concatenate(([True], keep))]
+        stops = stops[np.concatenate((keep, [True]))]
+
+    return starts, stops
+
+
+def detect_runs(
+    df: pd.DataFrame,
+    flag_col: str = 'IsTestRunning',
+    time_col: str | None = 'relativeTime',
+    min_duration: int = 0,
+    debounce: int = 0
+) -> pd.DataFrame:
+    """
+    Detects the intervals where flag_col is True in a single vectorized pass.
+
+    The end boundary of each run is the first row after it (the row where the flag turns False),
+    or the last row of the DataFrame when the run reaches its end.
+
+    Parameters:
+    - df: DataFrame sampled once per second.
+    - flag_col: Boolean column marking the rows that belong to a run.
+    - time_col: 'MM:SS' column used for the second boundaries. When None, the row position is used.
+    - min_duration: Runs shorter than this many seconds are discarded.
+    - debounce: False gaps of up to this many rows are bridged, so short glitches do not split a run.
+
+    Returns:
+    - DataFrame with the integer columns 'start_row', 'end_row', 'start' and 'end' (seconds), one row per run.
+    """
+    mask = df[flag_col].to_numpy(dtype=bool)
+    starts, stops = find_true_runs(mask, debounce=debounce)
+    ends = np.minimum(stops, len(mask) - 1)
+
+    if time_col is None:
+        start_sec, end_sec = starts, ends
+    else:
+        boundaries = df[time_col].iloc[np.concatenate((starts, ends))]
+        seconds = parse_time_strings_to_seconds(boundaries).to_numpy(dtype=np.int64)
+        start_sec, end_sec = seconds[:len(starts)], seconds[len(starts):]
+
+    runs = pd.DataFrame({
+        'start_row': starts.astype(np.int64),
+        'end_row': ends.astype(np.int64),
+        'start': np.asarray(start_sec, dtype=np.int64),
+        'end': np.asarray(end_sec, dtype=np.int64),
+    })
+
+    if min_duration > 0:
+        runs = runs[(runs['end'] - runs['start']) >= min_duration].reset_index(drop=True)
+
+    return runs
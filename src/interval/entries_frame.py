@@ -1,27 +1,194 @@
+import numpy as np
 import pandas as pd
 from src.interval.interval import Interval
-from src.interval.split_frame import split_df_by_intervals_as_index
+from src.interval.alignment import AlignMode, interval_rows, sample_positions, interpolate_rows, nearest_rows
+from src.interval.statistics import CaseStats, compute_case_stats, DEFAULT_PERCENTILES, DEFAULT_CONFIDENCE, DEFAULT_BOOTSTRAP
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
+
+
+def _nan_mean(values: np.ndarray, axis=None) -> np.ndarray:
+    """Mean ignoring NaN (like pandas), NaN where every value is missing, without RuntimeWarnings."""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(valid, values, 0.0).sum(axis=axis) / np.where(count > 0, count, np.nan)
 
 class EntriesFrame:
     """
     A class representing a constant frame of data, providing operations for retrieving and analyzing the data.
     All of them must contain equal size in row length and same columns
+
+    The numeric columns of every case are stored in one contiguous float64 array shaped
+    (cases, seconds, columns), so per-case and per-column access returns views and statistics
+    across cases are single reductions over axis 0. Non-numeric columns (e.g. 'Time') are kept
+    on the side and only used to rebuild the DataFrames of the compatibility API (frames, get_frame).
     """
 
 
     def __init__(self, data: list[pd.DataFrame]):
         """
-        Initialize the BaseSplitFrames with a list of DataFrames.
+        Initialize the EntriesFrame with a list of DataFrames.
+
+        :param data: A list of pandas DataFrames with the same columns and number of rows.
+        """
+        if not data:
+            self._set_arrays(np.empty((0, 0, 0)), pd.Index([]), np.empty((0, 0), dtype=np.int64), {}, [], [])
+            return
+
+        if any(len(df) != len(data[0]) for df in data):
+            details = ", ".join(f"#{i}:len={len(df)}" for i, df in enumerate(data))
+            raise ValueError(f"Not all frames have the same number of rows. Frames: [{details}]")
+
+        first = data[0]
+        numeric = [col for col in first.columns if pd.api.types.is_numeric_dtype(first[col])]
+        values = np.stack([df[numeric].to_numpy(dtype=np.float64) for df in data])
+        row_index = np.stack([df.index.to_numpy() for df in data])
+        others = [df[[col for col in first.columns if col not in numeric]] for df in data]
+
+        self._set_arrays(values, pd.Index(numeric), row_index, first.dtypes.to_dict(), list(first.columns), others)
+
+
+    def _set_arrays(self, values: np.ndarray, columns: pd.Index, row_index: np.ndarray, dtypes: dict,
+                    column_order: list, others: list[pd.DataFrame]):
+        self.values = values
+        self.columns = columns
+        self.row_index = row_index
+        self._dtypes = dtypes
+        self._column_order = column_order
+        self._others = others
+        self._stats_cache: dict[tuple, CaseStats] = {}
+
+
+    @classmethod
+    def from_intervals(
+        cls,
+        df: pd.DataFrame,
+        intervals: list[Interval],
+        align: AlignMode = AlignMode.NONE,
+        points: int | None = None,
+        time_col: str | None = None
+    ) -> 'EntriesFrame':
+        """
+        Build the EntriesFrame of the rows df.iloc[interval.start : interval.end + 1] of each interval,
+        gathering every case into the (cases, seconds, columns) array in a single indexing operation.
+
+        :param df: DataFrame sampled once per second.
+        :param intervals: Intervals of row positions (or of seconds of time_col).
+        :param align: How intervals of different lengths are aligned (see AlignMode). With AlignMode.NONE
+                      they must all have the same length.
+        :param points: Length of the shared timeline (see sample_positions).
+        :param time_col: Optional 'M:SS' column the interval seconds refer to, e.g. 'relativeTime'
+                         for the intervals of get_intervals_from_df.
+        :return: EntriesFrame with one case per interval.
+        """
+        for interval in intervals:
+            log.debug("Interval from %s to %s", interval.start, interval.end)
+
+        starts, lengths = interval_rows(df, intervals, time_col=time_col)
+        return cls._from_rows(df, starts, lengths, align, points)
+
+
+    @classmethod
+    def from_frames(cls, frames: list[pd.DataFrame], align: AlignMode = AlignMode.INTERPOLATE, points: int | None = None) -> 'EntriesFrame':
+        """
+        Build the EntriesFrame of already split cases (e.g. from get_splitted_frames), aligning
+        cases of different lengths onto a shared timeline.
 
-        :param data: A list of pandas DataFrames.
+        :param frames: DataFrames with the same columns.
+        :param align: How cases of different lengths are aligned (see AlignMode).
+        :param points: Length of the shared timeline (see sample_positions).
         """
-        self.frames = data
-    
-    
-    @staticmethod
-    def from_intervals(df: pd.DataFrame, intervals: list[Interval]) -> 'EntriesFrame':
-        split_df_by_intervals_as_index(df, intervals)
-        
+        if not frames:
+            return cls([])
+        lengths = np.array([len(frame) for frame in frames], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return cls._from_rows(pd.concat(frames), starts, lengths, align, points)
+
+
+    @classmethod
+    def _from_rows(cls, df: pd.DataFrame, starts: np.ndarray, lengths: np.ndarray, align: AlignMode, points: int | None) -> 'EntriesFrame':
+        below, above, fraction = sample_positions(starts, lengths, mode=align, points=points)
+        nearest = nearest_rows(below, above, fraction)
+
+        numeric = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+        others = [col for col in df.columns if col not in numeric]
+        values = interpolate_rows(df[numeric].to_numpy(dtype=np.float64), below, above, fraction)
+        other_frames = [df[others].iloc[rows] for rows in nearest]
+
+        dtypes = df.dtypes.to_dict()
+        if fraction.any():
+            # Interpolated values are no longer integers
+            dtypes.update({col: np.dtype(np.float64) for col in numeric})
+
+        frame = cls.__new__(cls)
+        frame._set_arrays(values, pd.Index(numeric), df.index.to_numpy()[nearest], dtypes, list(df.columns), other_frames)
+        return frame
+
+
+    @classmethod
+    def from_array(cls, values: np.ndarray, columns: list[str]) -> 'EntriesFrame':
+        """
+        Wrap an existing (cases, seconds, columns) array without copying it.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 3 or values.shape[2] != len(columns):
+            raise ValueError(f"Expected an array shaped (cases, seconds, {len(columns)}), got {values.shape}.")
+
+        frame = cls.__new__(cls)
+        cases, seconds, _ = values.shape
+        row_index = np.broadcast_to(np.arange(seconds, dtype=np.int64), (cases, seconds))
+        frame._set_arrays(values, pd.Index(columns), row_index, {col: np.dtype(np.float64) for col in columns},
+                          list(columns), [pd.DataFrame(index=range(seconds)) for _ in range(cases)])
+        return frame
+
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+
+    def has_column(self, column: str) -> bool:
+        return column in self.columns
+
+
+    def case(self, index: int) -> np.ndarray:
+        """
+        Return a (seconds, columns) view of one case.
+        """
+        return self.values[index]
+
+
+    def column(self, column: str) -> np.ndarray:
+        """
+        Return a (cases, seconds) view of one column across every case.
+        """
+        return self.values[:, :, self.columns.get_loc(column)]
+
+
+    def get_frame(self, index: int) -> pd.DataFrame:
+        """
+        Rebuild the DataFrame of one case with its original columns, dtypes and row index.
+        """
+        data = pd.DataFrame(self.values[index], columns=self.columns, index=self.row_index[index])
+        others = self._others[index]
+        for col in others.columns:
+            data[col] = others[col].to_numpy()
+        data = data[self._column_order]
+
+        # Integer columns were stored as float64 in the array
+        restore = {col: dtype for col, dtype in self._dtypes.items()
+                   if col in self.columns and dtype != np.float64 and not data[col].isna().any()}
+        return data.astype(restore) if restore else data
+
+
+    @property
+    def frames(self) -> list[pd.DataFrame]:
+        """
+        DataFrame of every case (compatibility with the list based API).
+        """
+        return [self.get_frame(i) for i in range(len(self))]
+
 
     def get_series(self, column: str) -> list[pd.Series]:
         """
@@ -30,7 +197,10 @@ class EntriesFrame:
         :param column: Name of the column to extract.
         :return: List of pandas Series.
         """
-        return [df[column] for df in self.frames if column in df]
+        if not self.has_column(column):
+            return [self.get_frame(i)[column] for i in range(len(self)) if column in self._column_order]
+        values = self.column(column)
+        return [pd.Series(values[i], index=self.row_index[i], name=column, copy=False) for i in range(len(self))]
 
 
     def get_means(self, column: str) -> list[float]:
@@ -40,7 +210,9 @@ class EntriesFrame:
         :param column: Name of the column to analyze.
         :return: List of means.
         """
-        return [df[column].mean() for df in self.frames if column in df]
+        if not self.has_column(column):
+            return []
+        return _nan_mean(self.column(column), axis=1).tolist()
 
 
     def get_global_mean(self, column: str) -> float:
@@ -50,13 +222,23 @@ class EntriesFrame:
         :param column: Name of the column to analyze.
         :return: Global mean value.
         """
-        series = self.get_series(column)
-        if not series:
+        if not self.has_column(column) or len(self) == 0:
             return float('nan')
-        combined = pd.concat(series, ignore_index=True)
-        return combined.mean()
+        return float(_nan_mean(self.column(column)))
+
+
+    def _reduce_cases(self, column: str, reducer, **kwargs) -> pd.Series:
+        if not self.has_column(column) or len(self) == 0:
+            return pd.Series(dtype=float)
+        values = self.column(column)
+        valid = (~np.isnan(values)).sum(axis=0)
+        result = np.full(values.shape[1], np.nan)
+        present = valid > 0
+        if present.any():
+            result[present] = reducer(values[:, present], axis=0, **kwargs)
+        return pd.Series(result, name=column)
+
 
-    
     def get_mean_series(self, column: str) -> pd.Series:
         """
         Return the element-wise mean of a specific column across all frames.
@@ -64,18 +246,91 @@ class EntriesFrame:
         Assumes:
             - Each DataFrame has the specified column.
             - All DataFrames have the same number of rows (aligned by time).
-        
+
         :param column: Name of the column to compute element-wise mean on.
         :return: A Series representing the mean at each time point.
         """
-        series_list = self.get_series(column)
-        if not series_list:
+        if not self.has_column(column) or len(self) == 0:
             return pd.Series(dtype=float)
-        df = pd.concat(series_list, axis=1)
-        return df.mean(axis=1)
+        return pd.Series(_nan_mean(self.column(column), axis=0), name=column)
+
+
+    def get_std_series(self, column: str, ddof: int = 1) -> pd.Series:
+        """
+        Return the element-wise standard deviation of a column across all frames.
+
+        :param column: Name of the column.
+        :param ddof: Delta degrees of freedom (1 matches pandas' std).
+        :return: A Series with the standard deviation at each time point.
+        """
+        if not self.has_column(column) or len(self) == 0:
+            return pd.Series(dtype=float)
+        values = self.column(column)
+        count = (~np.isnan(values)).sum(axis=0)
+        squares = np.nansum((values - _nan_mean(values, axis=0)) ** 2, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(squares / (count - ddof))
+        std[count <= ddof] = np.nan
+        return pd.Series(std, name=column)
+
+
+    def get_percentile_series(self, column: str, q: float | list[float]) -> pd.Series | pd.DataFrame:
+        """
+        Return the element-wise percentile(s) of a column across all frames.
+
+        :param column: Name of the column.
+        :param q: Percentile or list of percentiles, between 0 and 100.
+        :return: A Series for a single percentile, or a DataFrame with one column per percentile.
+        """
+        if np.ndim(q) == 0:
+            return self._reduce_cases(column, np.nanpercentile, q=q)
+        return pd.DataFrame({p: self._reduce_cases(column, np.nanpercentile, q=p) for p in q})
+
+
+    def stats(
+        self,
+        columns: list[str] | None = None,
+        percentiles: tuple[float, ...] = DEFAULT_PERCENTILES,
+        confidence: float = DEFAULT_CONFIDENCE,
+        n_boot: int = DEFAULT_BOOTSTRAP,
+        seed: int | None = 0,
+        ddof: int = 1
+    ) -> CaseStats:
+        """
+        Return the per-second statistics across cases (count, mean, std, min, max, percentiles and
+        bootstrap confidence interval of the mean) of the given columns, computed in one batched pass.
+
+        Results are cached on the frame per set of parameters: a later call for the same or fewer
+        columns returns the cached CaseStats without recomputing. Call clear_stats_cache() after
+        modifying values in place.
+
+        :param columns: Numeric columns to analyze. Defaults to every numeric column.
+        :return: CaseStats (see src.interval.statistics).
+        """
+        columns = list(self.columns) if columns is None else list(columns)
+        missing = [col for col in columns if not self.has_column(col)]
+        if missing:
+            raise KeyError(f"Columns without numeric data: {missing}")
+
+        key = (tuple(percentiles), confidence, n_boot, seed, ddof)
+        cached = self._stats_cache.get(key)
+        if cached is not None and all(col in cached.columns for col in columns):
+            return cached
+
+        # Extend the cached columns instead of replacing them, so alternating requests do not recompute
+        if cached is not None:
+            columns = cached.columns + [col for col in columns if col not in cached.columns]
+        indexes = [self.columns.get_loc(col) for col in columns]
+
+        stats = compute_case_stats(self.values[:, :, indexes], columns, percentiles=percentiles,
+                                   confidence=confidence, n_boot=n_boot, seed=seed, ddof=ddof)
+        self._stats_cache[key] = stats
+        return stats
+
+
+    def clear_stats_cache(self):
+        self._stats_cache.clear()
 
 
     def get_total_row_length(self) -> int:
-        return len(self.frames[0])
-    
-    
\ No newline at end of file
+        return self.values.shape[1]
@@ -1,12 +1,8 @@
-import argparse
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
 
+from src.interval.timestamps import time_str_to_seconds, time_strings_to_seconds
 
-def time_str_to_seconds(s: str) -> int:
-    minutes, seconds = map(int, s.strip().split(":"))
-    return minutes * 60 + seconds
 
 class Interval:
     def __init__(self, start: int, end: int):
@@ -17,19 +13,13 @@ class Interval:
 
     def __repr__(self):
         return f"Interval(start={self.start}, end={self.end})"
-    
+
     def len(self) -> int:
         return self.end-self.start+1
-     
+
     @staticmethod
     def from_time_strings(start_str: str, end_str: str) -> "Interval":
-        def time_str_to_seconds(s: str) -> int:
-            minutes, seconds = map(int, s.strip().split(":"))
-            return minutes * 60 + seconds
-
-        start_sec = time_str_to_seconds(start_str)
-        end_sec = time_str_to_seconds(end_str)
-        return Interval(start_sec, end_sec)
+        return Interval(time_str_to_seconds(start_str), time_str_to_seconds(end_str))
 
     @staticmethod
     def from_range_string(s: str) -> "Interval":
@@ -41,5 +31,153 @@ class Interval:
 
     @staticmethod
     def time_str_to_seconds(time_str: str) -> int:
-        minutes, seconds = map(int, time_str.split(":"))
-        return minutes * 60 + seconds
+        return time_str_to_seconds(time_str)
+
+
+class IntervalSet:
+    """
+    Set of closed intervals [start, end] backed by two int64 arrays, with queries over all intervals at once.
+    """
+
+    def __init__(self, starts, ends):
+        self.starts = np.asarray(starts, dtype=np.int64).ravel()
+        self.ends = np.asarray(ends, dtype=np.int64).ravel()
+        if self.starts.shape != self.ends.shape:
+            raise ValueError("starts and ends must have the same length.")
+
+        invalid = np.flatnonzero(self.starts > self.ends)
+        if len(invalid):
+            details = ", ".join(f"#{i}:{self.starts[i]}-{self.ends[i]}" for i in invalid)
+            raise ValueError(f"Start time must be before end time. Intervals: [{details}]")
+
+    @staticmethod
+    def from_intervals(intervals: list[Interval]) -> "IntervalSet":
+        return IntervalSet([interval.start for interval in intervals], [interval.end for interval in intervals])
+
+    @staticmethod
+    def from_range_strings(ranges: list[str]) -> "IntervalSet":
+        """
+        Builds the set from 'MM:SS - MM:SS' (or 'H:MM:SS - H:MM:SS') strings.
+        """
+        parts = pd.Series(ranges, dtype=object).astype(str).str.split('-', expand=True)
+        if parts.shape[1] != 2 or parts.isna().any().any():
+            raise ValueError("Expected format 'MM:SS - MM:SS'")
+        return IntervalSet(time_strings_to_seconds(parts[0]), time_strings_to_seconds(parts[1]))
+
+    def to_intervals(self) -> list[Interval]:
+        return [Interval(int(start), int(end)) for start, end in zip(self.starts, self.ends)]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Interval:
+        return Interval(int(self.starts[index]), int(self.ends[index]))
+
+    def __iter__(self):
+        return iter(self.to_intervals())
+
+    def __repr__(self):
+        return f"IntervalSet({[(int(s), int(e)) for s, e in zip(self.starts, self.ends)]})"
+
+    def lengths(self) -> np.ndarray:
+        """Number of seconds (rows) of every interval, ends included."""
+        return self.ends - self.starts + 1
+
+    def is_sorted(self) -> bool:
+        return bool((np.diff(self.starts) >= 0).all())
+
+    def sorted(self) -> "IntervalSet":
+        order = np.argsort(self.starts, kind='stable')
+        return IntervalSet(self.starts[order], self.ends[order])
+
+    def overlaps(self) -> np.ndarray:
+        """
+        Returns the (i, j) index pairs (i < j) of the intervals that share at least one second.
+        """
+        order = np.argsort(self.starts, kind='stable')
+        starts, ends = self.starts[order], self.ends[order]
+
+        # In start order, interval k overlaps every later interval that starts at or before its end
+        pairs = []
+        last_before = np.searchsorted(starts, ends, side='right')
+        for k in np.flatnonzero(last_before > np.arange(1, len(starts) + 1)):
+            for m in range(k + 1, last_before[k]):
+                pairs.append(sorted((int(order[k]), int(order[m]))))
+        return np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+
+    def has_overlaps(self) -> bool:
+        if len(self) < 2:
+            return False
+        starts = np.sort(self.starts)
+        ends = self.ends[np.argsort(self.starts, kind='stable')]
+        return bool((starts[1:] <= np.maximum.accumulate(ends)[:-1]).any())
+
+    def merge(self, gap: int = 0) -> "IntervalSet":
+        """
+        Returns the sorted union of the intervals. Overlapping and adjacent intervals are joined, and so are
+        intervals with at most gap missing seconds between them.
+        """
+        if len(self) == 0:
+            return IntervalSet([], [])
+        order = np.argsort(self.starts, kind='stable')
+        starts, ends = self.starts[order], self.ends[order]
+        reach = np.maximum.accumulate(ends)
+
+        # A new group starts where the interval begins after everything before it ended (plus gap)
+        new_group = np.concatenate(([True], starts[1:] > reach[:-1] + gap + 1))
+        group_starts = np.flatnonzero(new_group)
+        group_ends = np.concatenate((group_starts[1:], [len(starts)])) - 1
+        return IntervalSet(starts[group_starts], reach[group_ends])
+
+    def contains(self, points) -> np.ndarray:
+        """
+        Returns, for every point, the index of an interval containing it or -1.
+        With overlapping intervals, the one reaching furthest among those started before the point is returned.
+        """
+        points = np.asarray(points, dtype=np.int64)
+        if len(self) == 0:
+            return np.full(points.shape, -1, dtype=np.int64)
+        order = np.argsort(self.starts, kind='stable')
+        starts, ends = self.starts[order], self.ends[order]
+
+        # reach[k] is the largest end among the first k + 1 intervals (in start order), furthest[k] the interval holding it
+        reach = np.maximum.accumulate(ends)
+        furthest = np.maximum.accumulate(np.where(ends == reach, np.arange(len(ends)), 0))
+
+        candidate = np.searchsorted(starts, points, side='right') - 1
+        clipped = np.maximum(candidate, 0)
+        inside = (candidate >= 0) & (points <= reach[clipped])
+        return np.where(inside, order[furthest[clipped]], -1)
+
+    def contains_interval(self, other: "IntervalSet") -> np.ndarray:
+        """
+        Returns, for every interval of other, whether it lies entirely inside one interval of the merged set.
+        """
+        merged = self.merge()
+        group = np.searchsorted(merged.starts, other.starts, side='right') - 1
+        valid = group >= 0
+        group = np.maximum(group, 0)
+        return valid & (other.ends <= merged.ends[group]) if len(merged) else np.zeros(len(other), dtype=bool)
+
+    def row_bounds(self, seconds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Maps every interval onto a sorted seconds column with one batched searchsorted.
+
+        :param seconds: Sorted seconds of every row (e.g. from time_strings_to_seconds).
+        :return: Tuple (first_rows, last_rows); an interval without rows has first_row > last_row.
+        """
+        seconds = np.asarray(seconds)
+        first_rows = np.searchsorted(seconds, self.starts, side='left')
+        last_rows = np.searchsorted(seconds, self.ends, side='right') - 1
+        return first_rows, last_rows
+
+    def validate_rows(self, seconds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Like row_bounds, but raises ValueError naming every interval that matches no row.
+        """
+        first_rows, last_rows = self.row_bounds(seconds)
+        empty = np.flatnonzero(first_rows > last_rows)
+        if len(empty):
+            details = ", ".join(f"{self.starts[i]}-{self.ends[i]}" for i in empty)
+            raise ValueError(f"No rows found in interval(s) {details} seconds.")
+        return first_rows, last_rows
@@ -1,10 +1,10 @@
-import argparse
-
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
 from pathlib import Path
 from src.interval.interval import *
+from src.interval.timestamps import time_strings_to_seconds
+from src.instrumentation import get_logger
+
+log = get_logger(__name__)
 
 def interval_matching_length(intervals: list[Interval]) -> bool:
     return all(i.len() == intervals[0].len() for i in intervals)
@@ -25,9 +25,10 @@ def split_df_by_intervals_as_index(df: pd.DataFrame, intervals: list[Interval])
     
     
     for interval in intervals:
-        print(f"Interval from {interval.start} to {interval.end}")
+        log.debug("Interval from %s to %s", interval.start, interval.end)
         
-        chunk = df.iloc[interval.start : interval.end + 1].copy()
+        # No .copy(): with copy-on-write the chunk shares df's data until one of them is modified
+        chunk = df.iloc[interval.start : interval.end + 1]
         chunks.append(chunk)
 
     return chunks
@@ -35,33 +36,25 @@ def split_df_by_intervals_as_index(df: pd.DataFrame, intervals: list[Interval])
 
 def parse_time_strings_to_seconds(series: pd.Series) -> pd.Series:
     """
-    Converts a Series of time strings in 'M:SS' format to total seconds (as integers).
+    Converts a Series of time strings in 'M:SS' or 'H:MM:SS' format to total seconds (as integers).
     """
-    def convert(time_str):
-        minutes, seconds = time_str.split(":")
-        return int(minutes) * 60 + int(seconds)
-
-    return series.apply(convert)
+    return pd.Series(time_strings_to_seconds(series), index=series.index, name=series.name)
 
 
 def split_df_by_intervals_as_relative_time(df: pd.DataFrame, intervals: list[Interval], time_col:str) -> list[pd.DataFrame]:
     """
     Splits the dataframe into parts based on a list of Interval(start, end).
-    Throws ValueError if there are rows in df[time_col] not covered by any interval.
+    Throws ValueError if there are intervals in seconds of df[time_col] that match no row.
     """
-    time_in_seconds = parse_time_strings_to_seconds(df[time_col])
-    time_values = time_in_seconds.values
+    time_values = time_strings_to_seconds(df[time_col])
+    interval_set = IntervalSet.from_intervals(intervals)
+    start_rows, end_rows = interval_set.validate_rows(time_values)
 
     chunks = []
 
-    for interval in intervals:
-        start_idx = time_values.searchsorted(interval.start, side='left')
-        end_idx = time_values.searchsorted(interval.end, side='right') - 1
-
-        if start_idx > end_idx:
-            raise ValueError(f"No rows found in interval {interval.start}-{interval.end} seconds.")
-
-        print(f"Interval {interval.start}s to {interval.end}s → rows {start_idx} to {end_idx}")
-        chunks.append(df.iloc[start_idx:end_idx + 1].copy())
+    for interval, start_idx, end_idx in zip(intervals, start_rows, end_rows):
+        log.debug("Interval %ss to %ss → rows %s to %s", interval.start, interval.end, start_idx, end_idx)
+        # No .copy(): with copy-on-write the chunk shares df's data until one of them is modified
+        chunks.append(df.iloc[start_idx:end_idx + 1])
 
     return chunks
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_BOOTSTRAP = 1000
+
+# Bootstrap means are computed for blocks of (second, column) cells so that the
+# (resamples x cells) matrix stays around this many elements
+_BOOTSTRAP_BLOCK_ELEMENTS = 1 << 23
+
+
+class CaseStats:
+    """
+    Per-second statistics across the cases of an EntriesFrame, for several columns at once.
+
+    Every array is shaped (seconds, columns), percentiles are shaped (len(percentiles), seconds, columns).
+    ci_low / ci_high are the bootstrap confidence interval of the mean across cases.
+    """
+
+    def __init__(self, columns: list[str], count: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                 minimum: np.ndarray, maximum: np.ndarray, percentiles: tuple[float, ...], percentile_values: np.ndarray,
+                 confidence: float, ci_low: np.ndarray, ci_high: np.ndarray, params: dict):
+        self.columns = list(columns)
+        self.count = count
+        self.mean = mean
+        self.std = std
+        self.min = minimum
+        self.max = maximum
+        self.percentiles = tuple(percentiles)
+        self.percentile_values = percentile_values
+        self.confidence = confidence
+        self.ci_low = ci_low
+        self.ci_high = ci_high
+        self.params = params
+
+    def _index(self, column: str) -> int:
+        try:
+            return self.columns.index(column)
+        except ValueError:
+            raise KeyError(f"Column '{column}' has no statistics. Available: {self.columns}") from None
+
+    def series(self, stat: str, column: str) -> pd.Series:
+        """
+        Return one statistic of one column as a Series indexed by second.
+
+        :param stat: 'count', 'mean', 'std', 'min', 'max', 'ci_low', 'ci_high' or 'p<q>' (e.g. 'p95').
+        :param column: Column name.
+        """
+        j = self._index(column)
+        if stat.startswith('p') and stat[1:].replace('.', '', 1).isdigit():
+            q = float(stat[1:])
+            if q not in self.percentiles:
+                raise KeyError(f"Percentile {q} was not computed. Available: {self.percentiles}")
+            values = self.percentile_values[self.percentiles.index(q), :, j]
+        elif stat in ('count', 'mean', 'std', 'min', 'max', 'ci_low', 'ci_high'):
+            values = getattr(self, stat)[:, j]
+        else:
+            raise KeyError(f"Unknown statistic '{stat}'.")
+        return pd.Series(values, name=column)
+
+    def band(self, column: str, kind: str = 'std', width: float = 1.0) -> tuple[pd.Series, pd.Series, pd.Series]:
+        """
+        Return (center, low, high) Series of a band around one column.
+
+        :param kind: 'std' (mean +- width * std), 'ci' (bootstrap confidence interval of the mean),
+                     'minmax' (min to max) or 'p<low>-p<high>' (e.g. 'p5-p95', centered on the median if computed).
+        :param width: Number of standard deviations of the 'std' band.
+        """
+        mean = self.series('mean', column)
+        if kind == 'std':
+            std = self.series('std', column)
+            return mean, mean - width * std, mean + width * std
+        if kind == 'ci':
+            return mean, self.series('ci_low', column), self.series('ci_high', column)
+        if kind == 'minmax':
+            return mean, self.series('min', column), self.series('max', column)
+        if '-' in kind:
+            low, high = kind.split('-')
+            center = self.series('p50', column) if 50 in self.percentiles else mean
+            return center, self.series(low, column), self.series(high, column)
+        raise KeyError(f"Unknown band '{kind}'.")
+
+    def to_frame(self, column: str) -> pd.DataFrame:
+        """
+        Return every statistic of one column as a DataFrame (one row per second).
+        """
+        stats = ['count', 'mean', 'std', 'min', 'max'] + [f"p{q:g}" for q in self.percentiles] + ['ci_low', 'ci_high']
+        return pd.DataFrame({stat: self.series(stat, column).to_numpy() for stat in stats})
+
+    def __repr__(self):
+        seconds = self.mean.shape[0]
+        return f"CaseStats(columns={self.columns}, seconds={seconds}, percentiles={self.percentiles}, confidence={self.confidence})"
+
+
+def sorted_quantiles(sorted_values: np.ndarray, count: np.ndarray, quantiles: list[float]) -> np.ndarray:
+    """
+    Quantiles over axis 0 of an array already sorted along it, with NaN sorted last (as np.sort does).
+    Uses linear interpolation like np.nanquantile, but with one gather per quantile instead of
+    a separate computation per cell. Cells without values get NaN.
+
+    :param sorted_values: Array shaped (n, ...), sorted along axis 0.
+    :param count: Number of non-NaN values of every cell, shaped like sorted_values[0].
+    :param quantiles: Quantiles between 0 and 1.
+    :return: Array shaped (len(quantiles), ...).
+    """
+    result = np.full((len(quantiles),) + sorted_values.shape[1:], np.nan)
+    present = count > 0
+    last = np.maximum(count - 1, 0)
+
+    for i, q in enumerate(quantiles):
+        position = q * last
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, last)
+        fraction = position - below
+        low = np.take_along_axis(sorted_values, below[None], axis=0)[0]
+        high = np.take_along_axis(sorted_values, above[None], axis=0)[0]
+        result[i] = np.where(present, low + (high - low) * fraction, np.nan)
+
+    return result
+
+
+def bootstrap_mean_interval(
+    values: np.ndarray,
+    confidence: float = DEFAULT_CONFIDENCE,
+    n_boot: int = DEFAULT_BOOTSTRAP,
+    seed: int | None = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile bootstrap confidence interval of the mean over axis 0 (the cases).
+
+    Each resample draws the cases with replacement, represented by the multinomial count of every case,
+    so the resampled means of all cells are one matrix product instead of n_boot gathers of the data.
+    Missing values (NaN) are left out of the means.
+
+    :param values: Array shaped (cases, ...).
+    :return: (low, high) arrays shaped like values[0].
+    """
+    cases = values.shape[0]
+    shape = values.shape[1:]
+    flat = values.reshape(cases, -1)
+    valid = ~np.isnan(flat)
+    filled = np.where(valid, flat, 0.0)
+
+    rng = np.random.default_rng(seed)
+    weights = rng.multinomial(cases, np.full(cases, 1.0 / cases), size=n_boot).astype(np.float64)
+    alpha = (1.0 - confidence) / 2.0
+
+    low = np.full(flat.shape[1], np.nan)
+    high = np.full(flat.shape[1], np.nan)
+    block = max(1, _BOOTSTRAP_BLOCK_ELEMENTS // max(1, n_boot))
+
+    for begin in range(0, flat.shape[1], block):
+        cells = slice(begin, begin + block)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (weights @ filled[:, cells]) / (weights @ valid[:, cells])
+        means.sort(axis=0)
+        low[cells], high[cells] = sorted_quantiles(means, (~np.isnan(means)).sum(axis=0), [alpha, 1.0 - alpha])
+
+    return low.reshape(shape), high.reshape(shape)
+
+
+def compute_case_stats(
+    values: np.ndarray,
+    columns: list[str],
+    percentiles: tuple[float, ...] = DEFAULT_PERCENTILES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    n_boot: int = DEFAULT_BOOTSTRAP,
+    seed: int | None = 0,
+    ddof: int = 1
+) -> CaseStats:
+    """
+    Compute every per-second statistic across cases in one batched pass over a (cases, seconds, columns) array.
+
+    :param values: Array shaped (cases, seconds, len(columns)).
+    :param columns: Names of the last axis.
+    :param percentiles: Percentiles between 0 and 100.
+    :param confidence: Confidence level of the bootstrap interval of the mean.
+    :param n_boot: Number of bootstrap resamples (0 skips the interval, leaving it NaN).
+    :param seed: Seed of the bootstrap resampling, so cached and recomputed results are identical.
+    :param ddof: Delta degrees of freedom of the standard deviation (1 matches pandas).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(valid, values, 0.0).sum(axis=0) / np.where(count > 0, count, np.nan)
+        squares = np.where(valid, (values - mean) ** 2, 0.0).sum(axis=0)
+        std = np.sqrt(squares / (count - ddof))
+    std[count <= ddof] = np.nan
+
+    # One sort along the case axis gives min, max and every percentile; cells missing in every case stay NaN
+    sorted_values = np.sort(values, axis=0)
+    minimum, maximum = sorted_quantiles(sorted_values, count, [0.0, 1.0])
+    percentile_values = sorted_quantiles(sorted_values, count, [q / 100.0 for q in percentiles])
+
+    if n_boot > 0 and len(values) > 1:
+        ci_low, ci_high = bootstrap_mean_interval(values, confidence=confidence, n_boot=n_boot, seed=seed)
+    else:
+        ci_low = np.full(values.shape[1:], np.nan)
+        ci_high = np.full(values.shape[1:], np.nan)
+
+    params = {'percentiles': tuple(percentiles), 'confidence': confidence, 'n_boot': n_boot, 'seed': seed, 'ddof': ddof}
+    return CaseStats(columns, count, mean, std, minimum, maximum, percentiles, percentile_values,
+                     confidence, ci_low, ci_high, params)
@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+
+HWINFO_DATE_FORMAT = '%d.%m.%Y'     # HWiNFO 'Date' column, e.g. '4.6.2025'
+DEFAULT_DAY = pd.Timestamp('1900-01-01')  # Day of clock times without a date (as pd.to_datetime with a time-only format)
+
+# A clock time going back by more than this is a midnight rollover; smaller steps back are
+# out-of-order samples and keep their day
+ROLLOVER_THRESHOLD = pd.Timedelta(hours=12)
+
+_NANOSECONDS = 1_000_000_000
+
+
+def _scalar_time_to_nanoseconds(s: str) -> int:
+    """
+    Parses one 'M:SS', 'H:MM:SS' or 'H:MM:SS.fff' string to nanoseconds.
+    """
+    parts = s.strip().split(":")
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Expected format 'M:SS' or 'H:MM:SS', got '{s}'")
+
+    seconds_part, _, fraction = parts[-1].partition(".")
+    fields = [int(part) for part in parts[:-1]] + [int(seconds_part)]
+    if fraction and (not fraction.isdigit() or len(fraction) > 9):
+        raise ValueError(f"Expected format 'M:SS' or 'H:MM:SS', got '{s}'")
+
+    total = 0
+    for field, unit in zip(fields, (60, 1) if len(fields) == 2 else (3600, 60, 1)):
+        total += field * unit
+    return total * _NANOSECONDS + (int(fraction.ljust(9, "0")) if fraction else 0)
+
+
+def time_str_to_seconds(s: str) -> int:
+    """
+    Converts a 'M:SS' or 'H:MM:SS' time string to total seconds. Fractions of a second are truncated.
+    """
+    return _scalar_time_to_nanoseconds(s) // _NANOSECONDS
+
+
+def _fixed_layout_nanoseconds(codes: np.ndarray) -> np.ndarray | None:
+    """
+    Parses strings of the same length with ':' (and an optional '.' after the last one) at the same
+    positions, given as a (rows, length) array of character codes. Returns None when the group does
+    not share one layout or some other character is not a digit.
+    """
+    colon_mask, dot_mask = codes == ord(':'), codes == ord('.')
+    colons = np.flatnonzero(colon_mask.all(axis=0))
+    dots = np.flatnonzero(dot_mask.all(axis=0))
+
+    if len(colons) not in (1, 2) or len(dots) > 1 or (len(dots) and dots[0] < colons[-1]):
+        return None
+    if colon_mask.sum(axis=1).max() != len(colons) or dot_mask.sum(axis=1).max() != len(dots):
+        return None
+
+    digits = codes - ord('0')
+    is_digit = (digits >= 0) & (digits <= 9)
+    is_digit[:, colons] = True
+    is_digit[:, dots] = True
+    if not is_digit.all():
+        return None
+
+    fraction_end = codes.shape[1]
+    seconds_end = dots[0] if len(dots) else fraction_end
+    bounds = np.concatenate(([-1], colons, [seconds_end]))
+    if (np.diff(bounds) < 2).any() or fraction_end - seconds_end - 1 > 9:
+        return None
+
+    def number(begin: int, end: int) -> np.ndarray:
+        weights = 10 ** np.arange(end - begin - 1, -1, -1, dtype=np.int64)
+        return digits[:, begin:end] @ weights
+
+    # Fields are (minutes, seconds) or (hours, minutes, seconds)
+    total = np.zeros(len(codes), dtype=np.int64)
+    fields = [number(begin, end) for begin, end in zip(bounds[:-1] + 1, bounds[1:])]
+    for field, unit in zip(fields, (60, 1) if len(fields) == 2 else (3600, 60, 1)):
+        total += field * unit
+    total *= _NANOSECONDS
+
+    if fraction_end - seconds_end > 1:
+        total += number(seconds_end + 1, fraction_end) * 10 ** (9 - (fraction_end - seconds_end - 1))
+    return total
+
+
+def _time_strings_to_nanoseconds(values, errors: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (nanoseconds, valid) for a sequence of time strings. Invalid strings raise ValueError
+    when errors='raise' and are flagged in valid when errors='coerce'.
+    """
+    if errors not in ('raise', 'coerce'):
+        raise ValueError("errors must be 'raise' or 'coerce'")
+
+    series = pd.Series(values, dtype=object) if not isinstance(values, pd.Series) else values
+    missing = series.isna().to_numpy()
+    strings = np.asarray(series.to_numpy(dtype=object, na_value=''), dtype=str)
+
+    result = np.zeros(len(strings), dtype=np.int64)
+    valid = ~missing
+    if len(strings) == 0:
+        return result, valid
+
+    lengths = np.char.str_len(strings)
+    for length in np.unique(lengths[valid]):
+        rows = np.flatnonzero((lengths == length) & valid)
+        group = strings[rows]
+        codes = group.astype(f'<U{length}').view(np.uint32).reshape(len(group), length).astype(np.int64)
+
+        parsed = _fixed_layout_nanoseconds(codes) if length > 0 else None
+        if parsed is None:
+            # Irregular group (spaces, mixed layouts or bad values): one string at a time
+            parsed = np.zeros(len(group), dtype=np.int64)
+            for i, s in enumerate(group):
+                try:
+                    parsed[i] = _scalar_time_to_nanoseconds(s)
+                except ValueError:
+                    if errors == 'raise':
+                        raise
+                    valid[rows[i]] = False
+        result[rows] = parsed
+
+    if errors == 'raise' and missing.any():
+        raise ValueError(f"Expected format 'M:SS' or 'H:MM:SS', got a missing value at row {int(np.argmax(missing))}")
+    return result, valid
+
+
+def time_strings_to_seconds(values, errors: str = 'raise') -> np.ndarray:
+    """
+    Converts 'M:SS' / 'H:MM:SS' time strings to total seconds without a Python call per row.
+
+    Strings are grouped by length; every group whose separators are at the same positions (the usual
+    zero-padded logs) is parsed at once from its character codes. Other strings fall back to
+    the scalar parser. Fractions of a second are truncated.
+
+    :param values: Sequence or Series of time strings.
+    :param errors: 'raise' raises ValueError on an invalid or missing value, 'coerce' turns it into NaN.
+    :return: int64 array of seconds (float64 with NaN when errors='coerce').
+    """
+    nanoseconds, valid = _time_strings_to_nanoseconds(values, errors)
+    seconds = nanoseconds // _NANOSECONDS
+    if errors == 'coerce':
+        return np.where(valid, seconds, np.nan)
+    return seconds
+
+
+def time_strings_to_timedelta(values, errors: str = 'coerce') -> np.ndarray:
+    """
+    Converts clock times ('HH:MM:SS' or HWiNFO's 'HH:MM:SS.fff') to timedelta64[ns] since midnight,
+    like pd.to_timedelta but parsed from the character codes.
+
+    :param values: Sequence or Series of time strings.
+    :param errors: 'coerce' turns invalid or missing values into NaT, 'raise' raises ValueError.
+    """
+    nanoseconds, valid = _time_strings_to_nanoseconds(values, errors)
+    result = nanoseconds.view('timedelta64[ns]').copy()
+    result[~valid] = np.timedelta64('NaT')
+    return result
+
+
+def seconds_to_time_strings(seconds, hours: bool = False) -> np.ndarray:
+    """
+    Formats whole seconds as 'MM:SS' strings (minutes may exceed 59, as in the Java relativeTime column),
+    or as 'HH:MM:SS' when hours is True.
+    """
+    seconds = np.asarray(seconds, dtype=np.int64)
+    if hours:
+        fields = [seconds // 3600, seconds // 60 % 60, seconds % 60]
+    else:
+        fields = [seconds // 60, seconds % 60]
+
+    result = np.char.zfill(fields[0].astype(str), 2)
+    for field in fields[1:]:
+        result = np.char.add(np.char.add(result, ':'), np.char.zfill(field.astype(str), 2))
+    return result
+
+
+def format_clock_times(datetimes: pd.Series) -> pd.Series:
+    """
+    Formats a datetime64 Series as 'HH:MM:SS' strings (like .dt.strftime('%H:%M:%S')); NaT becomes NaN.
+    """
+    valid = datetimes.notna().to_numpy()
+    seconds = (datetimes - datetimes.dt.normalize()).dt.total_seconds().to_numpy()
+    result = pd.Series(np.nan, index=datetimes.index, dtype=object)
+    result[valid] = seconds_to_time_strings(seconds[valid].astype(np.int64), hours=True)
+    return result.astype('str')
+
+
+def parse_dates(values, date_format: str = HWINFO_DATE_FORMAT) -> np.ndarray:
+    """
+    Parses date strings to datetime64[ns] with an explicit format. Logs repeat the same date on every row,
+    so only the distinct values are parsed. Invalid or missing dates become NaT.
+    """
+    codes, uniques = pd.factorize(pd.Series(values).astype(object), use_na_sentinel=True)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=date_format, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    return np.where(codes >= 0, parsed[np.maximum(codes, 0)], np.datetime64('NaT'))
+
+
+def combine_date_time(dates, times, date_format: str = HWINFO_DATE_FORMAT) -> pd.Series:
+    """
+    Parses a date column and a clock time column of the same log (e.g. HWiNFO 'Date' and 'Time')
+    into datetime64. Every row carries its own date, so midnight rollovers need no detection.
+    """
+    index = times.index if isinstance(times, pd.Series) else None
+    return pd.Series(parse_dates(dates, date_format) + time_strings_to_timedelta(times), index=index)
+
+
+def with_midnight_rollover(times, day: pd.Timestamp = DEFAULT_DAY) -> pd.Series:
+    """
+    Places clock times (timedelta64 since midnight, or time strings) on day, adding a day on every
+    midnight rollover: a step back of more than ROLLOVER_THRESHOLD from the last valid time.
+    """
+    index = times.index if isinstance(times, pd.Series) else None
+    if not pd.api.types.is_timedelta64_dtype(times):
+        times = time_strings_to_timedelta(times)
+    times = pd.Series(np.asarray(times, dtype='timedelta64[ns]'), index=index)
+
+    rollovers = (times.ffill().diff() < -ROLLOVER_THRESHOLD).cumsum()
+    return day + times + pd.to_timedelta(rollovers, unit='D')
+
+
+def clock_datetimes(times, dates=None, date_format: str = HWINFO_DATE_FORMAT) -> pd.Series:
+    """
+    Parses a clock time column that has no date of its own (e.g. the Java 'Timestamp') into datetime64.
+
+    The first valid value of dates (e.g. the HWiNFO 'Date' of a merged frame) anchors the day, or
+    DEFAULT_DAY without dates; runs crossing midnight are handled by with_midnight_rollover.
+    """
+    day = DEFAULT_DAY
+    if dates is not None:
+        parsed = parse_dates(dates, date_format)
+        parsed = parsed[~np.isnat(parsed)]
+        if len(parsed):
+            day = pd.Timestamp(parsed[0])
+    return with_midnight_rollover(times, day)
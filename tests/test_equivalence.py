@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+import src.benchmark.equivalence as equivalence
+from src.benchmark.equivalence import EXPECTED_DIFFS, baseline_gap_fill_from_midnight, bundled_sessions, check_session, compare_frames
+from src.benchmark.generator import generate_logs
+from src.implm.merged.db_math_regression import NoiseModel, Solver
+from src.implm.merged.pipeline import fix_dataframe_inconsistencies
+
+pytest.importorskip('sklearn')
+
+
+@pytest.fixture(scope='module')
+def model():
+    return NoiseModel.from_csv(artifact_dir=None)
+
+
+def _by_stage(results: list[dict]) -> dict[str, dict]:
+    return {result['stage']: result for result in results}
+
+
+def _assert_no_drift(results: list[dict]):
+    for result in results:
+        assert result['error'] is None or result['error'].startswith('skipped'), result
+        assert result['equal'] or result['expected_diff'] is not None, result
+
+
+def test_bundled_session_only_differs_as_expected(model):
+    name, hw_info_csv, java_csv = next(session for session in bundled_sessions() if session[0] == 'base_automatica')
+    results = _by_stage(check_session(name, hw_info_csv, java_csv, model))
+
+    _assert_no_drift(results.values())
+    # The baseline exact join dropped the HWiNFO times with an unpadded second
+    assert results['merge (exact)']['rows'] == [751, 901]
+    assert results['merge (exact)']['expected_diff'] == EXPECTED_DIFFS['merge (exact)']
+    assert results['gap fill']['equal']
+    assert results['predict']['equal']
+
+
+def test_session_crossing_midnight_only_differs_as_expected(tmp_path, model):
+    generate_logs(str(tmp_path), 1500, cycles=2, columns=16, start=pd.Timestamp('2025-06-04 23:50:00.250'))
+    results = _by_stage(check_session('midnight', str(tmp_path / 'hw_info.csv'), str(tmp_path / 'java.csv'), model))
+
+    _assert_no_drift(results.values())
+    assert results['gap fill']['expected_diff'] == EXPECTED_DIFFS['gap fill']
+
+
+def test_exact_join_keeps_the_hw_info_order(tmp_path, model):
+    generate_logs(str(tmp_path), 300, cycles=2, columns=16)
+    java = tmp_path / 'java.csv'
+    lines = java.read_text(encoding='latin-1').splitlines(keepends=True)
+    # A duplicated Java second with a missing one before it
+    del lines[100]
+    lines.insert(150, lines[150])
+    java.write_text(''.join(lines), encoding='latin-1')
+
+    results = _by_stage(check_session('exact', str(tmp_path / 'hw_info.csv'), str(java), model))
+
+    _assert_no_drift(results.values())
+
+
+def test_asof_join_only_differs_as_expected(tmp_path, model):
+    generate_logs(str(tmp_path), 300, cycles=2, columns=16)
+    hw_info, java = tmp_path / 'hw_info.csv', tmp_path / 'java.csv'
+    hw_lines = hw_info.read_text(encoding='latin-1').splitlines(keepends=True)
+    java_lines = java.read_text(encoding='latin-1').splitlines(keepends=True)
+
+    # A sample exactly on a second missing from the Java log, a duplicated sample and a duplicated Java second
+    index = next(i for i in range(100, len(hw_lines)) if hw_lines[i].split(',')[1][6:8].isdigit())
+    date, clock, rest = hw_lines[index].split(',', 2)
+    second = clock.split('.')[0]
+    hw_lines[index] = f"{date},{second}.000,{rest}"
+    java_lines = [line for line in java_lines if not line.startswith(second + ',')]
+    hw_lines.insert(200, hw_lines[200])
+    java_lines.insert(150, java_lines[150])
+    hw_info.write_text(''.join(hw_lines), encoding='latin-1')
+    java.write_text(''.join(java_lines), encoding='latin-1')
+
+    results = _by_stage(check_session('as-of', str(hw_info), str(java), model))
+
+    _assert_no_drift(results.values())
+    assert results['merge (as-of)']['expected_diff'] == EXPECTED_DIFFS['merge (as-of)']
+
+
+def test_duplicated_seconds_match_the_baseline_with_a_stable_sort():
+    # Every second twice and a gap after each, so the kept sample and the copied one both depend on the order
+    seconds = [second for second in range(0, 200, 3) for _ in range(2)]
+    merged = pd.DataFrame({'Timestamp': [f"17:{second // 60:02d}:{second % 60:02d}" for second in seconds],
+                           'relativeTime': [f"{second // 60:02d}:{second % 60:02d}" for second in seconds],
+                           'CPU [RPM]': range(len(seconds))})
+
+    filled = fix_dataframe_inconsistencies(merged.copy())
+
+    assert compare_frames(baseline_gap_fill_from_midnight(merged), filled)['equal']
+    assert filled['CPU [RPM]'].iloc[:3].tolist() == [0, 1, 1]
+
+
+def test_least_squares_solver_differs_as_expected():
+    name, hw_info_csv, java_csv = bundled_sessions()[0]
+    model = NoiseModel.from_csv(artifact_dir=None, solver=Solver.LEAST_SQUARES)
+    results = _by_stage(check_session(name, hw_info_csv, java_csv, model))
+
+    _assert_no_drift(results.values())
+    assert not results['predict']['equal']
+    assert results['predict']['expected_diff'] == EXPECTED_DIFFS['predict']
+
+
+def test_drift_is_a_mismatch(monkeypatch, model):
+    fix_dataframe_inconsistencies = equivalence.fix_dataframe_inconsistencies
+    monkeypatch.setattr(equivalence, 'fix_dataframe_inconsistencies', lambda df: fix_dataframe_inconsistencies(df).iloc[1:])
+    name, hw_info_csv, java_csv = bundled_sessions()[0]
+    results = _by_stage(check_session(name, hw_info_csv, java_csv, model))
+
+    assert not results['gap fill']['equal'] and results['gap fill']['expected_diff'] is None
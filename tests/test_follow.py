@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.implm.merged.db_math_regression import NoiseModel
+from src.implm.merged.follow import CsvTail, LiveFollower
+from src.implm.merged.pipeline import get_splitted_frames
+from src.implm.merged.streaming import FileSink, stream_merged_chunks, stream_to_sink
+
+INPUT_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'data', 'input')
+SESSIONS = ['base_automatica', 'base_manual', 'sem_base']
+
+pytest.importorskip('sklearn')
+
+
+def _log_path(folder: str, name: str) -> str:
+    for candidate in os.listdir(folder):
+        if candidate.lower() == name:
+            return os.path.join(folder, candidate)
+    raise FileNotFoundError(os.path.join(folder, name))
+
+
+@pytest.fixture(scope='module')
+def model():
+    return NoiseModel.from_csv(artifact_dir=None)
+
+
+def _feed(source: str, target, rng: np.random.Generator, max_bytes: int) -> bool:
+    """Appends a random number of bytes of source (cutting lines anywhere) to target; False once all was copied."""
+    data = source.read(int(rng.integers(1, max_bytes)))
+    target.write(data)
+    target.flush()
+    return bool(data)
+
+
+@pytest.mark.parametrize('session', SESSIONS)
+def test_random_partial_lines_match_streaming(tmp_path, model, session):
+    folder = os.path.join(INPUT_FOLDER, session)
+    hw_info_csv, java_csv = _log_path(folder, 'hw_info.csv'), _log_path(folder, 'java.csv')
+    live_hw, live_java = str(tmp_path / 'hw_info.csv'), str(tmp_path / 'java.csv')
+    rng = np.random.default_rng(0)
+
+    follower = LiveFollower(live_hw, live_java, output_folder=str(tmp_path / 'live'), model=model)
+    with open(hw_info_csv, 'rb') as hw_source, open(java_csv, 'rb') as java_source, \
+            open(live_hw, 'wb') as hw_target, open(live_java, 'wb') as java_target:
+        hw_left = java_left = True
+        while hw_left or java_left:
+            # The HWiNFO log moves faster, so samples regularly wait for their Java rows
+            hw_left = hw_left and _feed(hw_source, hw_target, rng, 40_000)
+            java_left = java_left and _feed(java_source, java_target, rng, 600)
+            follower.tick()
+    follower.close()
+
+    streamed = str(tmp_path / 'streamed.csv')
+    stream_to_sink(stream_merged_chunks(hw_info_csv, java_csv, model=model), FileSink(streamed))
+    with open(streamed, 'rb') as expected, open(tmp_path / 'live' / 'merged_data.csv', 'rb') as actual:
+        assert actual.read() == expected.read()
+
+    cases = get_splitted_frames(pd.read_csv(streamed))
+    assert [(summary['start'], summary['end'], summary['rows']) for summary in follower.tracker.summaries] == \
+           [(case['relativeTime'].iloc[0], case['relativeTime'].iloc[-1], len(case)) for case in cases]
+
+
+def test_flush_without_java_rows_keeps_the_samples(tmp_path, model):
+    folder = os.path.join(INPUT_FOLDER, SESSIONS[0])
+    hw_info_csv, java_csv = _log_path(folder, 'hw_info.csv'), _log_path(folder, 'java.csv')
+    live_hw, live_java = str(tmp_path / 'hw_info.csv'), str(tmp_path / 'java.csv')
+    with open(hw_info_csv, 'rb') as source, open(live_hw, 'wb') as target:
+        target.write(source.read())
+    open(live_java, 'wb').close()
+
+    follower = LiveFollower(live_hw, live_java, model=model)
+    assert follower.tick(flush=True) == []
+    assert follower._pending_count > 0
+
+    with open(java_csv, 'rb') as source, open(live_java, 'wb') as target:
+        target.write(source.read())
+    follower.tick(flush=True)
+    assert follower.rows_merged > 0
+    assert follower._pending_count == 0
+
+
+def test_repeated_header_lines_are_skipped(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_text("a,b\n1,2\n")
+    tail = CsvTail(str(path))
+    assert tail.read_new_rows().to_dict('list') == {'a': [1], 'b': [2]}
+
+    with open(path, 'a') as file:
+        file.write("a,b\n3,4\n5,6")
+    assert tail.read_new_rows().to_dict('list') == {'a': [3], 'b': [4]}
+    assert tail.read_new_rows(final=True).to_dict('list') == {'a': [5], 'b': [6]}
+    assert tail.rows_read == 3
+
+
+def test_shrunk_file_is_read_again(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_text("a,b\n1,2\n3,4\n5,6\n")
+    tail = CsvTail(str(path))
+    assert len(tail.read_new_rows()) == 3
+
+    # The logger replaced the file with a shorter one
+    path.write_text("a,b\n7,8\n")
+    assert tail.read_new_rows().to_dict('list') == {'a': [7], 'b': [8]}
+    assert tail.read_new_rows() is None
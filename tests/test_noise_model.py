@@ -0,0 +1,116 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.implm.merged.db_math_regression import (
+    DEFAULT_TEST_VALUES, DEFAULT_TRAIN_CSV, NoiseModel, Solver, load_and_clean_csv, split_train_test,
+)
+
+pytest.importorskip('sklearn')
+
+
+def _write_rows(path, header, rows, mode='w'):
+    with open(path, mode, newline='') as file:
+        if mode == 'w':
+            file.write(header)
+        file.writelines(rows)
+
+
+@pytest.fixture
+def calibration_halves():
+    with open(DEFAULT_TRAIN_CSV, newline='') as file:
+        lines = file.readlines()
+    header, rows = lines[0], lines[1:]
+    return header, rows[:len(rows) // 2], rows[len(rows) // 2:]
+
+
+@pytest.mark.parametrize('grau', [2, 3, 4])
+def test_appended_rows_update_matches_cold_build(tmp_path, calibration_halves, grau):
+    header, first_half, second_half = calibration_halves
+    csv_path = str(tmp_path / 'calibration.csv')
+    artifact_dir = str(tmp_path / 'models')
+
+    _write_rows(csv_path, header, first_half)
+    NoiseModel.from_csv(grau=grau, csv_path=csv_path, artifact_dir=artifact_dir, solver=Solver.LEAST_SQUARES)
+    _write_rows(csv_path, header, second_half, mode='a')
+
+    updated = NoiseModel.from_csv(grau=grau, csv_path=csv_path, artifact_dir=artifact_dir, solver=Solver.LEAST_SQUARES)
+    cold = NoiseModel.from_csv(grau=grau, csv_path=csv_path, artifact_dir=None, solver=Solver.LEAST_SQUARES)
+
+    df = load_and_clean_csv(csv_path, is_train_csv=True)
+    x0, x1 = df['Velocidade Fan Base'], df['Velocidade Fan PC']
+    np.testing.assert_allclose(updated.tabela(x0, x1), cold.tabela(x0, x1), rtol=0, atol=1e-6)
+    assert updated.matches_refit(csv_path)
+    assert updated.metadata['rows_seen'] == len(df)
+
+
+def test_appended_test_levels_are_not_trained_on(tmp_path, calibration_halves):
+    header, first_half, second_half = calibration_halves
+    csv_path = str(tmp_path / 'calibration.csv')
+    artifact_dir = str(tmp_path / 'models')
+
+    _write_rows(csv_path, header, first_half)
+    model = NoiseModel.from_csv(csv_path=csv_path, artifact_dir=artifact_dir, solver=Solver.LEAST_SQUARES)
+    _write_rows(csv_path, header, second_half, mode='a')
+
+    appended = load_and_clean_csv(csv_path, is_train_csv=True, skip_rows=len(first_half))
+    train_rows, test_rows = split_train_test(appended, test_values=DEFAULT_TEST_VALUES)
+    assert len(test_rows) > 0
+
+    assert model.update_from_csv(csv_path) == len(train_rows)
+
+
+@pytest.mark.parametrize('grau', [2, 3, 4])
+def test_default_solver_predicts_like_sklearn(grau):
+    model = NoiseModel.from_csv(grau=grau, artifact_dir=None)
+
+    df = load_and_clean_csv(DEFAULT_TRAIN_CSV, is_train_csv=True)
+    X = df[['Velocidade Fan Base', 'Velocidade Fan PC']].dropna()
+    expected = model.modelo.predict(model.transformador.transform(X))
+    np.testing.assert_allclose(model.tabela(X['Velocidade Fan Base'], X['Velocidade Fan PC']), expected, rtol=0, atol=1e-9)
+
+
+def test_default_solver_is_refit_when_rows_are_appended(tmp_path, calibration_halves):
+    header, first_half, second_half = calibration_halves
+    csv_path = str(tmp_path / 'calibration.csv')
+    artifact_dir = str(tmp_path / 'models')
+
+    _write_rows(csv_path, header, first_half)
+    model = NoiseModel.from_csv(csv_path=csv_path, artifact_dir=artifact_dir)
+    assert not model.is_prefix_of(csv_path)
+    with pytest.raises(ValueError):
+        model.update(load_and_clean_csv(csv_path, is_train_csv=True))
+    _write_rows(csv_path, header, second_half, mode='a')
+
+    updated = NoiseModel.from_csv(csv_path=csv_path, artifact_dir=artifact_dir)
+    cold = NoiseModel.from_csv(csv_path=csv_path, artifact_dir=None)
+    assert updated.fingerprint() == cold.fingerprint()
+
+
+def test_load_does_not_import_sklearn(tmp_path):
+    artifact_dir = str(tmp_path / 'models')
+    NoiseModel.from_csv(artifact_dir=artifact_dir)
+
+    code = ("import sys; from src.implm.merged.db_math_regression import NoiseModel; "
+            f"model = NoiseModel.from_csv(artifact_dir={artifact_dir!r}); "
+            "assert model.is_fitted and 'sklearn' not in sys.modules; "
+            "assert model.modelo is not None and 'sklearn' in sys.modules")
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_restored_sklearn_objects_follow_updates(tmp_path, calibration_halves):
+    header, first_half, second_half = calibration_halves
+    csv_path = str(tmp_path / 'calibration.csv')
+    artifact_dir = str(tmp_path / 'models')
+
+    _write_rows(csv_path, header, first_half)
+    NoiseModel.from_csv(csv_path=csv_path, artifact_dir=artifact_dir, solver=Solver.LEAST_SQUARES)
+    _write_rows(csv_path, header, second_half, mode='a')
+    model = NoiseModel.from_csv(csv_path=csv_path, artifact_dir=artifact_dir, solver=Solver.LEAST_SQUARES)
+
+    df = load_and_clean_csv(csv_path, is_train_csv=True)
+    X = df[['Velocidade Fan Base', 'Velocidade Fan PC']].dropna()
+    expected = model.tabela(X['Velocidade Fan Base'], X['Velocidade Fan PC'])
+    np.testing.assert_allclose(model.modelo.predict(model.transformador.transform(X)), expected, rtol=0, atol=1e-6)
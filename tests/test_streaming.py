@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.implm.merged.db_math_regression import NoiseModel
+from src.implm.merged.pipeline import get_merged_frame
+from src.implm.merged.streaming import stream_merged_chunks
+from src.interval.timestamps import time_strings_to_seconds
+
+SESSION_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'data', 'input', 'base_automatica')
+
+pytest.importorskip('sklearn')
+
+
+@pytest.fixture(scope='module')
+def model():
+    return NoiseModel.from_csv(artifact_dir=None)
+
+
+def _duplicated_seconds(hw_info_csv: str) -> np.ndarray:
+    """Positions of the samples followed by another sample of the same second."""
+    seconds = time_strings_to_seconds(pd.read_csv(hw_info_csv, usecols=['Time'])['Time'], errors='coerce')
+    return np.flatnonzero(np.diff(seconds) == 0)
+
+
+def test_duplicated_second_across_chunks_matches_in_memory(model):
+    hw_info_csv, java_csv = os.path.join(SESSION_FOLDER, 'hw_info.csv'), os.path.join(SESSION_FOLDER, 'java.csv')
+    expected = get_merged_frame(hw_info_csv, java_csv, projected=True, model=model)
+
+    duplicated = _duplicated_seconds(hw_info_csv)
+    assert len(duplicated) > 0
+    # The first chunk ends right after the first sample of a duplicated second
+    for chunk_rows in [int(position) + 1 for position in duplicated] + [100]:
+        streamed = pd.concat(stream_merged_chunks(hw_info_csv, java_csv, chunk_rows=chunk_rows, model=model), ignore_index=True)
+        pd.testing.assert_frame_equal(streamed[expected.columns], expected, check_dtype=False)